@@ -0,0 +1,286 @@
+"""
+    Título del proyecto: ALMACÉN BINARIO DE PATRONES
+    Descripción del proyecto: Guarda los patrones de aprendizaje como registros binarios de ancho fijo mapeados en memoria.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    csv: Importar y exportar el archivo csv original
+    os: Medir y truncar el archivo de registros
+    threading: Numerar los patrones que agregan varios hilos a la vez
+    numpy: Leer los registros sin copiarlos y escribirlos por bloques
+"""
+
+import csv
+import os
+import threading
+
+import numpy as np
+
+NOMBRE_CAMPOS = ['CASO', 'R', 'G', 'B', 'CLASE']
+
+# Registro de 8 bytes: CASO (4 bytes), R, G, B y CLASE (1 byte cada uno)
+TIPO_REGISTRO = np.dtype([
+    ('CASO', '<u4'),
+    ('R', 'u1'),
+    ('G', 'u1'),
+    ('B', 'u1'),
+    ('CLASE', 'u1')
+])
+
+class AlmacenBinario():
+    """
+        Implementa las mismas operaciones que ArchivoCSV sobre un archivo
+        de registros de ancho fijo: agregar y eliminar el último registro
+        cuestan lo mismo sin importar el tamaño del archivo, y la lectura
+        entrega los datos como arreglos numpy mapeados en memoria.
+        También admite suscribir, ver ArchivoCSV.suscribir.
+    """
+
+    # Protege la numeración de los casos, compartido por todas las instancias
+    _candado = threading.RLock()
+    # Ruta absoluta -> funciones que reciben los patrones agregados
+    _suscriptores = {}
+
+    def __init__(self, ruta='datos.bin') -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            ruta: Ruta del archivo de registros
+        """
+
+        self.ruta = ruta
+
+    def __len__(self) -> int:
+        if not os.path.exists(self.ruta):
+            return 0
+
+        return os.path.getsize(self.ruta) // TIPO_REGISTRO.itemsize
+
+    def suscribir(self, al_agregar, al_leer) -> None:
+        """
+            Entrega los patrones actuales y después cada lote agregado, ver
+            ArchivoCSV.suscribir.
+        """
+
+        with AlmacenBinario._candado:
+            patrones, clases = self.leer_arreglos()
+            al_leer(np.array(patrones), np.array(clases))
+            AlmacenBinario._suscriptores.setdefault(os.path.abspath(self.ruta), []).append(al_agregar)
+
+    def desuscribir(self, al_agregar) -> None:
+        """
+            Deja de avisar a la función registrada con suscribir.
+        """
+
+        with AlmacenBinario._candado:
+            suscriptores = AlmacenBinario._suscriptores.get(os.path.abspath(self.ruta), [])
+
+            if al_agregar in suscriptores:
+                suscriptores.remove(al_agregar)
+
+    def _agregar_registros(self, registros) -> None:
+        """
+            Escribe los registros al final del archivo y se los entrega a
+            los suscriptores; se llama con el candado tomado.
+        """
+
+        registros = np.ascontiguousarray(registros, dtype=TIPO_REGISTRO)
+
+        with open(self.ruta, 'ab') as archivo:
+            archivo.write(registros.tobytes())
+
+        for al_agregar in AlmacenBinario._suscriptores.get(os.path.abspath(self.ruta), []):
+            al_agregar(np.stack((registros['R'], registros['G'], registros['B']), axis=1), registros['CLASE'].copy())
+
+    def escribir_dato(self, fila) -> None:
+        """
+            Agrega un patrón al final del archivo.
+
+            Parámetros:
+             fila: Diccionario de datos donde se tiene la información de un patrón;
+             No. caso, canal R, canal G, canal B, clase asignada
+        """
+
+        self.agregar_datos([fila])
+
+    def escribir_patron(self, patron, clase) -> int:
+        """
+            Agrega un patrón con el siguiente número de CASO, asignado y
+            escrito en una sola operación, ver ArchivoCSV.escribir_patron.
+
+            Retorno:
+            Número de CASO asignado
+        """
+
+        with AlmacenBinario._candado:
+            caso = self.ultimo_caso() + 1
+            self.agregar_arreglos(np.asarray(patron)[None, :3], [clase], [caso])
+
+        return caso
+
+    def agregar_datos(self, lista_diccs) -> None:
+        """
+            Agrega varios patrones al final del archivo.
+
+            Parámetros:
+            lista_diccs:
+             Lista de diccionarios de datos donde se tiene la información de los patrones;
+             No. caso, canal R, canal G, canal B, clase asignada
+        """
+
+        registros = np.array(
+            [tuple(int(fila[campo]) for campo in NOMBRE_CAMPOS) for fila in lista_diccs],
+            dtype=TIPO_REGISTRO
+        )
+
+        with AlmacenBinario._candado:
+            self._agregar_registros(registros)
+
+    def agregar_arreglos(self, patrones, clases, casos=None) -> None:
+        """
+            Agrega varios patrones sin pasar por diccionarios.
+
+            Parámetros:
+            patrones: Arreglo (N, 3) con los componentes RGB
+            clases: Arreglo (N,) con la clase de cada patrón
+            casos: Arreglo opcional (N,) con el número de caso; por defecto continúa la numeración
+        """
+
+        patrones = np.atleast_2d(np.asarray(patrones))
+
+        with AlmacenBinario._candado:
+            if casos is None:
+                casos = np.arange(1, len(patrones) + 1) + self.ultimo_caso()
+
+            registros = np.empty(len(patrones), dtype=TIPO_REGISTRO)
+            registros['CASO'] = casos
+            registros['R'] = patrones[:, 0]
+            registros['G'] = patrones[:, 1]
+            registros['B'] = patrones[:, 2]
+            registros['CLASE'] = clases
+
+            self._agregar_registros(registros)
+
+    def leer_datos(self) -> np.ndarray:
+        """
+            Devuelve todos los registros del archivo sin copiarlos.
+
+            Retorno:
+            Arreglo estructurado de sólo lectura con los campos CASO, R, G, B y CLASE
+        """
+
+        if len(self) == 0:
+            return np.empty(0, dtype=TIPO_REGISTRO)
+
+        return np.memmap(self.ruta, dtype=TIPO_REGISTRO, mode='r', shape=(len(self),))
+
+    def leer_arreglos(self) -> tuple:
+        """
+            Devuelve los patrones y sus clases como vistas sobre el archivo
+            mapeado en memoria, con la misma forma que ArchivoCSV.leer_arreglos.
+
+            Retorno:
+            Tupla con el arreglo (N, 3) uint8 de componentes RGB y el
+            arreglo (N,) uint8 de clases asignadas
+        """
+
+        if len(self) == 0:
+            return np.empty((0, 3), dtype=np.uint8), np.empty(0, dtype=np.uint8)
+
+        # Cada renglón son los 8 bytes de un registro; R, G, B están en 4:7 y CLASE en 7
+        crudo = np.memmap(self.ruta, dtype=np.uint8, mode='r', shape=(len(self), TIPO_REGISTRO.itemsize))
+
+        return crudo[:, 4:7], crudo[:, 7]
+
+    def ultimo_caso(self) -> int:
+        """
+            Devuelve el número de caso del último registro, o 0 si no hay.
+        """
+
+        n = len(self)
+
+        if n == 0:
+            return 0
+
+        with open(self.ruta, 'rb') as archivo:
+            archivo.seek((n - 1) * TIPO_REGISTRO.itemsize)
+            registro = np.frombuffer(archivo.read(TIPO_REGISTRO.itemsize), dtype=TIPO_REGISTRO)
+
+        return int(registro['CASO'][0])
+
+    def eliminar_dato(self) -> None:
+        """
+            Elimina el último registro recortando el archivo.
+        """
+
+        n = len(self)
+
+        if n > 0:
+            os.truncate(self.ruta, (n - 1) * TIPO_REGISTRO.itemsize)
+
+def importar_csv(ruta_csv='datos.csv', ruta_bin='datos.bin', tam_bloque=1000000) -> AlmacenBinario:
+    """
+        Convierte el archivo csv de patrones en un archivo de registros binarios.
+
+        Parámetros:
+        ruta_csv: Ruta del archivo csv con el encabezado CASO, R, G, B, CLASE
+        ruta_bin: Ruta del archivo binario que se crea o sobreescribe
+        tam_bloque: Renglones del csv que se convierten a la vez
+
+        Retorno:
+        Almacén sobre el archivo binario creado
+    """
+
+    temporal = ruta_bin + '.tmp'
+    almacen = AlmacenBinario(temporal)
+
+    if os.path.exists(temporal):
+        os.remove(temporal)
+
+    with open(ruta_csv, 'r') as archivo:
+        lector = csv.reader(archivo)
+        next(lector)
+
+        bloque = []
+        for fila in lector:
+            if fila:
+                bloque.append(fila)
+
+            if len(bloque) >= tam_bloque:
+                datos = np.array(bloque, dtype=np.int64)
+                almacen.agregar_arreglos(datos[:, 1:4], datos[:, 4], datos[:, 0])
+                bloque = []
+
+        if bloque:
+            datos = np.array(bloque, dtype=np.int64)
+            almacen.agregar_arreglos(datos[:, 1:4], datos[:, 4], datos[:, 0])
+
+    # Se crea el archivo vacío si el csv no tenía patrones
+    open(temporal, 'ab').close()
+    os.replace(temporal, ruta_bin)
+
+    return AlmacenBinario(ruta_bin)
+
+def exportar_csv(almacen, ruta_csv='datos.csv', tam_bloque=1000000) -> None:
+    """
+        Escribe los registros de un almacén binario en el formato csv
+        que usa ArchivoCSV.
+
+        Parámetros:
+        almacen: AlmacenBinario de origen
+        ruta_csv: Ruta del archivo csv que se sobreescribe
+        tam_bloque: Registros que se escriben a la vez
+    """
+
+    registros = almacen.leer_datos()
+
+    with open(ruta_csv, 'w') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(NOMBRE_CAMPOS)
+
+        for inicio in range(0, len(registros), tam_bloque):
+            bloque = registros[inicio:inicio + tam_bloque]
+            escritor.writerows(zip(*(bloque[campo].tolist() for campo in NOMBRE_CAMPOS)))
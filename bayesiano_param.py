@@ -7,19 +7,34 @@
 
     Librerías:
     tkinter: Kit de herramientas GUI.
+    os: Construir la ruta de la imágen segmentada
     cv2: Abrir imágen y extraer RGB de pixel seleccionado
     numpy: Convertir valores RGB en vector numpy para fácil operación de vectores
-    dis_euclidiana: Implementación del algoritmo de distancia euclidiana
+    caracteristicas: Clasificar en otros espacios de color
+    motor: Clasificador bayesiano paramétrico ajustado con el conjunto de datos
+    modelo_bayesiano: Reglas de decisión disponibles
+    segmentacion: Superponer las regiones coloreadas sobre la imágen
+    tareas: Cargar el modelo y clasificar en segundo plano sin congelar la ventana
+    visor: Mostrar las imágenes de OpenCV sin bloquear a tkinter
+    registro: Modelos compartidos con las demás ventanas de la aplicación
 """
 
 from tkinter import *
 from tkinter import ttk
 from tkinter import filedialog, messagebox
 
+import os
+
 import cv2
 import numpy as np
 
-from dis_euclidiana import distancia_euclidiana
+from caracteristicas import ClasificadorCaracteristicas
+from modelo_bayesiano import REGLAS
+from motor import ClasificadorBayesiano, mensaje_clase
+from registro import RegistroModelos
+from segmentacion import superponer
+from tareas import GestorTareas, PanelTareas, segmentar_por_franjas
+from visor import InspectorPixeles, VisorImagen
 
 class DistanciaEuclidiana():
     """
@@ -28,13 +43,45 @@ class DistanciaEuclidiana():
         de clasificación de distancia euclidiana, y enviar una respuesta al usuario final.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, regla='euclidiana', etapa=None, maestro=None, registro=None) -> None:
         """
             Constructor de la clase.
+
+            Parámetros:
+            regla: Regla de decisión inicial ('euclidiana', 'mahalanobis' o 'gaussiana')
+            etapa: EtapaCaracteristicas opcional para clasificar en otro espacio de color
+            maestro: Ventana de la aplicación; sin ella la GUI crea su propia ventana principal
+            registro: RegistroModelos compartido con las demás ventanas
         """
 
-        nueva_ventana = Tk()
+        # Modelo compartido con las demás ventanas, y la vista con la regla de esta ventana
+        self.modelo = None
+        self.motor = None
+        self.registro = registro if registro is not None else RegistroModelos()
+
+        if etapa is None:
+            self.clave = 'bayesiano'
+            crear = lambda almacen: ClasificadorBayesiano(regla, almacen)
+        else:
+            self.clave = f'bayesiano {"+".join(etapa.espacios)} textura={etapa.textura} radio={etapa.radio}'
+            crear = lambda almacen: ClasificadorCaracteristicas(ClasificadorBayesiano(regla), etapa, almacen)
+
+        self.registro.adquirir(self.clave)
+
+        # Otras ventanas usan el mismo modelo desde sus propios hilos
+        self.candado = self.registro.candado(self.clave)
+
+        # Dentro de la aplicación es una ventana secundaria; sola, es la principal
+        if maestro is None:
+            nueva_ventana = Tk()
+        else:
+            nueva_ventana = Toplevel(maestro)
+
         nueva_ventana.title('Distancia Euclidiana')
+        nueva_ventana.protocol('WM_DELETE_WINDOW', self.cerrar)
+        self.ventana = nueva_ventana
+        self.v_imagen = None
+        self.v_segmentacion = None
 
         #------------- VARIABLES GLOBALES -------------
         self.dir_img = StringVar()
@@ -65,6 +112,14 @@ class DistanciaEuclidiana():
         self.e_blue = ttk.Entry(frm_principal, justify='center')
         self.e_blue.grid(row=3, column=1)
 
+        l_regla = ttk.Label(frm_principal, text="Regla:")
+        l_regla.grid(row=4, column=0)
+
+        self.c_regla = ttk.Combobox(frm_principal, values=REGLAS, state='readonly', justify='center')
+        self.c_regla.set(regla)
+        self.c_regla.bind('<<ComboboxSelected>>', self.evento_regla)
+        self.c_regla.grid(row=4, column=1)
+
         #------------- BOTONES -------------
         btn_euc_manual = ttk.Button(frm_principal, text='Patrón digitado', command=self.evento_manual)
         btn_euc_manual.grid(row=5, column=0)
@@ -72,10 +127,31 @@ class DistanciaEuclidiana():
         btn_euclidiano = ttk.Button(frm_principal, text='Desde imagen', command=self.abrir_imagen)
         btn_euclidiano.grid(row=5, column=1)
 
+        btn_segmentar = ttk.Button(frm_principal, text='Segmentar imagen', command=self.evento_segmentar)
+        btn_segmentar.grid(row=6, column=0, columnspan=2)
+
+        self.tareas = GestorTareas(nueva_ventana)
+        self.panel = PanelTareas(frm_principal, self.tareas, 8)
+
         for child in frm_principal.winfo_children():
             child.grid_configure(padx=5, pady=5)
 
-        nueva_ventana.mainloop()
+        # Si otra ventana ya cargó el modelo se usa de inmediato; si no, se carga en segundo plano
+        modelo = self.registro.modelo(self.clave)
+
+        if modelo is not None:
+            self.modelo_cargado(modelo)
+        else:
+            self.tareas.enviar(
+                self.registro.obtener, self.clave, crear,
+                descripcion='Ajustando el modelo...',
+                al_terminar=self.modelo_cargado,
+                al_fallar=self.error_tarea
+            )
+
+        if maestro is None:
+            nueva_ventana.mainloop()
+            self.registro.cerrar()
 
     def abrir_imagen(self) -> None:
         """
@@ -84,6 +160,9 @@ class DistanciaEuclidiana():
             su posterior uso en otro método.
         """
 
+        if not self.modelo_listo():
+            return
+
         try:
             archivo = filedialog.askopenfilename(
                 title="Seleccionar imagen", 
@@ -96,12 +175,24 @@ class DistanciaEuclidiana():
         except:
             messagebox.showerror('Error', 'No se seleccionó ninguna imagen.')
 
+    def evento_regla(self, event) -> None:
+        """
+            Cambia la regla de decisión de esta ventana por la elegida en
+            la lista; las demás ventanas conservan la suya.
+        """
+
+        if self.modelo is not None:
+            self.motor = self.modelo.con_regla(self.c_regla.get())
+
+            # Las clases y distancias mostradas sobre la imágen eran de la regla anterior
+            if self.v_imagen is not None and self.v_imagen.abierto:
+                self.v_imagen.reiniciar(self.motor)
+
     def clasificar(self, patron) -> str:
         """
             Cálcula las distancias del patrón seleccionado en la
-            imágen con respecto a los centroides de las 3 regiones,
-            luego compara las distancias para encontrar la menor y
-            asignar la clase correspondiente.
+            imágen con respecto a las medias aprendidas de las 3
+            regiones, y le asigna la clase que elige la regla de decisión.
 
             Parámetros:
             patron: Arreglo numpy de los componentes RGB de un pixel
@@ -113,20 +204,17 @@ class DistanciaEuclidiana():
             C3: Clase tierra
         """
 
-        clase_asignada = ""
-
-        d_c1 = distancia_euclidiana(patron, (203, 212, 218))
-        d_c2 = distancia_euclidiana(patron, (102, 92, 41))
-        d_c3 = distancia_euclidiana(patron, (181, 146, 109))
+        with self.candado:
+            return mensaje_clase(self.motor.predecir(patron))
 
-        if d_c1 > d_c2 > d_c3 or d_c2 > d_c1 > d_c3:
-            clase_asignada = "El patrón pertenece a la clase C3"
-        elif d_c1 > d_c3 > d_c2 or d_c3 > d_c1 > d_c2:
-            clase_asignada = "El patrón pertenece a la clase C2"
-        elif d_c3 > d_c2 > d_c1 or d_c2 > d_c3 > d_c1:
-            clase_asignada = "El patrón pertenece a la clase C1"
+    def clasificar_pixel(self, x, y) -> int:
+        """
+            Clasifica el pixel (x, y) de la imágen abierta; con textura la
+            clase depende de su vecindad y no sólo de su color.
+        """
 
-        return clase_asignada
+        with self.candado:
+            return self.motor.predecir_pixel(self.img, x, y)
 
     def evento_manual(self) -> None:
         """
@@ -136,28 +224,126 @@ class DistanciaEuclidiana():
             asignada al patrón que digitó.
         """
 
+        if not self.modelo_listo():
+            return
+
         try:
             red = float(self.e_red.get())
             green = float(self.e_green.get())
             blue = float(self.e_blue.get())
 
             patron = np.array( (red, green, blue) )
+        except:
+            messagebox.showerror('Error de valor', 'Ingrese un valor válido RGB.')
+            return
+
+        self.tareas.enviar(
+            self.clasificar, patron,
+            descripcion='Clasificando...',
+            al_terminar=lambda clase: messagebox.showinfo('Clasificación', clase),
+            al_fallar=self.error_tarea
+        )
 
-            clase = self.clasificar(patron)
+    def evento_segmentar(self) -> None:
+        """
+            Permite elegir una imágen, la segmenta completa en las 3 regiones
+            en segundo plano, guarda la superposición coloreada junto a la
+            imágen original y se la muestra al usuario.
+        """
+
+        if not self.modelo_listo():
+            return
 
-            messagebox.showinfo(
-                'Clasificación',
-                clase
+        try:
+            archivo = filedialog.askopenfilename(
+                title="Seleccionar imagen", 
+                filetypes=(("PNG", "*.png"), ("JPG", "*.jpg"), ("JPEG", "*.jpeg"))
             )
+
+            img = cv2.imread(archivo, 1)
+            if img is None:
+                raise ValueError
+
+            ruta_salida = os.path.splitext(archivo)[0] + '_segmentada.png'
         except:
-            messagebox.showerror('Error de valor', 'Ingrese un valor válido RGB.')
+            messagebox.showerror('Error', 'No se seleccionó ninguna imagen.')
+            return
+
+        self.tareas.enviar(
+            self.segmentar, img, ruta_salida,
+            descripcion='Segmentando...',
+            al_terminar=self.mostrar_segmentacion,
+            al_fallar=self.error_tarea,
+            con_tarea=True
+        )
+
+    def segmentar(self, tarea, img, ruta_salida) -> np.ndarray:
+        """
+            Segmenta la imágen por franjas en un hilo trabajador y guarda la
+            superposición junto a la original.
+
+            Retorno:
+            Imágen con las regiones coloreadas superpuestas
+        """
+
+        mapa = segmentar_por_franjas(tarea, self.motor, img, ruta_salida, candado=self.candado)
+
+        return superponer(img, mapa)
+
+    def mostrar_segmentacion(self, superposicion) -> None:
+        """
+            Muestra la imágen segmentada; si ya hay una abierta la reemplaza.
+        """
+
+        if self.v_segmentacion is not None and self.v_segmentacion.abierto:
+            self.v_segmentacion.mostrar(superposicion)
+        else:
+            self.v_segmentacion = VisorImagen(self.ventana, f'{self.ventana.title()} - segmentacion', superposicion)
+
+    def modelo_cargado(self, motor) -> None:
+        """
+            Recibe el clasificador compartido y toma una vista con la regla
+            elegida en esta ventana, sin cambiar la de las demás.
+        """
+
+        self.modelo = motor
+        self.motor = motor.con_regla(self.c_regla.get())
+
+    def modelo_listo(self) -> bool:
+        """
+            Indica si el clasificador ya se cargó, y si no, se lo avisa al usuario.
+        """
+
+        if self.motor is None:
+            messagebox.showwarning('Espere', 'El modelo todavía no está cargado.')
+            return False
+
+        return True
+
+    def error_tarea(self, error) -> None:
+        messagebox.showerror('Error', str(error))
+
+    def cerrar(self) -> None:
+        """
+            Cierra la ventana y sus imágenes; el modelo queda en el registro
+            para la próxima vez que se abra el método.
+        """
+
+        self.tareas.cerrar()
+
+        for visor in (self.v_imagen, self.v_segmentacion):
+            if visor is not None:
+                visor.cerrar()
+
+        self.registro.liberar(self.clave)
+        self.ventana.destroy()
 
     def m_event(self, event, x, y, flags, params) -> None:
         """
             Detecta cuando se ha hecho un clic en la imágen,
             y según las coordenadas extrae los componentes RGB,
-            los procesa con el método clasificar, y finalmente 
-            imprime en consola la clase asignada.
+            los procesa con el método clasificar, y finalmente
+            muestra en una ventana emergente el color y la clase asignada.
 
             Parámetros:
             event: Evento detectado
@@ -167,38 +353,39 @@ class DistanciaEuclidiana():
             params: datos de usuario que se pasan cuando se devuelve la llamada
         """
 
-        # Evento con mouse, descomentar uno de los dos
-        #if event == cv2.EVENT_MOUSEMOVE:
-
-        # Evento con clic
+        # El movimiento del mouse lo atiende el InspectorPixeles, que muestra la clase sobre la imágen
         if event == cv2.EVENT_LBUTTONDOWN:
             b = self.img[y, x, 0]
             g = self.img[y, x, 1]
             r = self.img[y, x, 2]
-            print(r, g, b)
-
-            patron = np.array( (r, g, b) )
 
-            print(self.clasificar(patron))
-            
-            cv2.imshow('image', self.img)
+            # Las características de la imágen se calculan en el primer clic y se reutilizan
+            self.tareas.enviar(
+                self.clasificar_pixel, x, y,
+                descripcion='Clasificando...',
+                al_terminar=lambda clase: messagebox.showinfo('Clasificación', f'RGB ({r}, {g}, {b})\n{mensaje_clase(clase)}'),
+                al_fallar=self.error_tarea
+            )
 
     def trabajar_imagen(self) -> None:
         """
             Abre la imágen indicada por la ruta relativa para luego
-            mostrarla al usuario en un bucle infinito hasta que decida
-            cerrarla, y espera a que el vento de clic ocurra.
+            mostrarla al usuario hasta que decida cerrarla, atendiendo
+            los eventos de clic y mostrando la clase del pixel bajo el
+            cursor mientras la ventana principal sigue activa.
         """
 
         self.img = cv2.imread(self.dir_img, 1)
-    
-        cv2.imshow('image', self.img)
-    
-        cv2.setMouseCallback('image', self.m_event)
-    
-        cv2.waitKey(0)
-    
-        cv2.destroyAllWindows()
+
+        if self.v_imagen is not None:
+            self.v_imagen.cerrar()
+
+        # La ventana de OpenCV se revisa desde el ciclo de tkinter, sin bloquearlo, y
+        # clasifica el pixel bajo el cursor mientras la imágen se clasifica en segundo plano
+        self.v_imagen = InspectorPixeles(
+            self.ventana, f'{self.ventana.title()} - imagen', self.img, self.motor, self.tareas, self.m_event,
+            candado=self.candado
+        )
 
 if __name__ == "__main__":
     DistanciaEuclidiana()
@@ -0,0 +1,282 @@
+"""
+    Título del proyecto: MEDICIÓN DE RENDIMIENTO
+    Descripción del proyecto: Mide con el motor, sin interfaz gráfica, la latencia y el rendimiento de los 3 clasificadores
+    y del manejo del archivo csv, guarda los resultados en JSON y los compara con una medición base.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    argparse: Opciones de la línea de comandos
+    contextlib: Silenciar los mensajes de consola de los clasificadores
+    json: Guardar y leer los resultados
+    os, platform, shutil, sys, tempfile, time: Entorno, archivos temporales y reloj
+    cv2: Abrir las imágenes de prueba
+    numpy: Generar patrones y datos sintéticos
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from almacen_binario import importar_csv
+from modelo_mlp import PARAMETROS_MLP
+from motor import ClasificadorEuclidiano, ClasificadorKNN, ClasificadorMLP, mensaje_clase
+from trabajar_csv import ArchivoCSV
+
+IMAGENES = ('imagen1.png', 'img_prueba_2.jpg')
+TAMANOS_CSV = (10000, 100000, 1000000)
+
+def _cronometrar(funcion, repeticiones, preparar=None) -> list:
+    """
+        Ejecuta la función varias veces y devuelve el tiempo de cada una en
+        segundos; preparar, si se indica, se ejecuta antes de cada una sin
+        contar su tiempo.
+    """
+
+    tiempos = []
+
+    for _ in range(repeticiones):
+        if preparar is not None:
+            preparar()
+
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    return tiempos
+
+def _metrica(valor, unidad, mejor) -> dict:
+    """
+        Empaqueta una medición; mejor indica si conviene un valor 'menor' o 'mayor'.
+    """
+
+    return {'valor': valor, 'unidad': unidad, 'mejor': mejor}
+
+def medir_clasificadores(dir_trabajo, repeticiones, iteraciones_mlp) -> dict:
+    """
+        Mide la latencia por pixel y el rendimiento por imágen de los
+        3 clasificadores, y el tiempo de entrenamiento del perceptrón.
+
+        Parámetros:
+        dir_trabajo: Carpeta temporal; K-NN agrega patrones a una copia de datos.csv
+        repeticiones: Veces que se repite cada medición
+        iteraciones_mlp: Valor de max_iter del perceptrón que se entrena
+
+        Retorno:
+        Diccionario de métricas
+    """
+
+    resultados = {}
+
+    copia_csv = os.path.join(dir_trabajo, 'datos.csv')
+    shutil.copyfile('datos.csv', copia_csv)
+    almacen = ArchivoCSV(copia_csv)
+    patrones, clases = almacen.leer_arreglos()
+
+    mlp = ClasificadorMLP(parametros=dict(PARAMETROS_MLP, max_iter=iteraciones_mlp))
+    inicio = time.perf_counter()
+    mlp.ajustar(patrones, clases)
+    resultados['mlp.entrenamiento'] = _metrica(time.perf_counter() - inicio, 's', 'menor')
+
+    euclidiano = ClasificadorEuclidiano()
+    knn = ClasificadorKNN(almacen=almacen).ajustar(patrones, clases)
+
+    # Cada función hace lo mismo que el método clasificar de su GUI
+    clasificadores = {
+        'euclidiana': (euclidiano, lambda patron: mensaje_clase(euclidiano.predecir(patron))),
+        'knn': (knn, lambda patron: mensaje_clase(knn.predecir_y_agregar(patron))),
+        'mlp': (mlp, lambda patron: mensaje_clase(mlp.predecir(patron)))
+    }
+
+    generador = np.random.default_rng(0)
+
+    for nombre, (clasificador, clasificar) in clasificadores.items():
+        pixeles = generador.integers(0, 256, (repeticiones, 3), dtype=np.uint8)
+        iterador = iter(pixeles)
+
+        tiempos = _cronometrar(lambda: clasificar(next(iterador)), repeticiones)
+        resultados[f'{nombre}.latencia_pixel'] = _metrica(float(np.median(tiempos)) * 1e6, 'us', 'menor')
+
+        for ruta in IMAGENES:
+            img = cv2.imread(ruta, 1)
+            tiempos = _cronometrar(lambda: clasificador.segmentar_imagen(img), max(1, repeticiones // 100))
+            pixeles_por_segundo = img.shape[0] * img.shape[1] / min(tiempos)
+            resultados[f'{nombre}.lote.{ruta}'] = _metrica(pixeles_por_segundo, 'pixeles/s', 'mayor')
+
+    almacen.vaciar_buffer()
+
+    return resultados
+
+def _generar_csv(ruta, filas) -> None:
+    """
+        Escribe un archivo csv sintético con el formato de datos.csv.
+    """
+
+    generador = np.random.default_rng(filas)
+    datos = np.empty((filas, 5), dtype=np.int64)
+    datos[:, 0] = np.arange(1, filas + 1)
+    datos[:, 1:4] = generador.integers(0, 256, (filas, 3))
+    datos[:, 4] = generador.integers(1, 4, filas)
+
+    np.savetxt(ruta, datos, fmt='%d', delimiter=',', header='CASO,R,G,B,CLASE', comments='')
+
+def medir_almacenamiento(dir_trabajo, tamanos, repeticiones=5) -> dict:
+    """
+        Mide lectura, agregado y eliminación de un patrón en ArchivoCSV y
+        AlmacenBinario para archivos de distintos tamaños. Cada operación
+        se repite y se guarda la mediana, como la latencia de los
+        clasificadores; cada patrón agregado se elimina después, así el
+        archivo conserva su tamaño entre repeticiones.
+
+        Parámetros:
+        dir_trabajo: Carpeta temporal donde se generan los archivos
+        tamanos: Número de renglones de cada archivo
+        repeticiones: Veces que se repite cada medición
+
+        Retorno:
+        Diccionario de métricas
+    """
+
+    resultados = {}
+    fila = {'CASO': 0, 'R': 1, 'G': 2, 'B': 3, 'CLASE': 1}
+
+    def guardar(nombre, tiempos) -> None:
+        resultados[nombre] = _metrica(float(np.median(tiempos)), 's', 'menor')
+
+    def agregar_eliminar(almacen, agregar) -> tuple:
+        agregados, eliminados = [], []
+
+        for _ in range(repeticiones):
+            agregados += _cronometrar(agregar, 1)
+            eliminados += _cronometrar(almacen.eliminar_dato, 1)
+
+        return agregados, eliminados
+
+    for filas in tamanos:
+        ruta_csv = os.path.join(dir_trabajo, f'datos_{filas}.csv')
+        _generar_csv(ruta_csv, filas)
+
+        archivo = ArchivoCSV(ruta_csv)
+
+        # Lectura en frío: sin la caché de ArchivoCSV
+        guardar(f'csv.{filas}.leer', _cronometrar(archivo.leer_datos, repeticiones, ArchivoCSV._cache.clear))
+        guardar(f'csv.{filas}.leer_cache', _cronometrar(archivo.leer_datos, repeticiones))
+
+        def agregar_csv() -> None:
+            archivo.escribir_dato(dict(fila, CASO=filas + 1))
+            archivo.vaciar_buffer()
+
+        agregados, eliminados = agregar_eliminar(archivo, agregar_csv)
+        guardar(f'csv.{filas}.agregar', agregados)
+        guardar(f'csv.{filas}.eliminar', eliminados)
+
+        ArchivoCSV._cache.clear()
+
+        almacen = importar_csv(ruta_csv, os.path.join(dir_trabajo, f'datos_{filas}.bin'))
+        os.remove(ruta_csv)
+
+        guardar(f'bin.{filas}.leer', _cronometrar(lambda: almacen.leer_arreglos()[0].sum(), repeticiones))
+
+        agregados, eliminados = agregar_eliminar(almacen, lambda: almacen.escribir_dato(dict(fila, CASO=filas + 1)))
+        guardar(f'bin.{filas}.agregar', agregados)
+        guardar(f'bin.{filas}.eliminar', eliminados)
+
+        os.remove(almacen.ruta)
+
+    return resultados
+
+def comparar(actual, base, tolerancia) -> list:
+    """
+        Compara dos mediciones y devuelve las métricas que empeoraron más
+        que la tolerancia relativa.
+
+        Parámetros:
+        actual: Resultados de la medición actual
+        base: Resultados de la medición base
+        tolerancia: Fracción de empeoramiento permitida, por ejemplo 0.2
+
+        Retorno:
+        Lista de tuplas (nombre, valor base, valor actual)
+    """
+
+    regresiones = []
+
+    for nombre, metrica in actual.items():
+        if nombre not in base:
+            continue
+
+        anterior = base[nombre]['valor']
+        valor = metrica['valor']
+
+        if metrica['mejor'] == 'menor':
+            empeoro = valor > anterior * (1 + tolerancia)
+        else:
+            empeoro = valor < anterior * (1 - tolerancia)
+
+        if empeoro:
+            regresiones.append((nombre, anterior, valor))
+
+    return regresiones
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description='Mide el rendimiento de los clasificadores y del archivo csv.')
+    parser.add_argument('--salida', default='-', help="Archivo JSON de resultados, '-' para la consola")
+    parser.add_argument('--comparar', help='Archivo JSON de una medición base')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='Empeoramiento relativo permitido')
+    parser.add_argument('--repeticiones', type=int, default=200, help='Repeticiones de las mediciones por pixel')
+    parser.add_argument('--iteraciones-mlp', type=int, default=PARAMETROS_MLP['max_iter'], help='max_iter del perceptrón')
+    parser.add_argument('--tamanos', type=int, nargs='*', default=list(TAMANOS_CSV), help='Renglones de los csv sintéticos')
+    parser.add_argument('--repeticiones-almacen', type=int, default=5, help='Repeticiones de las mediciones del almacenamiento')
+    args = parser.parse_args(argumentos)
+
+    resultados = {}
+
+    # Los clasificadores imprimen mensajes en consola, que no deben mezclarse con el JSON
+    with tempfile.TemporaryDirectory() as dir_trabajo, open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        resultados.update(medir_clasificadores(dir_trabajo, args.repeticiones, args.iteraciones_mlp))
+        resultados.update(medir_almacenamiento(dir_trabajo, args.tamanos, args.repeticiones_almacen))
+
+    informe = {
+        'entorno': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'nucleos': os.cpu_count()
+        },
+        'resultados': resultados
+    }
+
+    texto = json.dumps(informe, indent=2)
+
+    if args.salida == '-':
+        print(texto)
+    else:
+        with open(args.salida, 'w') as archivo:
+            archivo.write(texto)
+
+    if args.comparar:
+        with open(args.comparar, 'r') as archivo:
+            base = json.load(archivo)['resultados']
+
+        regresiones = comparar(resultados, base, args.tolerancia)
+
+        for nombre, anterior, valor in regresiones:
+            print(f'REGRESIÓN {nombre}: {anterior:.6g} -> {valor:.6g}', file=sys.stderr)
+
+        if regresiones:
+            return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
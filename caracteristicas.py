@@ -0,0 +1,318 @@
+"""
+    Título del proyecto: ETAPA DE CARACTERÍSTICAS
+    Descripción del proyecto: Convierte los pixeles a otros espacios de color (HSV, Lab, cromaticidad) y a medidas de
+    textura local antes de clasificarlos, con las características de cada imágen calculadas una sola vez.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    weakref: Recordar la última imágen procesada sin impedir que se libere
+    cv2: Conversiones de espacio de color y filtros de caja vectorizados
+    numpy: Operar las características como arreglos
+    motor: Interfaz común de los clasificadores
+    segmentacion: Guardar la imágen con las regiones coloreadas
+
+    Todas las características quedan aproximadamente en el rango 0 a 255,
+    como los componentes RGB, para que ninguna domine las distancias.
+"""
+
+import weakref
+
+import cv2
+import numpy as np
+
+from motor import Clasificador
+from segmentacion import guardar_superposicion
+
+# Componentes que aporta cada espacio de color
+ESPACIOS = {
+    'rgb': 3,
+    # El tono es circular, se representa con su coseno y su seno
+    'hsv': 4,
+    'lab': 3,
+    # r = R / (R + G + B) y g = G / (R + G + B); b se deduce de las otras dos
+    'cromaticidad': 2
+}
+
+# Media y desviación estándar locales del brillo
+COMPONENTES_TEXTURA = 2
+
+# Imágenes más grandes se convierten por renglones para acotar la memoria temporal
+TAM_BLOQUE = 1 << 20
+
+class EtapaCaracteristicas():
+    """
+        Calcula el vector de características de cada pixel. Los espacios de
+        color dependen sólo del color del pixel; la textura depende además
+        de su vecindad, por lo que sólo se puede calcular sobre una imágen.
+        Con textura, los patrones sueltos deben traer la media y desviación
+        locales que se midieron en su imágen de origen, ver muestras; sin
+        ellas se entrenaría con una textura distinta de la que se predice.
+    """
+
+    def __init__(self, espacios=('rgb',), textura=False, radio=2) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            espacios: Espacios de color que se concatenan, llaves de ESPACIOS
+            textura: Si se agregan la media y desviación locales del brillo
+            radio: Radio en pixeles de la ventana de textura
+        """
+
+        for espacio in espacios:
+            if espacio not in ESPACIOS:
+                raise ValueError(f'Espacio de color desconocido: {espacio}')
+
+        self.espacios = tuple(espacios)
+        self.textura = textura
+        self.radio = radio
+
+        self._imagen = None
+        self._caracteristicas = None
+
+    @property
+    def dimension(self) -> int:
+        """
+            Número de componentes del vector de características.
+        """
+
+        return sum(ESPACIOS[espacio] for espacio in self.espacios) + (COMPONENTES_TEXTURA if self.textura else 0)
+
+    def _de_bgr(self, bgr) -> np.ndarray:
+        """
+            Características de color de una imágen BGR (alto, ancho, 3) uint8.
+        """
+
+        partes = []
+
+        for espacio in self.espacios:
+            if espacio == 'rgb':
+                partes.append(bgr[:, :, ::-1].astype(np.float32))
+            elif espacio == 'hsv':
+                hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV_FULL).astype(np.float32)
+                angulo = hsv[:, :, 0] * np.float32(2 * np.pi / 256)
+                partes.append((127.5 * (1 + np.cos(angulo)))[:, :, None])
+                partes.append((127.5 * (1 + np.sin(angulo)))[:, :, None])
+                partes.append(hsv[:, :, 1:])
+            elif espacio == 'lab':
+                partes.append(cv2.cvtColor(bgr, cv2.COLOR_BGR2Lab).astype(np.float32))
+            elif espacio == 'cromaticidad':
+                rgb = bgr[:, :, ::-1].astype(np.float32)
+                suma = rgb.sum(axis=2, keepdims=True)
+                # El negro no tiene cromaticidad, se le asigna la del gris
+                cromaticidad = np.full(rgb.shape[:2] + (2,), 1 / 3, dtype=np.float32)
+                np.divide(rgb[:, :, :2], suma, out=cromaticidad, where=suma > 0)
+                partes.append(255 * cromaticidad)
+
+        return np.concatenate(partes, axis=2)
+
+    def de_colores(self, patrones) -> np.ndarray:
+        """
+            Características de patrones sueltos.
+
+            Parámetros:
+            patrones: Arreglo (N, 3) con los componentes RGB; con textura,
+             (N, 3 + COMPONENTES_TEXTURA) con la media y desviación locales después del color
+
+            Retorno:
+            Arreglo (N, dimension) float32
+        """
+
+        patrones = np.atleast_2d(np.asarray(patrones))
+        columnas = 3 + (COMPONENTES_TEXTURA if self.textura else 0)
+
+        if patrones.shape[1] != columnas:
+            if self.textura:
+                raise ValueError('Con textura cada patrón necesita la media y desviación locales de su imágen; '
+                                 'el almacén sólo guarda RGB, ver EtapaCaracteristicas.muestras.')
+            raise ValueError(f'Se esperaban patrones de {columnas} componentes.')
+
+        # Los patrones se ven como una imágen BGR de una columna
+        bgr = np.ascontiguousarray(patrones[:, None, 2::-1].astype(np.uint8))
+        caracteristicas = self._de_bgr(bgr)[:, 0, :]
+
+        if self.textura:
+            caracteristicas = np.column_stack((caracteristicas, patrones[:, 3:].astype(np.float32)))
+
+        return caracteristicas
+
+    def muestras(self, img, filas, columnas) -> np.ndarray:
+        """
+            Patrones de entrenamiento de pixeles de una imágen, con la
+            textura de su vecindad cuando la etapa la usa, para ajustar un
+            ClasificadorCaracteristicas con la misma textura con la que luego
+            predice.
+
+            Parámetros:
+            img: Arreglo numpy BGR tal como lo devuelve cv2.imread
+            filas: Arreglo (N,) con el renglón de cada pixel
+            columnas: Arreglo (N,) con la columna de cada pixel
+
+            Retorno:
+            Arreglo (N, 3) con los componentes RGB, o (N, 3 + COMPONENTES_TEXTURA) float32 con textura
+        """
+
+        rgb = img[filas, columnas, ::-1]
+
+        if not self.textura:
+            return rgb
+
+        textura = self.de_imagen(img)[filas, columnas, -COMPONENTES_TEXTURA:]
+
+        return np.column_stack((rgb.astype(np.float32), textura))
+
+    def de_imagen(self, img) -> np.ndarray:
+        """
+            Características de todos los pixeles de una imágen. El resultado
+            se guarda para la última imágen recibida, así los clics y la
+            segmentación sobre la misma imágen no las vuelven a calcular.
+
+            Parámetros:
+            img: Arreglo numpy BGR tal como lo devuelve cv2.imread
+
+            Retorno:
+            Arreglo (alto, ancho, dimension) float32; no debe modificarse
+        """
+
+        if self._imagen is not None and self._imagen() is img:
+            return self._caracteristicas
+
+        alto, ancho = img.shape[:2]
+        caracteristicas = np.empty((alto, ancho, self.dimension), dtype=np.float32)
+
+        paso = max(1, TAM_BLOQUE // max(ancho, 1))
+        color = self.dimension - (COMPONENTES_TEXTURA if self.textura else 0)
+
+        for y in range(0, alto, paso):
+            caracteristicas[y:y + paso, :, :color] = self._de_bgr(img[y:y + paso])
+
+        if self.textura:
+            brillo = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY).astype(np.float32)
+            ventana = (2 * self.radio + 1, 2 * self.radio + 1)
+
+            media = cv2.boxFilter(brillo, -1, ventana, borderType=cv2.BORDER_REFLECT)
+            cuadrados = cv2.boxFilter(brillo * brillo, -1, ventana, borderType=cv2.BORDER_REFLECT)
+
+            caracteristicas[:, :, color] = media
+            caracteristicas[:, :, color + 1] = np.sqrt(np.maximum(cuadrados - media * media, 0))
+
+        self._imagen = weakref.ref(img)
+        self._caracteristicas = caracteristicas
+
+        return caracteristicas
+
+class ClasificadorCaracteristicas(Clasificador):
+    """
+        Envuelve a cualquier clasificador del motor para que aprenda y
+        prediga sobre las características de la etapa en lugar de los
+        componentes RGB. Recibe y entrega lo mismo que los demás
+        clasificadores, así que sirve en la GUI, la segmentación por lotes
+        y la tabla de consulta (ésta última sólo sin textura).
+    """
+
+    def __init__(self, base, etapa, almacen=None) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            base: Clasificador del motor sin ajustar
+            etapa: EtapaCaracteristicas que transforma los patrones
+            almacen: Origen de los patrones de entrenamiento, por defecto datos.csv
+        """
+
+        self.base = base
+        self.etapa = etapa
+        self.almacen = almacen
+
+    def cargar(self) -> 'ClasificadorCaracteristicas':
+        """
+            Ajusta el clasificador base con las características de los
+            patrones del almacén; el clasificador se entrena siempre, ya
+            que los modelos guardados son sobre RGB. Los almacenes sólo
+            guardan RGB, así que con textura hay que usar ajustar con
+            patrones de EtapaCaracteristicas.muestras.
+        """
+
+        if self.etapa.textura:
+            raise ValueError('El almacén no guarda la textura de los patrones; '
+                             'ajuste el clasificador con EtapaCaracteristicas.muestras.')
+
+        if self.almacen is None:
+            from trabajar_csv import ArchivoCSV
+            self.almacen = ArchivoCSV()
+
+        # Un clasificador incremental también suma los patrones que se agreguen después
+        if hasattr(self.base, 'actualizar'):
+            self.almacen.suscribir(self._actualizar, self.ajustar)
+            return self
+
+        return self.ajustar(*self.almacen.leer_arreglos())
+
+    def _actualizar(self, patrones, clases) -> None:
+        self.base.actualizar(self.etapa.de_colores(patrones), clases)
+
+    def cerrar(self) -> None:
+        """
+            Deja de recibir los patrones del almacén y cierra el clasificador base.
+        """
+
+        if self.almacen is not None and hasattr(self.base, 'actualizar'):
+            self.almacen.desuscribir(self._actualizar)
+
+        if hasattr(self.base, 'cerrar'):
+            self.base.cerrar()
+
+    def ajustar(self, patrones, clases) -> 'ClasificadorCaracteristicas':
+        self.base.ajustar(self.etapa.de_colores(patrones), clases)
+
+        return self
+
+    def con_regla(self, regla) -> 'ClasificadorCaracteristicas':
+        """
+            Otro clasificador sobre la misma etapa cuyo clasificador base
+            usa la regla indicada, ver ClasificadorBayesiano.con_regla.
+        """
+
+        return ClasificadorCaracteristicas(self.base.con_regla(regla), self.etapa, self.almacen)
+
+    def predecir_lote(self, patrones) -> np.ndarray:
+        return self.base.predecir_lote(self.etapa.de_colores(patrones))
+
+    @property
+    def PUNTAJE(self) -> str:
+        return self.base.PUNTAJE
+
+    @property
+    def version(self) -> int:
+        return self.base.version
+
+    def puntajes_lote(self, patrones) -> tuple:
+        return self.base.puntajes_lote(self.etapa.de_colores(patrones))
+
+    def predecir_pixel(self, img, x, y) -> int:
+        return int(self.base.predecir_lote(self.etapa.de_imagen(img)[y, x][None, :])[0])
+
+    def segmentar_imagen(self, img, ruta_superposicion=None) -> np.ndarray:
+        """
+            Sin textura cada color distinto se clasifica una sola vez, igual
+            que en los demás clasificadores; con textura se clasifica cada
+            pixel con las características guardadas de la imágen.
+        """
+
+        if not self.etapa.textura:
+            return super().segmentar_imagen(img, ruta_superposicion)
+
+        caracteristicas = self.etapa.de_imagen(img).reshape(-1, self.etapa.dimension)
+
+        mapa = np.empty(len(caracteristicas), dtype=np.uint8)
+        for inicio in range(0, len(caracteristicas), TAM_BLOQUE):
+            mapa[inicio:inicio + TAM_BLOQUE] = self.base.predecir_lote(caracteristicas[inicio:inicio + TAM_BLOQUE])
+
+        mapa = mapa.reshape(img.shape[:2])
+
+        if ruta_superposicion is not None:
+            guardar_superposicion(ruta_superposicion, img, mapa)
+
+        return mapa
@@ -0,0 +1,318 @@
+"""
+    Título del proyecto: COMPACTACIÓN DEL CONJUNTO DE DATOS PARA K-NN
+    Descripción del proyecto: Reduce los patrones de entrenamiento a colores únicos o cuantizados con el número de
+    patrones de cada clase, y selecciona prototipos con vecino más cercano condensado (CNN) y editado (ENN).
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    argparse: Opciones de la línea de comandos
+    sys: Código de salida
+    numpy: Agrupar los patrones y votar con pesos
+    indice_knn: Índice espacial y votación de los vecinos
+    regiones: Patrones de prueba para medir la exactitud
+    segmentacion: Códigos de 24 bits de los colores
+
+    Ejemplo:
+    python compactacion.py --metodo cnn --bits 6 --k 3
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from indice_knn import IndiceKNN, votar_vecinos
+from regiones import REGIONES, cargar_region, dividir_como_datos
+from segmentacion import codificar_patrones, decodificar_colores
+
+METODOS_COMPACTACION = ('unicos', 'enn', 'cnn', 'enn+cnn')
+
+def compactar(patrones, clases, bits=8) -> tuple:
+    """
+        Junta los patrones repetidos de la misma clase en un solo prototipo
+        con su número de repeticiones. Con menos de 8 bits, cada componente
+        se cuantiza y el prototipo es el centro de su celda. Los
+        prototipos quedan en el orden de la primera aparición de cada
+        uno, como pide el desempate de votar_ponderado.
+
+        Parámetros:
+        patrones: Arreglo (N, 3) con los componentes RGB
+        clases: Arreglo (N,) con la clase de cada patrón
+        bits: Bits que se conservan de cada componente, de 1 a 8
+
+        Retorno:
+        Tupla (prototipos (M, 3) uint8, clases (M,) uint8, pesos (M,) int64)
+    """
+
+    patrones = np.asarray(patrones)
+
+    # Otros patrones, como los de una etapa de características, se juntarían sin aviso al convertirlos a uint8
+    if patrones.ndim != 2 or patrones.shape[1] != 3:
+        raise ValueError('La compactación sólo admite patrones RGB de 3 componentes.')
+
+    enteros = np.issubdtype(patrones.dtype, np.integer) or np.array_equal(patrones, np.round(patrones))
+
+    if len(patrones) > 0 and (not enteros or patrones.min() < 0 or patrones.max() > 255):
+        raise ValueError('La compactación sólo admite componentes enteros de 0 a 255.')
+
+    patrones = patrones.astype(np.uint8)
+    clases = np.asarray(clases, dtype=np.uint8)
+
+    corrimiento = 8 - bits
+    celdas = patrones >> corrimiento
+
+    # Llave única por color cuantizado y clase
+    llaves = codificar_patrones(celdas).astype(np.int64) * 256 + clases
+    _, primeros, inversos, conteos = np.unique(llaves, return_index=True, return_inverse=True, return_counts=True)
+
+    orden = np.argsort(primeros, kind='stable')
+
+    prototipos = celdas[primeros[orden]].astype(np.uint16) << corrimiento
+    if corrimiento > 0:
+        prototipos += 1 << (corrimiento - 1)
+
+    return prototipos.astype(np.uint8), clases[primeros[orden]], conteos[orden]
+
+def votar_ponderado(indice, pesos, patrones, k=1, desempate='cercano') -> np.ndarray:
+    """
+        K-NN sobre prototipos con peso: cada prototipo cuenta como tantos
+        vecinos como patrones representa, hasta completar k. Con prototipos
+        de compactar sin cuantizar, los votos son los mismos que con el
+        conjunto de datos completo: IndiceKNN desempata por la posición más
+        temprana y cada prototipo ocupa la de su primera aparición; sólo con
+        k > 1 y colores distintos a la misma distancia, cuyas repeticiones
+        se intercalan en los datos, el k-ésimo vecino puede cambiar.
+
+        Parámetros:
+        indice: IndiceKNN construido con los prototipos
+        pesos: Arreglo con el peso de cada prototipo, en el orden del índice
+        patrones: Arreglo (N, 3) de patrones a clasificar
+        k: Número de vecinos que votan
+        desempate: Regla de desempate, ver IndiceKNN.votar
+
+        Retorno:
+        Arreglo numpy uint8 (N,) con la clase asignada
+    """
+
+    distancias, clases, posiciones = indice.consultar(patrones, k)
+
+    pesos = np.asarray(pesos)[posiciones]
+    acumulados = np.cumsum(pesos, axis=1)
+
+    # Cada vecino aporta sólo lo que falta para llegar a k
+    efectivos = np.clip(k - (acumulados - pesos), 0, pesos)
+
+    # La suma de distancias de la regla 'distancia' también cuenta cada repetición
+    return votar_vecinos(distancias * efectivos, clases, desempate, efectivos)
+
+def editar_enn(prototipos, clases, pesos, k=3) -> np.ndarray:
+    """
+        Vecino más cercano editado (Wilson): descarta los prototipos cuya
+        clase no coincide con la votación ponderada de sus k vecinos,
+        sin contarse a sí mismos.
+
+        Parámetros:
+        prototipos: Arreglo (M, 3) de prototipos
+        clases: Arreglo (M,) con la clase de cada prototipo
+        pesos: Arreglo (M,) con el peso de cada prototipo
+        k: Número de vecinos que votan
+
+        Retorno:
+        Arreglo booleano (M,) con los prototipos que se conservan
+    """
+
+    indice = IndiceKNN(prototipos, clases)
+
+    distancias, vecinas, posiciones = indice.consultar(prototipos, k + 1)
+
+    # Se quita a cada prototipo de su propia lista de vecinos
+    propios = posiciones == np.arange(len(prototipos))[:, None]
+    propios[propios.sum(axis=1) == 0, -1] = True
+    conservar = ~propios
+
+    distancias = distancias[conservar].reshape(len(prototipos), k)
+    vecinas = vecinas[conservar].reshape(len(prototipos), k)
+    votos = np.asarray(pesos)[posiciones[conservar].reshape(len(prototipos), k)]
+
+    return votar_vecinos(distancias, vecinas, 'cercano', votos) == clases
+
+def condensar_cnn(prototipos, clases, tam_bloque=1024) -> np.ndarray:
+    """
+        Vecino más cercano condensado (Hart): escoge un subconjunto de
+        prototipos tal que 1-NN sobre él asigna a cada prototipo su propia
+        clase. Los prototipos se revisan por bloques contra el subconjunto
+        actual y los mal clasificados se agregan; se repite hasta que una
+        pasada no agrega ninguno.
+
+        Parámetros:
+        prototipos: Arreglo (M, 3) de prototipos
+        clases: Arreglo (M,) con la clase que debe reproducirse
+        tam_bloque: Prototipos que se revisan antes de agregar los mal clasificados
+
+        Retorno:
+        Arreglo de índices de los prototipos elegidos, en el orden en que se eligieron
+    """
+
+    elegidos = np.zeros(len(prototipos), dtype=bool)
+
+    # Un prototipo de cada clase para empezar
+    _, primeros = np.unique(clases, return_index=True)
+    primeros = np.sort(primeros)
+    elegidos[primeros] = True
+    orden = list(primeros)
+
+    indice = IndiceKNN(prototipos[primeros], clases[primeros])
+
+    cambio = True
+    while cambio:
+        cambio = False
+
+        for inicio in range(0, len(prototipos), tam_bloque):
+            bloque = np.arange(inicio, min(inicio + tam_bloque, len(prototipos)))
+            bloque = bloque[~elegidos[bloque]]
+
+            if len(bloque) == 0:
+                continue
+
+            errores = bloque[indice.votar(prototipos[bloque], 1) != clases[bloque]]
+
+            if len(errores) > 0:
+                indice.agregar(prototipos[errores], clases[errores])
+                elegidos[errores] = True
+                orden.extend(errores)
+                cambio = True
+
+    return np.array(orden)
+
+def seleccionar_prototipos(patrones, clases, metodo='unicos', bits=8, k=1) -> tuple:
+    """
+        Compacta el conjunto de datos y, si se pide, selecciona prototipos.
+
+        Con 'unicos' y 8 bits las decisiones son las de K-NN con todos los
+        datos, salvo el caso de empates que se describe en votar_ponderado;
+        los demás métodos las cambian. Con 'cnn' las clases objetivo son las
+        que asigna K-NN con todos los datos a cada color de entrenamiento, y
+        1-NN sobre los prototipos condensados sólo reproduce esas clases en
+        esos colores; en los demás la frontera entre clases se mueve. Con
+        'enn' se descartan los prototipos ruidosos, lo que cambia decisiones
+        a propósito, y con menos de 8 bits los prototipos se mueven al
+        centro de su celda.
+
+        Parámetros:
+        patrones: Arreglo (N, 3) con los componentes RGB
+        clases: Arreglo (N,) con la clase de cada patrón
+        metodo: 'unicos', 'enn', 'cnn' o 'enn+cnn'
+        bits: Bits que se conservan de cada componente
+        k: Vecinos del K-NN que se quiere reproducir
+
+        Retorno:
+        Tupla (prototipos, clases, pesos); con 'cnn' cada prototipo pesa 1
+    """
+
+    if metodo not in METODOS_COMPACTACION:
+        raise ValueError(f'Método de compactación desconocido: {metodo}')
+
+    prototipos, clases_p, pesos = compactar(patrones, clases, bits)
+
+    if 'enn' in metodo:
+        conservar = editar_enn(prototipos, clases_p, pesos, max(k, 3))
+        prototipos, clases_p, pesos = prototipos[conservar], clases_p[conservar], pesos[conservar]
+
+    if 'cnn' in metodo:
+        # Decisión de K-NN ponderado en cada color distinto
+        colores = np.unique(codificar_patrones(prototipos))
+        colores = decodificar_colores(colores)
+        objetivo = votar_ponderado(IndiceKNN(prototipos, clases_p), pesos, colores, k)
+
+        elegidos = condensar_cnn(colores, objetivo)
+        prototipos, clases_p = colores[elegidos], objetivo[elegidos]
+        pesos = np.ones(len(prototipos), dtype=np.int64)
+
+    return prototipos, clases_p, pesos
+
+def informe_compactacion(patrones, clases, metodo='unicos', bits=8, k=1, prueba=None) -> dict:
+    """
+        Mide la reducción y el cambio de exactitud de la compactación.
+
+        Parámetros:
+        patrones: Arreglo (N, 3) con los componentes RGB de entrenamiento
+        clases: Arreglo (N,) con la clase de cada patrón
+        metodo: Método de seleccionar_prototipos
+        bits: Bits que se conservan de cada componente
+        k: Número de vecinos que votan
+        prueba: Tupla opcional (patrones, clases) para medir la exactitud;
+         por defecto los patrones de cada región que no están en datos.csv
+
+        Retorno:
+        Diccionario con el número de patrones y prototipos, la reducción,
+        la exactitud con ambos conjuntos, su diferencia y la fracción de
+        decisiones iguales
+    """
+
+    if prueba is None:
+        prueba = patrones_prueba()
+
+    patrones_eval, clases_eval = prueba
+
+    completo = IndiceKNN(patrones, clases).votar(patrones_eval, k)
+
+    prototipos, clases_p, pesos = seleccionar_prototipos(patrones, clases, metodo, bits, k)
+    compacto = votar_ponderado(IndiceKNN(prototipos, clases_p), pesos, patrones_eval, k)
+
+    exactitud_completo = float(np.mean(completo == clases_eval))
+    exactitud_compacto = float(np.mean(compacto == clases_eval))
+
+    return {
+        'patrones': int(len(patrones)),
+        'prototipos': int(len(prototipos)),
+        'reduccion': len(patrones) / max(len(prototipos), 1),
+        'exactitud_completo': exactitud_completo,
+        'exactitud_compacto': exactitud_compacto,
+        'delta_exactitud': exactitud_compacto - exactitud_completo,
+        'coincidencia': float(np.mean(completo == compacto))
+    }
+
+def patrones_prueba(proporcion=0.7) -> tuple:
+    """
+        Junta los patrones de las 3 regiones que quedaron fuera de
+        datos.csv, el 30 por ciento final de cada una.
+
+        Parámetros:
+        proporcion: Fracción de cada región que se usó para datos.csv
+
+        Retorno:
+        Tupla (patrones, clases)
+    """
+
+    patrones, clases = [], []
+
+    for region, clase in REGIONES.items():
+        _, prueba = dividir_como_datos(cargar_region(region)[0], proporcion)
+        patrones.append(prueba)
+        clases.append(np.full(len(prueba), clase, dtype=np.uint8))
+
+    return np.concatenate(patrones), np.concatenate(clases)
+
+def main(argumentos=None) -> int:
+    from trabajar_csv import ArchivoCSV
+
+    parser = argparse.ArgumentParser(description='Compacta el conjunto de datos de K-NN y mide el efecto.')
+    parser.add_argument('--metodo', choices=METODOS_COMPACTACION, default='unicos', help='Método de compactación')
+    parser.add_argument('--bits', type=int, default=8, help='Bits por componente RGB')
+    parser.add_argument('--k', type=int, default=1, help='Número de vecinos')
+    parser.add_argument('--datos', default='datos.csv', help='Archivo csv de entrenamiento')
+    args = parser.parse_args(argumentos)
+
+    patrones, clases = ArchivoCSV(args.datos).leer_arreglos()
+    informe = informe_compactacion(patrones, clases, args.metodo, args.bits, args.k)
+
+    print(f"{informe['patrones']} patrones -> {informe['prototipos']} prototipos ({informe['reduccion']:.1f}x)")
+    print(f"Exactitud: {informe['exactitud_completo']:.2%} -> {informe['exactitud_compacto']:.2%} "
+          f"({informe['delta_exactitud']:+.2%}), decisiones iguales {informe['coincidencia']:.2%}")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
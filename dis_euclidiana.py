@@ -1,22 +1,84 @@
 """
     Título del proyecto: ALGORITMO DISTANCIA EUCLIDIANA
-    Descripción del proyecto: Basado en dos vectores, cálcula su distancia respectiva.
+    Descripción del proyecto: Basado en dos vectores, o en dos conjuntos de vectores, cálcula su distancia respectiva.
     Autor: Cristian Del Angel Fiscal
     Fecha: 13/11/2022
     Licencia: Ninguna
 
     Librerías:
-    numpy: Convertir tuplas en vectores numpy para facilitar la operación de vectores
+    numpy: Convertir tuplas en vectores numpy y operar lotes de vectores con productos de matrices
 """
 
 import numpy as np
 
+def _tipo_calculo(consultas, prototipos) -> type:
+    """
+        Elige el tipo flotante para operar. Con enteros de 8 bits todos los
+        productos y sumas caben exactos en float32, así que no hace falta
+        promover los datos a float64.
+    """
+
+    if np.issubdtype(consultas.dtype, np.integer) and np.issubdtype(prototipos.dtype, np.integer):
+        if consultas.dtype.itemsize == 1 and prototipos.dtype.itemsize == 1:
+            return np.float32
+
+    return np.float64
+
+def distancias_por_lotes(consultas, prototipos, cuadrada=False, solo_argmin=False, tam_bloque=4096) -> np.ndarray:
+    """
+        Cálcula las distancias euclidianas de N patrones contra M prototipos
+        con la expansión |c - p|^2 = |c|^2 - 2 c.p + |p|^2, de modo que cada
+        bloque de patrones se resuelve con un producto de matrices.
+
+        Parámetros:
+        consultas: Arreglo (N, d) o vector (d,) con los patrones a comparar
+        prototipos: Arreglo (M, d) o vector (d,) con los prototipos
+        cuadrada: Si es verdadero devuelve la distancia al cuadrado, sin la raíz
+        solo_argmin: Si es verdadero devuelve únicamente el índice del prototipo más cercano
+        tam_bloque: Número máximo de patrones que se operan a la vez, limita la memoria a tam_bloque x M
+
+        Retorno:
+        Matriz (N, M) de distancias, o arreglo (N,) de índices si solo_argmin
+    """
+
+    consultas = np.atleast_2d(np.asarray(consultas))
+    prototipos = np.atleast_2d(np.asarray(prototipos))
+
+    tipo = _tipo_calculo(consultas, prototipos)
+    prot = prototipos.astype(tipo, copy=False)
+    norma_prot = np.einsum('ij,ij->i', prot, prot)
+
+    n = len(consultas)
+    if solo_argmin:
+        salida = np.empty(n, dtype=np.intp)
+    else:
+        salida = np.empty((n, len(prototipos)), dtype=tipo)
+
+    for inicio in range(0, n, tam_bloque):
+        bloque = consultas[inicio:inicio + tam_bloque].astype(tipo, copy=False)
+
+        # El término |c|^2 es igual en todo el renglón, no cambia el mínimo
+        parcial = norma_prot[None, :] - 2 * (bloque @ prot.T)
+
+        if solo_argmin:
+            salida[inicio:inicio + tam_bloque] = np.argmin(parcial, axis=1)
+            continue
+
+        parcial += np.einsum('ij,ij->i', bloque, bloque)[:, None]
+        # Evita residuos negativos por redondeo con datos flotantes
+        np.maximum(parcial, 0, out=parcial)
+
+        if not cuadrada:
+            np.sqrt(parcial, out=parcial)
+
+        salida[inicio:inicio + tam_bloque] = parcial
+
+    return salida
+
 def distancia_euclidiana(vector, patron) -> float:
     """
-        Convierte las dos tuplas recibidas en vectores numpy, 
-        resta sus elementos, uno a uno, y los eleva al cuadrado, 
-        luego suma todos los elementos resultantes y al finalizar 
-        aplica raíz cuadrada.
+        Distancia entre un solo par de vectores, cálculada con el
+        mismo núcleo que distancias_por_lotes.
 
         Parámetros:
         vector: Tupla que representa los centroides de una región
@@ -26,25 +88,15 @@ def distancia_euclidiana(vector, patron) -> float:
         Un valor flotante no negativo
     """
 
-    pat = np.array(patron)
-    vec = np.array(vector)
-
-    resta_cuadrada = np.square(vec - pat)
-    suma = np.sum(resta_cuadrada)
-    dis = np.sqrt(suma)
-
-    return dis
+    return float(distancias_por_lotes(vector, patron)[0, 0])
 
 if __name__ == '__main__':
+    from motor import ClasificadorBayesiano, mensaje_clase
+
     patron = np.array( (183, 125, 44) )
 
-    d_c1 = distancia_euclidiana(patron, (206.6, 168.8, 131))
-    d_c2 = distancia_euclidiana(patron, (89, 130.6, 59))
-    d_c3 = distancia_euclidiana(patron, (24.8, 44.4, 179.8))
+    # Centroides aprendidos del conjunto de datos en lugar de valores fijos
+    clasificador = ClasificadorBayesiano('euclidiana').cargar()
 
-    if d_c1 > d_c2 > d_c3 or d_c2 > d_c1 > d_c3:
-        print("El patrón pertenece a la clase C3")
-    elif d_c1 > d_c3 > d_c2 or d_c3 > d_c1 > d_c2:
-        print("El patrón pertenece a la clase C2")
-    elif d_c3 > d_c2 > d_c1 or d_c2 > d_c3 > d_c1:
-        print("El patrón pertenece a la clase C1")
\ No newline at end of file
+    print(distancias_por_lotes(patron, clasificador.modelo.parametros['medias'])[0])
+    print(mensaje_clase(clasificador.predecir(patron)))
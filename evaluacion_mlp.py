@@ -0,0 +1,225 @@
+"""
+    Título del proyecto: EVALUACIÓN Y AJUSTE DEL PERCEPTRÓN MULTICAPA
+    Descripción del proyecto: Validación cruzada de k pliegues y búsqueda en rejilla o aleatoria de hiperparámetros
+    del perceptrón, repartida entre procesos, y exportación de la mejor configuración como el modelo de la GUI.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    argparse: Opciones de la línea de comandos
+    itertools: Combinaciones de la rejilla
+    json: Guardar el informe de la búsqueda
+    os, sys, time, warnings: Núcleos, código de salida, reloj y avisos de convergencia
+    concurrent.futures: Evaluar las configuraciones en paralelo
+    numpy: Operar los patrones y las matrices de confusión
+    sklearn: Pliegues estratificados, escalador, perceptrón y matriz de confusión
+    modelo_mlp: Entrenar y guardar el modelo ganador
+
+    Ejemplo:
+    python evaluacion_mlp.py --pliegues 5 --aleatorias 12 --exportar
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.metrics import confusion_matrix
+from sklearn.model_selection import StratifiedKFold
+from sklearn.neural_network import MLPClassifier
+from sklearn.preprocessing import StandardScaler
+
+from modelo_mlp import RUTA_MODELO, entrenar_modelo, guardar_modelo
+
+# Valores que se prueban de cada hiperparámetro. Sólo solvers con
+# partial_fit, para que el ganador admita el entrenamiento en línea.
+ESPACIO_BUSQUEDA = {
+    'hidden_layer_sizes': [(), (8,), (16,), (16, 8)],
+    'activation': ['relu', 'tanh'],
+    'solver': ['adam', 'sgd'],
+    'max_iter': [200, 500]
+}
+
+def configuraciones(espacio=None, aleatorias=None, semilla=0) -> list:
+    """
+        Lista de configuraciones de la búsqueda.
+
+        Parámetros:
+        espacio: Diccionario con los valores de cada hiperparámetro, por defecto ESPACIO_BUSQUEDA
+        aleatorias: Número de configuraciones que se eligen al azar de la rejilla, None para todas
+        semilla: Semilla de la elección al azar
+
+        Retorno:
+        Lista de diccionarios de hiperparámetros del MLPClassifier
+    """
+
+    espacio = ESPACIO_BUSQUEDA if espacio is None else espacio
+    nombres = list(espacio)
+
+    rejilla = [dict(zip(nombres, valores)) for valores in itertools.product(*espacio.values())]
+
+    if aleatorias is not None and aleatorias < len(rejilla):
+        elegidas = np.random.default_rng(semilla).choice(len(rejilla), aleatorias, replace=False)
+        rejilla = [rejilla[i] for i in sorted(elegidas)]
+
+    return rejilla
+
+def validacion_cruzada(parametros, patrones, clases, pliegues=5, semilla=0) -> dict:
+    """
+        Evalúa una configuración con validación cruzada estratificada; en
+        cada pliegue el escalador se ajusta sólo con los datos de entrenamiento.
+
+        Parámetros:
+        parametros: Hiperparámetros del MLPClassifier
+        patrones: Arreglo (N, 3) con los componentes RGB
+        clases: Arreglo (N,) con la clase de cada patrón
+        pliegues: Número de pliegues
+        semilla: Semilla de los pliegues y de los pesos iniciales
+
+        Retorno:
+        Diccionario con los hiperparámetros, la exactitud media y su
+        desviación, la matriz de confusión sumada de todos los pliegues,
+        el tiempo medio de ajuste y las iteraciones medias
+    """
+
+    etiquetas = np.unique(clases)
+    exactitudes, tiempos, iteraciones = [], [], []
+    confusion = np.zeros((len(etiquetas), len(etiquetas)), dtype=np.int64)
+
+    divisor = StratifiedKFold(n_splits=pliegues, shuffle=True, random_state=semilla)
+
+    for entrenamiento, prueba in divisor.split(patrones, clases):
+        escalador = StandardScaler().fit(patrones[entrenamiento])
+        mlp_clf = MLPClassifier(**parametros, random_state=semilla)
+
+        inicio = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            mlp_clf.fit(escalador.transform(patrones[entrenamiento]), clases[entrenamiento])
+        tiempos.append(time.perf_counter() - inicio)
+
+        prediccion = mlp_clf.predict(escalador.transform(patrones[prueba]))
+
+        exactitudes.append(np.mean(prediccion == clases[prueba]))
+        confusion += confusion_matrix(clases[prueba], prediccion, labels=etiquetas)
+        iteraciones.append(mlp_clf.n_iter_)
+
+    return {
+        'parametros': parametros,
+        'exactitud': float(np.mean(exactitudes)),
+        'desviacion': float(np.std(exactitudes)),
+        'clases': etiquetas.tolist(),
+        'matriz_confusion': confusion.tolist(),
+        'tiempo_ajuste': float(np.mean(tiempos)),
+        'iteraciones': float(np.mean(iteraciones))
+    }
+
+def buscar(patrones, clases, candidatas, pliegues=5, procesos=None, semilla=0) -> list:
+    """
+        Evalúa todas las configuraciones repartiéndolas entre procesos.
+
+        Parámetros:
+        patrones: Arreglo (N, 3) con los componentes RGB
+        clases: Arreglo (N,) con la clase de cada patrón
+        candidatas: Lista de configuraciones, ver configuraciones
+        pliegues: Número de pliegues de la validación cruzada
+        procesos: Número de procesos, por defecto uno por núcleo
+        semilla: Semilla de los pliegues y de los pesos iniciales
+
+        Retorno:
+        Resultados de validacion_cruzada, de la mejor exactitud a la peor
+    """
+
+    n = len(candidatas)
+
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        resultados = list(ejecutor.map(
+            validacion_cruzada,
+            candidatas,
+            [patrones] * n,
+            [clases] * n,
+            [pliegues] * n,
+            [semilla] * n
+        ))
+
+    # A igual exactitud gana la configuración más rápida de ajustar
+    return sorted(resultados, key=lambda r: (-r['exactitud'], r['tiempo_ajuste']))
+
+def exportar_ganador(resultado, patrones, clases, ruta=RUTA_MODELO, semilla=0) -> dict:
+    """
+        Entrena la configuración ganadora con el conjunto de datos y la
+        guarda como el modelo que carga la GUI. El artefacto lleva la
+        huella de los datos y los hiperparámetros, así obtener_modelo lo
+        usa sin reentrenar y, si los datos cambian, reentrena con ellos.
+
+        Parámetros:
+        resultado: Elemento de la lista que devuelve buscar
+        patrones: Arreglo (N, 3) con los componentes RGB
+        clases: Arreglo (N,) con la clase de cada patrón
+        ruta: Ruta del archivo del modelo
+        semilla: Semilla de los pesos iniciales
+
+        Retorno:
+        Diccionario del artefacto guardado
+    """
+
+    parametros = dict(resultado['parametros'], random_state=semilla)
+
+    artefacto = entrenar_modelo(patrones, clases, parametros, semilla)
+    guardar_modelo(artefacto, ruta)
+
+    return artefacto
+
+def main(argumentos=None) -> int:
+    from trabajar_csv import ArchivoCSV
+
+    parser = argparse.ArgumentParser(description='Validación cruzada y búsqueda de hiperparámetros del perceptrón.')
+    parser.add_argument('--pliegues', type=int, default=5, help='Pliegues de la validación cruzada')
+    parser.add_argument('--aleatorias', type=int, help='Configuraciones al azar de la rejilla, por defecto todas')
+    parser.add_argument('--procesos', type=int, default=os.cpu_count(), help='Número de procesos')
+    parser.add_argument('--semilla', type=int, default=0, help='Semilla de los pliegues y los pesos')
+    parser.add_argument('--datos', default='datos.csv', help='Archivo csv de entrenamiento')
+    parser.add_argument('--salida', help='Archivo JSON con todos los resultados')
+    parser.add_argument('--exportar', action='store_true', help='Guardar la mejor configuración como el modelo de la GUI')
+    parser.add_argument('--modelo', default=RUTA_MODELO, help='Ruta del modelo exportado')
+    args = parser.parse_args(argumentos)
+
+    patrones, clases = ArchivoCSV(args.datos).leer_arreglos()
+    candidatas = configuraciones(aleatorias=args.aleatorias, semilla=args.semilla)
+
+    resultados = buscar(patrones, clases, candidatas, args.pliegues, args.procesos, args.semilla)
+
+    for resultado in resultados:
+        parametros = resultado['parametros']
+        print(
+            f"{resultado['exactitud']:.2%} ±{resultado['desviacion']:.2%}  "
+            f"{resultado['tiempo_ajuste']:6.2f} s  "
+            f"capas={parametros['hidden_layer_sizes']} {parametros['activation']} "
+            f"{parametros['solver']} max_iter={parametros['max_iter']}"
+        )
+
+    ganador = resultados[0]
+    print('Matriz de confusión del ganador (renglones: clase real, columnas: clase asignada):')
+    for clase, renglon in zip(ganador['clases'], ganador['matriz_confusion']):
+        print(f'C{clase}', renglon)
+
+    if args.salida:
+        with open(args.salida, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+    if args.exportar:
+        exportar_ganador(ganador, patrones, clases, args.modelo, args.semilla)
+        print(f'Modelo guardado en {args.modelo}')
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+    Título del proyecto: ÍNDICE ESPACIAL PARA K-NN
+    Descripción del proyecto: Árboles KD sobre el conjunto de entrenamiento RGB con inserción incremental y votación de k vecinos.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    numpy: Operar los patrones y las votaciones como arreglos
+    sklearn: Implementa el árbol KD
+    dis_euclidiana: Búsqueda exhaustiva sobre los patrones que aún no entran a un árbol
+"""
+
+import numpy as np
+
+from sklearn.neighbors import KDTree
+
+from dis_euclidiana import distancias_por_lotes
+
+DESEMPATES = ('cercano', 'menor', 'distancia')
+
+class IndiceKNN():
+    """
+        Índice de vecinos más cercanos que admite agregar patrones sin
+        reconstruirse completo. Sigue el método logarítmico: los patrones
+        nuevos se juntan en un búfer pequeño y, cuando se llena, se funden
+        con los árboles de tamaño menor o igual, como un contador binario.
+        Así siempre hay O(log M) árboles y cada patrón se reconstruye
+        O(log M) veces en total.
+    """
+
+    def __init__(self, patrones=None, clases=None, tam_hoja=40, tam_buffer=256) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            patrones: Arreglo (M, d) inicial de patrones de entrenamiento
+            clases: Arreglo (M,) con la clase de cada patrón
+            tam_hoja: Número de patrones por hoja de cada árbol KD
+            tam_buffer: Patrones que se buscan de forma exhaustiva antes de construir un árbol
+        """
+
+        self.tam_hoja = tam_hoja
+        self.tam_buffer = tam_buffer
+
+        # Cada nivel es un diccionario con su árbol, patrones, clases y posiciones
+        self.niveles = []
+        self.buffer_patrones = []
+        self.buffer_clases = []
+        self.total = 0
+
+        if patrones is not None and len(patrones) > 0:
+            self.niveles.append(self._construir_nivel(
+                np.asarray(patrones),
+                np.asarray(clases, dtype=np.uint8),
+                np.arange(len(patrones))
+            ))
+            self.total = len(patrones)
+
+    def __len__(self) -> int:
+        return self.total
+
+    def _construir_nivel(self, patrones, clases, posiciones) -> dict:
+        """
+            Construye el árbol KD de un nivel. Con patrones float64 contiguos
+            el árbol los usa sin copiarlos.
+        """
+
+        return {
+            'arbol': KDTree(np.ascontiguousarray(patrones, dtype=np.float64), leaf_size=self.tam_hoja),
+            'patrones': patrones,
+            'clases': clases,
+            'posiciones': posiciones
+        }
+
+    def agregar(self, patrones, clases) -> None:
+        """
+            Agrega nuevos patrones al índice.
+
+            Parámetros:
+            patrones: Arreglo (n, d) o vector (d,) de patrones
+            clases: Clase o arreglo de clases de los patrones
+        """
+
+        patrones = np.atleast_2d(np.asarray(patrones))
+        clases = np.atleast_1d(np.asarray(clases, dtype=np.uint8))
+
+        for patron, clase in zip(patrones, clases):
+            self.buffer_patrones.append(patron)
+            self.buffer_clases.append(clase)
+            self.total += 1
+
+            if len(self.buffer_patrones) >= self.tam_buffer:
+                self._vaciar_buffer()
+
+    def _vaciar_buffer(self) -> None:
+        """
+            Convierte el búfer en un árbol y lo funde con los niveles
+            de tamaño menor o igual.
+        """
+
+        n = len(self.buffer_patrones)
+        patrones = [np.array(self.buffer_patrones)]
+        clases = [np.array(self.buffer_clases, dtype=np.uint8)]
+        posiciones = [np.arange(self.total - n, self.total)]
+
+        # Los niveles están ordenados de mayor a menor tamaño
+        while self.niveles and len(self.niveles[-1]['patrones']) <= sum(len(p) for p in patrones):
+            nivel = self.niveles.pop()
+            patrones.append(nivel['patrones'])
+            clases.append(nivel['clases'])
+            posiciones.append(nivel['posiciones'])
+
+        self.niveles.append(self._construir_nivel(
+            np.concatenate(patrones),
+            np.concatenate(clases),
+            np.concatenate(posiciones)
+        ))
+
+        self.buffer_patrones = []
+        self.buffer_clases = []
+
+    def _consultar_nivel(self, nivel, patrones, k) -> tuple:
+        """
+            Los k vecinos de un nivel en orden de distancia y, en empate, de
+            posición. El árbol devuelve cualquiera de los patrones a la misma
+            distancia que el k-ésimo, así que se pide uno más: si también
+            está a esa distancia, se buscan todos los patrones dentro de ese
+            radio y se eligen los de menor posición.
+
+            Retorno:
+            Tupla con las distancias (N, k) y los índices (N, k) en el nivel
+        """
+
+        arbol = nivel['arbol']
+        extra = min(k + 1, len(nivel['patrones']))
+        distancias, indices = arbol.query(patrones, k=extra)
+
+        if extra == k:
+            return distancias, indices
+
+        empatados = np.flatnonzero(distancias[:, k] == distancias[:, k - 1])
+        distancias, indices = distancias[:, :k], indices[:, :k]
+
+        if len(empatados) > 0:
+            radios = distancias[empatados, k - 1]
+            vecinos, dis_vecinos = arbol.query_radius(patrones[empatados], radios * (1 + 1e-9), return_distance=True)
+
+            for renglon, radio, ind, dis in zip(empatados, radios, vecinos, dis_vecinos):
+                dentro = dis <= radio
+                ind, dis = ind[dentro], dis[dentro]
+                orden = np.lexsort((nivel['posiciones'][ind], dis))[:k]
+
+                distancias[renglon] = dis[orden]
+                indices[renglon] = ind[orden]
+
+        return distancias, indices
+
+    def consultar(self, patrones, k=1) -> tuple:
+        """
+            Busca los k vecinos más cercanos de cada patrón. Los empates de
+            distancia se resuelven a favor del patrón agregado primero.
+
+            Parámetros:
+            patrones: Arreglo (N, d) o vector (d,) de patrones a consultar
+            k: Número de vecinos
+
+            Retorno:
+            Tupla con las distancias (N, k), las clases (N, k) y las
+            posiciones (N, k) de los vecinos, ordenados del más cercano;
+            con el índice vacío, arreglos (N, 0)
+        """
+
+        patrones = np.atleast_2d(np.asarray(patrones))
+        k = min(k, self.total)
+
+        if k <= 0:
+            n = len(patrones)
+            return np.zeros((n, 0)), np.zeros((n, 0), dtype=np.uint8), np.zeros((n, 0), dtype=np.intp)
+
+        distancias = []
+        clases = []
+        posiciones = []
+
+        for nivel in self.niveles:
+            k_nivel = min(k, len(nivel['patrones']))
+            dis, ind = self._consultar_nivel(nivel, patrones.astype(np.float64), k_nivel)
+
+            distancias.append(dis)
+            clases.append(nivel['clases'][ind])
+            posiciones.append(nivel['posiciones'][ind])
+
+        if self.buffer_patrones:
+            buffer = np.array(self.buffer_patrones)
+
+            # La raíz en float64, como la del árbol, para que los empates entre niveles sean exactos
+            dis = np.sqrt(distancias_por_lotes(patrones, buffer, cuadrada=True).astype(np.float64))
+            ind = np.argsort(dis, axis=1, kind='stable')[:, :k]
+
+            distancias.append(np.take_along_axis(dis, ind, axis=1))
+            clases.append(np.array(self.buffer_clases, dtype=np.uint8)[ind])
+            posiciones.append(np.arange(self.total - len(buffer), self.total)[ind])
+
+        distancias = np.concatenate(distancias, axis=1)
+        clases = np.concatenate(clases, axis=1)
+        posiciones = np.concatenate(posiciones, axis=1)
+
+        # Orden por distancia y, en empate, por posición en el conjunto de datos
+        orden = np.lexsort((posiciones, distancias), axis=1)[:, :k]
+
+        return (
+            np.take_along_axis(distancias, orden, axis=1),
+            np.take_along_axis(clases, orden, axis=1),
+            np.take_along_axis(posiciones, orden, axis=1)
+        )
+
+    def votar(self, patrones, k=1, desempate='cercano') -> np.ndarray:
+        """
+            Asigna a cada patrón la clase con más votos entre sus k vecinos.
+
+            Parámetros:
+            patrones: Arreglo (N, d) o vector (d,) de patrones a clasificar
+            k: Número de vecinos que votan
+            desempate: Regla cuando dos clases tienen los mismos votos;
+             'cercano' toma la clase del vecino más cercano entre las empatadas,
+             'menor' toma la clase con el número más pequeño,
+             'distancia' toma la clase cuya suma de distancias es menor
+
+            Retorno:
+            Arreglo numpy uint8 (N,) con la clase asignada
+        """
+
+        if desempate not in DESEMPATES:
+            raise ValueError(f'Desempate desconocido: {desempate}')
+
+        if self.total == 0:
+            raise ValueError('El índice no tiene patrones para votar.')
+
+        distancias, clases, _ = self.consultar(patrones, k)
+        return votar_vecinos(distancias, clases, desempate)
+
+def votar_vecinos(distancias, clases, desempate='cercano', pesos=None) -> np.ndarray:
+    """
+        Votación por mayoría de los vecinos ya encontrados.
+
+        Parámetros:
+        distancias: Arreglo (N, k) de distancias ordenadas de menor a mayor
+        clases: Arreglo (N, k) de clases de los vecinos
+        desempate: Regla de desempate, ver IndiceKNN.votar
+        pesos: Arreglo opcional (N, k) con el peso del voto de cada vecino
+
+        Retorno:
+        Arreglo numpy uint8 (N,) con la clase ganadora
+    """
+
+    n, k = clases.shape
+    renglones = np.repeat(np.arange(n), k)
+
+    if pesos is None:
+        pesos = np.ones((n, k))
+
+    votos = np.zeros((n, int(clases.max()) + 1))
+    np.add.at(votos, (renglones, clases.ravel()), np.asarray(pesos).ravel())
+
+    empatadas = votos == votos.max(axis=1, keepdims=True)
+
+    if desempate == 'menor':
+        ganadora = np.argmax(empatadas, axis=1)
+    elif desempate == 'distancia':
+        suma = np.zeros_like(votos)
+        np.add.at(suma, (renglones, clases.ravel()), distancias.ravel())
+        suma[~empatadas] = np.inf
+        ganadora = np.argmin(suma, axis=1)
+    else:
+        # Primer vecino, en orden de distancia, cuya clase está empatada
+        primero = np.argmax(np.take_along_axis(empatadas, clases.astype(np.intp), axis=1), axis=1)
+        ganadora = clases[np.arange(n), primero]
+
+    return ganadora.astype(np.uint8)
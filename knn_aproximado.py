@@ -0,0 +1,528 @@
+"""
+    Título del proyecto: K-NN APROXIMADO CON ARCHIVO INVERTIDO
+    Descripción del proyecto: Índice de vecinos sobre una rejilla gruesa del cubo RGB guardada como listas invertidas
+    contiguas (CSR), donde cada consulta sólo revisa las celdas cercanas a la suya, y su comparación con K-NN exacto.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    argparse: Opciones de la línea de comandos
+    collections: Caché de vecindades con las menos usadas al frente
+    sys, time: Código de salida y reloj
+    numpy: Listas invertidas y distancias por bloques
+    indice_knn: K-NN exacto para comparar y votación de los vecinos
+    compactacion: Patrones de prueba y compactación del conjunto escalado
+
+    Ejemplo:
+    python knn_aproximado.py --sondeos 0 1 2 --filas 10000000
+"""
+
+import argparse
+import sys
+from collections import OrderedDict
+import time
+
+import numpy as np
+
+from indice_knn import DESEMPATES, IndiceKNN, votar_vecinos
+
+# Bits de cada componente que definen la celda: 5 bits son 32 x 32 x 32 celdas de 8 niveles de lado
+BITS_CELDA = 5
+
+# Elementos máximos de cada matriz de distancias (consultas x candidatos)
+TAM_BLOQUE = 1 << 22
+
+# Bytes máximos de las vecindades guardadas entre consultas
+MEMORIA_VECINDADES = 64 << 20
+
+# Las listas de desborde se funden con las principales al pasar esta fracción de su tamaño
+FRACCION_DESBORDE = 0.25
+
+# Las llaves de orden juntan la distancia al cuadrado (máximo 3 x 255^2 < 2^18)
+# con la posición del patrón, así los empates se resuelven como en IndiceKNN
+BITS_POSICION = 40
+
+class _Listas():
+    """
+        Patrones ordenados por celda en arreglos contiguos, con el arreglo
+        de inicios de cada celda.
+    """
+
+    def __init__(self, celdas_totales, patrones, clases, posiciones, celdas) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            celdas_totales: Número de celdas de la rejilla
+            patrones: Arreglo (M, 3) uint8 de patrones
+            clases: Arreglo (M,) con la clase de cada patrón
+            posiciones: Arreglo (M,) con la posición de cada patrón en el conjunto de datos
+            celdas: Arreglo (M,) con la celda de cada patrón
+        """
+
+        orden = np.argsort(celdas, kind='stable')
+
+        self.patrones = patrones[orden]
+        self.clases = clases[orden]
+        self.posiciones = posiciones[orden]
+        self.celdas = celdas[orden]
+
+        self.inicios = np.zeros(celdas_totales + 1, dtype=np.int64)
+        self.inicios[1:] = np.cumsum(np.bincount(celdas, minlength=celdas_totales))
+
+    def __len__(self) -> int:
+        return len(self.patrones)
+
+class IndiceIVF():
+    """
+        Índice aproximado de vecinos más cercanos para patrones RGB. El cubo
+        RGB se divide en una rejilla de celdas; los patrones se guardan
+        ordenados por celda en arreglos contiguos y un arreglo de inicios
+        indica dónde empieza cada celda, como una matriz dispersa CSR.
+
+        Cada consulta revisa sólo las celdas a una distancia de a lo más
+        `sondeo` celdas de la suya (un cubo de (2 sondeo + 1)^3 celdas); si
+        ahí no hay k patrones, el radio crece hasta encontrarlos. Con sondeo
+        0 se revisa sólo la propia celda, lo más rápido y menos exacto; cada
+        aumento acerca el resultado al de K-NN exacto. Las celdas consecutivas
+        en el componente B son contiguas en memoria, así que el cubo se lee
+        con (2 sondeo + 1)^2 rebanadas.
+
+        Los patrones que se agregan esperan en un búfer que se busca de
+        forma exhaustiva. Al llenarse pasa a unas listas de desborde más
+        pequeñas, que se reconstruyen completas, y éstas se funden con las
+        principales cuando pasan de una fracción de su tamaño; así cada
+        vaciado del búfer copia sólo el desborde y no todo el conjunto.
+        Las vecindades ya copiadas de las celdas se guardan entre
+        consultas hasta MEMORIA_VECINDADES bytes, tirando las menos usadas.
+        Tiene la misma interfaz que IndiceKNN (consultar, votar, agregar).
+    """
+
+    def __init__(self, patrones=None, clases=None, sondeo=1, bits=BITS_CELDA, tam_buffer=4096) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            patrones: Arreglo (M, 3) inicial de patrones RGB
+            clases: Arreglo (M,) con la clase de cada patrón
+            sondeo: Radio en celdas de la vecindad que se revisa, el control entre exactitud y velocidad
+            bits: Bits de cada componente que definen la celda, de 1 a 8
+            tam_buffer: Patrones que se buscan de forma exhaustiva antes de fundirlos a las listas
+        """
+
+        self.sondeo = sondeo
+        self.bits = bits
+        self.tam_buffer = tam_buffer
+
+        self.lado = 1 << bits
+        self.corrimiento = 8 - bits
+
+        self.principal = self.desborde = self._vacias()
+
+        self.buffer_patrones = []
+        self.buffer_clases = []
+        self.total = 0
+
+        # (celda, k) -> candidatos de su vecindad, de la menos a la más usada; se vacía al fundir patrones
+        self._vecindades = OrderedDict()
+        self._memoria = 0
+
+        if patrones is not None and len(patrones) > 0:
+            patrones = np.asarray(patrones)
+
+            if patrones.ndim != 2 or patrones.shape[1] != 3:
+                raise ValueError('El índice aproximado sólo admite patrones RGB de 3 componentes.')
+
+            self.principal = self._listas(patrones.astype(np.uint8), np.asarray(clases, dtype=np.uint8), np.arange(len(patrones)))
+            self.total = len(patrones)
+
+    def __len__(self) -> int:
+        return self.total
+
+    def _celdas(self, patrones) -> np.ndarray:
+        """
+            Número de celda de cada patrón: (r, g, b) de la rejilla en orden R, G, B.
+        """
+
+        celdas = np.clip(patrones, 0, 255).astype(np.int64) >> self.corrimiento
+
+        return (celdas[:, 0] << (2 * self.bits)) | (celdas[:, 1] << self.bits) | celdas[:, 2]
+
+    def _listas(self, patrones, clases, posiciones, celdas=None) -> _Listas:
+        """
+            Construye las listas invertidas de los patrones.
+        """
+
+        celdas = self._celdas(patrones) if celdas is None else celdas
+
+        return _Listas(self.lado ** 3, patrones, clases, posiciones, celdas)
+
+    def _vacias(self) -> _Listas:
+        return self._listas(np.empty((0, 3), dtype=np.uint8), np.empty(0, dtype=np.uint8), np.empty(0, dtype=np.int64))
+
+    def _unir(self, primeras, segundas, celdas=None) -> _Listas:
+        """
+            Reconstruye unas listas con los patrones de otras dos; las
+            segundas pueden ser una tupla (patrones, clases, posiciones).
+        """
+
+        if isinstance(segundas, _Listas):
+            celdas = segundas.celdas
+            segundas = (segundas.patrones, segundas.clases, segundas.posiciones)
+
+        return self._listas(
+            np.concatenate((primeras.patrones, segundas[0])),
+            np.concatenate((primeras.clases, segundas[1])),
+            np.concatenate((primeras.posiciones, segundas[2])),
+            np.concatenate((primeras.celdas, celdas))
+        )
+
+    def agregar(self, patrones, clases) -> None:
+        """
+            Agrega nuevos patrones al índice.
+
+            Parámetros:
+            patrones: Arreglo (n, 3) o vector (3,) de patrones
+            clases: Clase o arreglo de clases de los patrones
+        """
+
+        patrones = np.atleast_2d(np.asarray(patrones))
+        clases = np.atleast_1d(np.asarray(clases, dtype=np.uint8))
+
+        for patron, clase in zip(patrones, clases):
+            self.buffer_patrones.append(patron)
+            self.buffer_clases.append(clase)
+            self.total += 1
+
+            if len(self.buffer_patrones) >= self.tam_buffer:
+                self._vaciar_buffer()
+
+    def _vaciar_buffer(self) -> None:
+        """
+            Pasa el búfer a las listas de desborde y éstas a las principales
+            cuando ya son grandes; cada paso reconstruye las listas, con un
+            costo que se reparte entre los patrones que lo provocaron.
+        """
+
+        n = len(self.buffer_patrones)
+        patrones = np.array(self.buffer_patrones).astype(np.uint8)
+
+        self.desborde = self._unir(
+            self.desborde,
+            (patrones, np.array(self.buffer_clases, dtype=np.uint8), np.arange(self.total - n, self.total)),
+            self._celdas(patrones)
+        )
+
+        if len(self.desborde) > FRACCION_DESBORDE * len(self.principal):
+            self.principal = self._unir(self.principal, self.desborde)
+            self.desborde = self._vacias()
+
+        self.buffer_patrones = []
+        self.buffer_clases = []
+        self._vecindades.clear()
+        self._memoria = 0
+
+    def _candidatos(self, listas, celda, radio) -> np.ndarray:
+        """
+            Índices en las listas de los patrones de las celdas a lo más a
+            `radio` celdas de distancia en cada componente.
+        """
+
+        r, g, b = celda >> (2 * self.bits), (celda >> self.bits) & (self.lado - 1), celda & (self.lado - 1)
+        b0, b1 = max(b - radio, 0), min(b + radio, self.lado - 1)
+
+        rebanadas = []
+
+        for rr in range(max(r - radio, 0), min(r + radio, self.lado - 1) + 1):
+            for gg in range(max(g - radio, 0), min(g + radio, self.lado - 1) + 1):
+                base = (rr << (2 * self.bits)) | (gg << self.bits)
+                inicio, fin = listas.inicios[base + b0], listas.inicios[base + b1 + 1]
+
+                if fin > inicio:
+                    rebanadas.append(np.arange(inicio, fin))
+
+        if not rebanadas:
+            return np.empty(0, dtype=np.int64)
+
+        return np.concatenate(rebanadas)
+
+    def _mas_cercanos(self, consultas, puntos, posiciones, k) -> tuple:
+        """
+            Los k puntos más cercanos de cada consulta, en orden de
+            distancia y, en empate, de posición.
+
+            Parámetros:
+            consultas: Arreglo (n, 3) de patrones a consultar
+            puntos: Arreglo (m, 3) float64 de candidatos
+            posiciones: Arreglo (m,) con la posición de cada candidato en el conjunto de datos
+            k: Número de vecinos, a lo más m
+
+            Retorno:
+            Tupla con las llaves de orden (n, k) e índices en puntos (n, k)
+        """
+
+        # |q - p|^2 = |q|^2 + |p|^2 - 2 q.p con un producto de matrices; con
+        # componentes de 8 bits los valores son enteros exactos en float64
+        consultas = consultas.astype(np.float64)
+        normas = np.einsum('ij,ij->i', puntos, puntos)
+        cuadradas = (np.einsum('ij,ij->i', consultas, consultas)[:, None] + normas[None, :]
+                     - 2.0 * (consultas @ puntos.T)).astype(np.int64)
+
+        llaves = (cuadradas << BITS_POSICION) | posiciones[None, :]
+
+        if llaves.shape[1] > k:
+            elegidos = np.argpartition(llaves, k - 1, axis=1)[:, :k]
+            llaves = np.take_along_axis(llaves, elegidos, axis=1)
+        else:
+            elegidos = np.broadcast_to(np.arange(llaves.shape[1]), llaves.shape)
+
+        orden = np.argsort(llaves, axis=1)
+
+        return np.take_along_axis(llaves, orden, axis=1), np.take_along_axis(elegidos, orden, axis=1)
+
+    def _vecindad(self, celda, k) -> tuple:
+        """
+            Candidatos de la celda con el radio de sondeo, o con el radio
+            más pequeño que reúna k patrones si ahí no los hay, de las
+            listas principales y las de desborde. Se guardan ya copiados,
+            así las consultas siguientes a la celda no vuelven a juntar las
+            rebanadas, hasta MEMORIA_VECINDADES bytes en total.
+
+            Retorno:
+            Tupla (puntos (m, 3) float64, posiciones (m,), clases (m,))
+        """
+
+        llave = (celda, k)
+        vecindad = self._vecindades.get(llave)
+
+        if vecindad is not None:
+            self._vecindades.move_to_end(llave)
+            return vecindad
+
+        radio = self.sondeo
+
+        while True:
+            candidatos = [(listas, self._candidatos(listas, celda, radio)) for listas in (self.principal, self.desborde)]
+
+            if sum(len(indices) for _, indices in candidatos) >= k:
+                break
+
+            radio += 1
+
+        vecindad = (
+            np.concatenate([listas.patrones[indices] for listas, indices in candidatos]).astype(np.float64),
+            np.concatenate([listas.posiciones[indices] for listas, indices in candidatos]),
+            np.concatenate([listas.clases[indices] for listas, indices in candidatos])
+        )
+
+        self._vecindades[llave] = vecindad
+        self._memoria += sum(arreglo.nbytes for arreglo in vecindad)
+
+        while self._memoria > MEMORIA_VECINDADES and len(self._vecindades) > 1:
+            _, tirada = self._vecindades.popitem(last=False)
+            self._memoria -= sum(arreglo.nbytes for arreglo in tirada)
+
+        return vecindad
+
+    def consultar(self, patrones, k=1) -> tuple:
+        """
+            Busca los k vecinos aproximados de cada patrón. Los colores
+            repetidos se buscan una sola vez y las consultas se agrupan por
+            celda, así todas las de una celda comparten sus candidatos y se
+            resuelven con una sola matriz de distancias.
+
+            Parámetros:
+            patrones: Arreglo (N, 3) o vector (3,) de patrones a consultar
+            k: Número de vecinos
+
+            Retorno:
+            Tupla con las distancias (N, k), las clases (N, k) y las
+            posiciones (N, k) de los vecinos, ordenados del más cercano
+        """
+
+        patrones = np.clip(np.atleast_2d(np.asarray(patrones)), 0, 255).astype(np.uint8)
+        k = min(k, self.total)
+        inversas = None
+
+        if len(patrones) > 1:
+            codigos = (patrones[:, 0].astype(np.int32) << 16) | (patrones[:, 1].astype(np.int32) << 8) | patrones[:, 2]
+            _, primeros, inversas = np.unique(codigos, return_index=True, return_inverse=True)
+            patrones = patrones[primeros]
+
+        n = len(patrones)
+
+        # Vecinos de las listas, llaves de orden completas para unirlos con los del búfer
+        llaves = np.full((n, k), np.iinfo(np.int64).max, dtype=np.int64)
+        clases = np.zeros((n, k), dtype=np.uint8)
+
+        if len(self.principal) + len(self.desborde) > 0:
+            k_listas = min(k, len(self.principal) + len(self.desborde))
+            celdas = self._celdas(patrones)
+
+            if n == 1:
+                grupos = [(int(celdas[0]), np.zeros(1, dtype=np.int64))]
+            else:
+                unicas, por_celda = np.unique(celdas, return_inverse=True)
+                orden = np.split(np.argsort(por_celda, kind='stable'), np.cumsum(np.bincount(por_celda))[:-1])
+                grupos = zip(unicas.tolist(), orden)
+
+            for celda, grupo in grupos:
+                puntos, posiciones, clases_vecindad = self._vecindad(celda, k_listas)
+                paso = max(1, TAM_BLOQUE // len(puntos))
+
+                for inicio in range(0, len(grupo), paso):
+                    renglones = grupo[inicio:inicio + paso]
+                    llaves_grupo, elegidos = self._mas_cercanos(patrones[renglones], puntos, posiciones, k_listas)
+
+                    llaves[renglones, :k_listas] = llaves_grupo
+                    clases[renglones, :k_listas] = clases_vecindad[elegidos]
+
+        if self.buffer_patrones:
+            buffer = np.array(self.buffer_patrones).astype(np.float64)
+            posiciones = np.arange(self.total - len(buffer), self.total)
+
+            llaves_buffer, elegidos = self._mas_cercanos(patrones, buffer, posiciones, min(k, len(buffer)))
+
+            llaves = np.concatenate((llaves, llaves_buffer), axis=1)
+            clases = np.concatenate((clases, np.array(self.buffer_clases, dtype=np.uint8)[elegidos]), axis=1)
+
+            orden = np.argsort(llaves, axis=1)[:, :k]
+            llaves = np.take_along_axis(llaves, orden, axis=1)
+            clases = np.take_along_axis(clases, orden, axis=1)
+
+        if inversas is not None:
+            llaves, clases = llaves[inversas], clases[inversas]
+
+        distancias = np.sqrt((llaves >> BITS_POSICION).astype(np.float64))
+        posiciones = llaves & ((1 << BITS_POSICION) - 1)
+
+        return distancias, clases, posiciones
+
+    def votar(self, patrones, k=1, desempate='cercano') -> np.ndarray:
+        """
+            Asigna a cada patrón la clase con más votos entre sus k vecinos
+            aproximados, ver IndiceKNN.votar.
+        """
+
+        if desempate not in DESEMPATES:
+            raise ValueError(f'Desempate desconocido: {desempate}')
+
+        distancias, clases, _ = self.consultar(patrones, k)
+        return votar_vecinos(distancias, clases, desempate)
+
+def escalar_conjunto(patrones, clases, filas, dispersion=4.0, semilla=0) -> tuple:
+    """
+        Conjunto sintético del tamaño pedido: patrones del conjunto
+        original elegidos al azar con un pequeño ruido gaussiano, para
+        medir el índice con muchos más renglones que datos.csv.
+
+        Parámetros:
+        patrones: Arreglo (N, 3) con los componentes RGB
+        clases: Arreglo (N,) con la clase de cada patrón
+        filas: Número de renglones del conjunto sintético
+        dispersion: Desviación estándar del ruido en niveles de color
+        semilla: Semilla del generador
+
+        Retorno:
+        Tupla (patrones (filas, 3) uint8, clases (filas,) uint8)
+    """
+
+    generador = np.random.default_rng(semilla)
+
+    elegidos = generador.integers(0, len(patrones), filas)
+    ruido = generador.normal(0, dispersion, (filas, 3))
+
+    return np.clip(patrones[elegidos] + ruido, 0, 255).astype(np.uint8), clases[elegidos]
+
+def comparar_con_exacto(patrones, clases, prueba, sondeos=(0, 1, 2), k=1, consultas=1000) -> list:
+    """
+        Mide, para cada radio de sondeo, qué tanto coinciden las clases del
+        índice aproximado con las de K-NN exacto, su exactitud y su velocidad.
+
+        Parámetros:
+        patrones: Arreglo (N, 3) de entrenamiento
+        clases: Arreglo (N,) con la clase de cada patrón
+        prueba: Tupla (patrones, clases) para medir la exactitud
+        sondeos: Radios que se prueban
+        k: Número de vecinos que votan
+        consultas: Consultas de un solo patrón para medir la latencia
+
+        Retorno:
+        Lista de diccionarios, el primero de K-NN exacto
+    """
+
+    patrones_prueba, clases_prueba = prueba
+    sueltos = patrones_prueba[np.random.default_rng(0).integers(0, len(patrones_prueba), consultas)]
+
+    def medir(nombre, construir) -> dict:
+        inicio = time.perf_counter()
+        indice = construir()
+        construccion = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        asignadas = indice.votar(patrones_prueba, k)
+        lote = time.perf_counter() - inicio
+
+        latencias = []
+        for patron in sueltos:
+            inicio = time.perf_counter()
+            indice.votar(patron, k)
+            latencias.append(time.perf_counter() - inicio)
+
+        return {
+            'indice': nombre,
+            'patrones': len(indice),
+            'asignadas': asignadas,
+            'exactitud': float(np.mean(asignadas == clases_prueba)),
+            'construccion': construccion,
+            'latencia_us': float(np.median(latencias)) * 1e6,
+            'consultas_por_segundo': len(patrones_prueba) / lote
+        }
+
+    resultados = [medir('exacto', lambda: IndiceKNN(patrones, clases))]
+    exactas = resultados[0]['asignadas']
+
+    for sondeo in sondeos:
+        resultado = medir(f'ivf sondeo={sondeo}', lambda: IndiceIVF(patrones, clases, sondeo))
+        resultado['coincidencia'] = float(np.mean(resultado['asignadas'] == exactas))
+        resultados.append(resultado)
+
+    resultados[0]['coincidencia'] = 1.0
+
+    return resultados
+
+def main(argumentos=None) -> int:
+    from compactacion import compactar, patrones_prueba
+    from trabajar_csv import ArchivoCSV
+
+    parser = argparse.ArgumentParser(description='Compara el K-NN aproximado con el exacto.')
+    parser.add_argument('--sondeos', type=int, nargs='*', default=[0, 1, 2], help='Radios de sondeo que se prueban')
+    parser.add_argument('--k', type=int, default=1, help='Número de vecinos')
+    parser.add_argument('--consultas', type=int, default=1000, help='Consultas sueltas para medir la latencia')
+    parser.add_argument('--filas', type=int, help='Escala el conjunto de datos a este número de renglones')
+    parser.add_argument('--compactar', action='store_true', help='Indexa sólo los colores únicos de cada clase')
+    parser.add_argument('--datos', default='datos.csv', help='Archivo csv de entrenamiento')
+    args = parser.parse_args(argumentos)
+
+    patrones, clases = ArchivoCSV(args.datos).leer_arreglos()
+
+    if args.filas:
+        patrones, clases = escalar_conjunto(patrones, clases, args.filas)
+
+    if args.compactar:
+        patrones, clases, _ = compactar(patrones, clases)
+
+    resultados = comparar_con_exacto(patrones, clases, patrones_prueba(), args.sondeos, args.k, args.consultas)
+
+    for resultado in resultados:
+        print(
+            f"{resultado['indice']:>14}  {resultado['patrones']:>11} patrones  coincidencia {resultado['coincidencia']:7.2%}  "
+            f"exactitud {resultado['exactitud']:7.2%}  construcción {resultado['construccion']:6.2f} s  "
+            f"latencia {resultado['latencia_us']:8.1f} us  {resultado['consultas_por_segundo']:10.0f} consultas/s"
+        )
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
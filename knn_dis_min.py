@@ -7,21 +7,30 @@
 
     Librerías:
     tkinter: Kit de herramientas GUI.
+    os: Construir la ruta de la imágen segmentada
     cv2: Abrir imágen y extraer RGB de pixel seleccionado
     numpy: Convertir valores RGB en vector numpy para fácil operación de vectores
-    dis_euclidiana: Implementación del algoritmo de distancia euclidiana
-    trabajar_csv: Para recuperar el conjunto de datos correspondientes al algoritmo K-NN
+    motor: Implementación del algoritmo K-NN sobre el conjunto de datos
+    segmentacion: Superponer las regiones coloreadas sobre la imágen
+    tareas: Cargar el modelo y clasificar en segundo plano sin congelar la ventana
+    visor: Mostrar las imágenes de OpenCV sin bloquear a tkinter
+    registro: Modelos compartidos con las demás ventanas de la aplicación
 """
 
 from tkinter import *
 from tkinter import ttk
 from tkinter import filedialog, messagebox
 
+import os
+
 import cv2
 import numpy as np
 
-from dis_euclidiana import distancia_euclidiana
-from trabajar_csv import ArchivoCSV
+from motor import ClasificadorKNN, mensaje_clase
+from registro import RegistroModelos
+from segmentacion import superponer
+from tareas import GestorTareas, PanelTareas, segmentar_por_franjas
+from visor import InspectorPixeles, VisorImagen
 
 class KNNDisMin():
     """
@@ -30,13 +39,44 @@ class KNNDisMin():
         de clasificación K-NN con distancia mínima, y enviar una respuesta al usuario final.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, k=1, desempate='cercano', almacen=None, compactacion=None, aproximado=None,
+                 fragmentos=None, maestro=None, registro=None) -> None:
         """
             Constructor de la clase.
+            Además construye en segundo plano el índice espacial del conjunto
+            de datos para no recorrerlo completo por cada nuevo patrón que analiza.
+
+            Parámetros:
+            k: Número de vecinos que votan por la clase del patrón
+            desempate: Regla cuando dos clases empatan en votos ('cercano', 'menor' o 'distancia')
+            almacen: Origen de los patrones de aprendizaje, por defecto ArchivoCSV de datos.csv
+            compactacion: None para usar todos los patrones, o un método de compactacion.METODOS_COMPACTACION;
+             compactar cambia algunas decisiones
+            aproximado: Radio de sondeo del índice aproximado, None para K-NN exacto
+            fragmentos: Procesos entre los que se reparte el índice, None para buscar en este proceso
+            maestro: Ventana de la aplicación; sin ella la GUI crea su propia ventana principal
+            registro: RegistroModelos compartido; si se indica, sus patrones reemplazan a almacen
         """
 
-        nueva_ventana = Tk()
+        self.motor = None
+        self.registro = registro if registro is not None else RegistroModelos(almacen)
+        self.clave = f'knn k={k} {desempate} {compactacion} {aproximado} {fragmentos}'
+        self.registro.adquirir(self.clave)
+
+        # Otras ventanas usan el mismo modelo desde sus propios hilos
+        self.candado = self.registro.candado(self.clave)
+
+        # Dentro de la aplicación es una ventana secundaria; sola, es la principal
+        if maestro is None:
+            nueva_ventana = Tk()
+        else:
+            nueva_ventana = Toplevel(maestro)
+
         nueva_ventana.title('KNN Distancia Mínima')
+        nueva_ventana.protocol('WM_DELETE_WINDOW', self.cerrar)
+        self.ventana = nueva_ventana
+        self.v_imagen = None
+        self.v_segmentacion = None
 
         #------------- VARIABLES GLOBALES -------------
         self.dir_img = StringVar()
@@ -74,10 +114,34 @@ class KNNDisMin():
         btn_euclidiano = ttk.Button(frm_principal, text='Desde imagen', command=self.abrir_imagen)
         btn_euclidiano.grid(row=5, column=1)
 
+        btn_segmentar = ttk.Button(frm_principal, text='Segmentar imagen', command=self.evento_segmentar)
+        btn_segmentar.grid(row=6, column=0, columnspan=2)
+
+        self.tareas = GestorTareas(nueva_ventana)
+        self.panel = PanelTareas(frm_principal, self.tareas, 8)
+
         for child in frm_principal.winfo_children():
             child.grid_configure(padx=5, pady=5)
 
-        nueva_ventana.mainloop()
+        # Si otra ventana ya cargó el modelo se usa de inmediato; si no, se carga en segundo plano
+        modelo = self.registro.modelo(self.clave)
+
+        if modelo is not None:
+            self.modelo_cargado(modelo)
+        else:
+            self.tareas.enviar(
+                self.registro.obtener, self.clave,
+                lambda almacen: ClasificadorKNN(
+                    k, desempate, almacen, compactacion, aproximado=aproximado, fragmentos=fragmentos
+                ),
+                descripcion='Construyendo el índice...',
+                al_terminar=self.modelo_cargado,
+                al_fallar=self.error_tarea
+            )
+
+        if maestro is None:
+            nueva_ventana.mainloop()
+            self.registro.cerrar()
 
     def abrir_imagen(self) -> None:
         """
@@ -86,6 +150,9 @@ class KNNDisMin():
             su posterior uso en otro método.
         """
 
+        if not self.modelo_listo():
+            return
+
         try:
             archivo = filedialog.askopenfilename(
                 title="Seleccionar imagen", 
@@ -100,12 +167,10 @@ class KNNDisMin():
 
     def clasificar(self, patron) -> str:
         """
-            Obtiene el conjunto de datos de clasificaciones pasadas, cálcula
-            las distancias euclidianas de todos esos elementos con respecto al
-            nuevo patrón RGB, almacena las distancias y su clase asignada, y luego
-            ordena de menor a mayor esos elementos, para así tomar el primero 
-            (más pequeño) y asignarle la misma clase al nuevo patrón, el cual lo 
-            almacena como nuevo elemento en el conjunto de datos del archivo csv.
+            Busca en el índice espacial los k patrones de clasificaciones pasadas
+            más cercanos al nuevo patrón RGB y le asigna la clase con más votos
+            entre ellos, luego lo almacena como nuevo elemento en el conjunto de
+            datos y en el índice.
 
             Parámetros:
             patron: Arreglo numpy de los componentes RGB de un pixel
@@ -117,46 +182,8 @@ class KNNDisMin():
             C3: Clase tierra
         """
 
-        clase_asignada = ""
-
-        lista_dis_clase = []
-        datos = ArchivoCSV().leer_datos()
-
-        # Se recorre la lista de diccionarios para calcular la distancia del nuevo patrón con los anteriores.
-        for fila in datos:
-            # Primero convertimos los datos del diccionario a enteros para poder trabajarlos.
-            dis_fila = distancia_euclidiana((int(fila['R']), int(fila['G']), int(fila['B'])), (patron[0], patron[1], patron[2]))
-            dicc_fila = {'dis':dis_fila, 'clase':int(fila['CLASE'])}
-
-            # Agregamos las distancias y sus clases a una lista nueva
-            lista_dis_clase.append(dicc_fila)
-
-        # Ordenamiento de la lista de diccionarios a partir de la llave con el valor de las distancias
-        lista_ordenada = sorted(lista_dis_clase, key=lambda d: d['dis'])
-
-        clase_numero = lista_ordenada[0]['clase']
-
-        if clase_numero == 1:
-            clase_asignada = "El patrón pertenece a la clase C1"
-        elif clase_numero == 2:
-            clase_asignada = "El patrón pertenece a la clase C2"
-        elif clase_numero == 3:
-            clase_asignada = "El patrón pertenece a la clase C3"
-
-        # Nuevo diccionario que se agregará al archivo con la información del nuevo patrón.
-        dicc_nuevo = {
-            # Obtenemos el último item de la lista y aumentamos el contador de casos.
-            'CASO':int(datos[-1]['CASO']) + 1, 
-            'R':patron[0],
-            'G':patron[1],
-            'B':patron[2],
-            # K-NN con distancia mínima clasifica al patrón en la clase de la distancia más pequeña.
-            'CLASE':clase_numero
-        }
-
-        ArchivoCSV().escribir_dato(dicc_nuevo)
-
-        return clase_asignada
+        with self.candado:
+            return mensaje_clase(self.motor.predecir_y_agregar(patron))
 
     def evento_manual(self) -> None:
         """
@@ -166,28 +193,124 @@ class KNNDisMin():
             asignada al patrón que digitó.
         """
 
+        if not self.modelo_listo():
+            return
+
         try:
             red = int(self.e_red.get())
             green = int(self.e_green.get())
             blue = int(self.e_blue.get())
 
             patron = np.array( (red, green, blue) )
+        except:
+            messagebox.showerror('Error de valor', 'Ingrese un valor válido RGB.')
+            return
 
-            clase = self.clasificar(patron)
+        self.tareas.enviar(
+            self.clasificar, patron,
+            descripcion='Clasificando...',
+            al_terminar=lambda clase: messagebox.showinfo('Clasificación', clase),
+            al_fallar=self.error_tarea
+        )
+
+    def evento_segmentar(self) -> None:
+        """
+            Permite elegir una imágen, la segmenta completa en las 3 regiones
+            en segundo plano, guarda la superposición coloreada junto a la
+            imágen original y se la muestra al usuario.
+        """
 
-            messagebox.showinfo(
-                'Clasificación',
-                clase
+        if not self.modelo_listo():
+            return
+
+        try:
+            archivo = filedialog.askopenfilename(
+                title="Seleccionar imagen", 
+                filetypes=(("PNG", "*.png"), ("JPG", "*.jpg"), ("JPEG", "*.jpeg"))
             )
+
+            img = cv2.imread(archivo, 1)
+            if img is None:
+                raise ValueError
+
+            ruta_salida = os.path.splitext(archivo)[0] + '_segmentada.png'
         except:
-            messagebox.showerror('Error de valor', 'Ingrese un valor válido RGB.')
+            messagebox.showerror('Error', 'No se seleccionó ninguna imagen.')
+            return
+
+        self.tareas.enviar(
+            self.segmentar, img, ruta_salida,
+            descripcion='Segmentando...',
+            al_terminar=self.mostrar_segmentacion,
+            al_fallar=self.error_tarea,
+            con_tarea=True
+        )
+
+    def segmentar(self, tarea, img, ruta_salida) -> np.ndarray:
+        """
+            Segmenta la imágen por franjas en un hilo trabajador y guarda la
+            superposición junto a la original.
+
+            Retorno:
+            Imágen con las regiones coloreadas superpuestas
+        """
+
+        mapa = segmentar_por_franjas(tarea, self.motor, img, ruta_salida, candado=self.candado)
+
+        return superponer(img, mapa)
+
+    def mostrar_segmentacion(self, superposicion) -> None:
+        """
+            Muestra la imágen segmentada; si ya hay una abierta la reemplaza.
+        """
+
+        if self.v_segmentacion is not None and self.v_segmentacion.abierto:
+            self.v_segmentacion.mostrar(superposicion)
+        else:
+            self.v_segmentacion = VisorImagen(self.ventana, f'{self.ventana.title()} - segmentacion', superposicion)
+
+    def modelo_cargado(self, motor) -> None:
+        """
+            Recibe el clasificador cargado en segundo plano.
+        """
+
+        self.motor = motor
+
+    def modelo_listo(self) -> bool:
+        """
+            Indica si el clasificador ya se cargó, y si no, se lo avisa al usuario.
+        """
+
+        if self.motor is None:
+            messagebox.showwarning('Espere', 'El modelo todavía no está cargado.')
+            return False
+
+        return True
+
+    def error_tarea(self, error) -> None:
+        messagebox.showerror('Error', str(error))
+
+    def cerrar(self) -> None:
+        """
+            Cierra la ventana y sus imágenes; el modelo queda en el registro
+            para la próxima vez que se abra el método.
+        """
+
+        self.tareas.cerrar()
+
+        for visor in (self.v_imagen, self.v_segmentacion):
+            if visor is not None:
+                visor.cerrar()
+
+        self.registro.liberar(self.clave)
+        self.ventana.destroy()
 
     def m_event(self, event, x, y, flags, params) -> None:
         """
             Detecta cuando se ha hecho un clic en la imágen,
             y según las coordenadas extrae los componentes RGB,
-            los procesa con el método clasificar, y finalmente 
-            imprime en consola la clase asignada.
+            los procesa con el método clasificar, y finalmente
+            muestra en una ventana emergente el color y la clase asignada.
 
             Parámetros:
             event: Evento detectado
@@ -197,38 +320,40 @@ class KNNDisMin():
             params: datos de usuario que se pasan cuando se devuelve la llamada
         """
 
-        # Evento con mouse, descomentar uno de los dos
-        #if event == cv2.EVENT_MOUSEMOVE:
-
-        # Evento con clic
+        # El movimiento del mouse lo atiende el InspectorPixeles, que muestra la clase sobre la imágen
         if event == cv2.EVENT_LBUTTONDOWN:
             b = self.img[y, x, 0]
             g = self.img[y, x, 1]
             r = self.img[y, x, 2]
-            print(r, g, b)
 
             patron = np.array( (r, g, b) )
 
-            print(self.clasificar(patron))
-            
-            cv2.imshow('image', self.img)
+            self.tareas.enviar(
+                self.clasificar, patron,
+                descripcion='Clasificando...',
+                al_terminar=lambda clase: messagebox.showinfo('Clasificación', f'RGB ({r}, {g}, {b})\n{clase}'),
+                al_fallar=self.error_tarea
+            )
 
     def trabajar_imagen(self) -> None:
         """
             Abre la imágen indicada por la ruta relativa para luego
-            mostrarla al usuario en un bucle infinito hasta que decida
-            cerrarla, y espera a que el vento de clic ocurra.
+            mostrarla al usuario hasta que decida cerrarla, atendiendo
+            los eventos de clic y mostrando la clase del pixel bajo el
+            cursor mientras la ventana principal sigue activa.
         """
 
         self.img = cv2.imread(self.dir_img, 1)
-    
-        cv2.imshow('image', self.img)
-    
-        cv2.setMouseCallback('image', self.m_event)
-    
-        cv2.waitKey(0)
-    
-        cv2.destroyAllWindows()
+
+        if self.v_imagen is not None:
+            self.v_imagen.cerrar()
+
+        # La ventana de OpenCV se revisa desde el ciclo de tkinter, sin bloquearlo, y
+        # clasifica el pixel bajo el cursor mientras la imágen se clasifica en segundo plano
+        self.v_imagen = InspectorPixeles(
+            self.ventana, f'{self.ventana.title()} - imagen', self.img, self.motor, self.tareas, self.m_event,
+            candado=self.candado
+        )
 
 if __name__ == "__main__":
     KNNDisMin()
\ No newline at end of file
@@ -0,0 +1,537 @@
+"""
+    Título del proyecto: K-NN DISTRIBUIDO EN PROCESOS
+    Descripción del proyecto: Reparte el conjunto de entrenamiento en fragmentos, por rango de CASO o por región del
+    cubo RGB, cada uno atendido por un proceso con su propio índice, y junta los k vecinos de todos los fragmentos.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    argparse: Opciones de la línea de comandos
+    os, sys, time, weakref: Núcleos, código de salida, reloj y liberar los procesos al descartar el índice
+    threading: Una sola consulta a la vez sobre los bloques compartidos
+    traceback: Enviar al coordinador el error de un trabajador con su traza
+    multiprocessing: Procesos trabajadores, tuberías y memoria compartida
+    numpy: Fragmentos, consultas y unión de los vecinos
+    indice_knn: Índice de cada fragmento y votación de los vecinos
+    dis_euclidiana: Búsqueda exhaustiva de los patrones agregados
+
+    Los fragmentos, las consultas y las respuestas viven en memoria
+    compartida: los procesos no reciben copias del conjunto de datos y cada
+    lote de consultas se escribe una sola vez para todos. Por las tuberías
+    sólo viajan el tamaño del lote y el número de vecinos. Como todos los
+    fragmentos atienden el lote al mismo tiempo, el rendimiento crece con
+    los núcleos hasta tener un fragmento por núcleo.
+
+    Los fragmentos se comparten en float64, el tipo del árbol KD, para que
+    cada árbol use el bloque compartido sin copiarlo: en total se ocupan 8
+    bytes por componente de cada patrón más las posiciones y los nodos de
+    los árboles, sin importar el número de procesos.
+
+    Los trabajadores se inician con 'spawn' y no con 'fork', porque el
+    índice se puede crear desde el hilo de una GUI y copiar un proceso con
+    varios hilos puede dejar candados tomados en el hijo.
+
+    Ejemplo:
+    python knn_distribuido.py --fragmentos 1 2 4 8 --particion region --filas 10000000
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from dis_euclidiana import distancias_por_lotes
+from indice_knn import DESEMPATES, IndiceKNN, votar_vecinos
+
+PARTICIONES = ('caso', 'region')
+
+# Consultas por lote que se envían a los fragmentos
+TAM_LOTE = 65536
+
+# Vecinos por consulta que caben en las respuestas de un lote completo
+VECINOS_LOTE = 8
+
+# Contexto de los procesos trabajadores, ver la descripción del módulo
+CONTEXTO = multiprocessing.get_context('spawn')
+
+def _compartir(arreglo) -> tuple:
+    """
+        Copia el arreglo a un bloque nuevo de memoria compartida.
+
+        Retorno:
+        Tupla (bloque SharedMemory, arreglo numpy sobre el bloque)
+    """
+
+    bloque = SharedMemory(create=True, size=max(1, arreglo.nbytes))
+    vista = np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=bloque.buf)
+    vista[...] = arreglo
+
+    return bloque, vista
+
+def _adjuntar(descripcion) -> tuple:
+    """
+        Abre un bloque de memoria compartida creado por el coordinador.
+
+        Parámetros:
+        descripcion: Tupla (nombre, forma, tipo) del arreglo
+
+        Retorno:
+        Tupla (bloque SharedMemory, arreglo numpy sobre el bloque)
+    """
+
+    nombre, forma, tipo = descripcion
+    bloque = SharedMemory(name=nombre)
+
+    return bloque, np.ndarray(forma, dtype=tipo, buffer=bloque.buf)
+
+def particionar(patrones, fragmentos, particion='caso') -> list:
+    """
+        Reparte los patrones en fragmentos del mismo tamaño.
+
+        Parámetros:
+        patrones: Arreglo (M, d) de patrones
+        fragmentos: Número de fragmentos
+        particion: 'caso' para rangos consecutivos del conjunto de datos,
+         'region' para regiones del cubo RGB ordenando los patrones por R, G y B
+
+        Retorno:
+        Lista con las posiciones de los patrones de cada fragmento
+    """
+
+    if particion not in PARTICIONES:
+        raise ValueError(f'Partición desconocida: {particion}')
+
+    if particion == 'region':
+        patrones = np.asarray(patrones)
+        orden = np.lexsort(patrones.T[::-1])
+    else:
+        orden = np.arange(len(patrones))
+
+    # Cada fragmento en orden de posición, así sus empates se resuelven como en el conjunto completo
+    return [np.sort(fragmento) for fragmento in np.array_split(orden, min(fragmentos, len(orden)))]
+
+def _atender(patrones, posiciones, consultas, distancias, vecinos, conexion) -> None:
+    """
+        Ciclo de un proceso trabajador: construye el índice de su fragmento
+        y responde cada lote de consultas hasta recibir None. Si algo falla
+        le envía al coordinador la excepción con su traza en lugar de la
+        respuesta.
+
+        Parámetros:
+        patrones, posiciones: Descripciones del fragmento en memoria compartida
+        consultas: Descripción del bloque de consultas, común a todos los fragmentos
+        distancias, vecinos: Descripciones de los bloques de respuesta del fragmento
+        conexion: Extremo de la tubería con el coordinador
+    """
+
+    bloques = []
+
+    try:
+        bloques = [_adjuntar(descripcion) for descripcion in (patrones, posiciones, consultas, distancias, vecinos)]
+        patrones, posiciones, consultas, distancias, vecinos = [arreglo for _, arreglo in bloques]
+
+        # Las clases las conoce el coordinador, el fragmento sólo devuelve posiciones
+        indice = IndiceKNN(patrones, np.zeros(len(patrones), dtype=np.uint8))
+        conexion.send(len(indice))
+    except Exception as error:
+        _enviar_error(conexion, error)
+        indice = None
+
+    try:
+        while indice is not None:
+            mensaje = conexion.recv()
+
+            if mensaje is None:
+                break
+
+            try:
+                n, k = mensaje
+                dis, _, pos = indice.consultar(consultas[:n], k)
+                k = dis.shape[1]
+
+                distancias[:n * k] = dis.ravel()
+                vecinos[:n * k] = posiciones[pos].ravel()
+                conexion.send(k)
+            except Exception as error:
+                _enviar_error(conexion, error)
+    except EOFError:
+        # El coordinador terminó sin despedirse
+        pass
+    finally:
+        # El árbol usa el fragmento compartido, se suelta antes de cerrar los bloques
+        del indice, patrones, posiciones, consultas, distancias, vecinos
+
+        for bloque, _ in bloques:
+            bloque.close()
+
+def _enviar_error(conexion, error) -> None:
+    """
+        Envía al coordinador la excepción de un trabajador y su traza; si
+        la excepción no se puede enviar, manda su descripción.
+    """
+
+    traza = traceback.format_exc()
+
+    try:
+        conexion.send((error, traza))
+    except Exception:
+        conexion.send((RuntimeError(repr(error)), traza))
+
+def _recibir(conexiones) -> list:
+    """
+        Recibe la respuesta de cada trabajador. Lee todas aunque alguna
+        falle, para que ninguna quede en la tubería, y después lanza el
+        primer error con la traza del trabajador.
+    """
+
+    respuestas, fallas = [], []
+
+    for fragmento, conexion in enumerate(conexiones):
+        try:
+            respuesta = conexion.recv()
+        except (EOFError, OSError) as error:
+            respuesta = (error, 'El proceso terminó sin responder.')
+
+        if isinstance(respuesta, tuple):
+            fallas.append((fragmento,) + respuesta)
+            respuesta = None
+
+        respuestas.append(respuesta)
+
+    if fallas:
+        fragmento, error, traza = fallas[0]
+        raise RuntimeError(f'Falló el fragmento {fragmento} del índice distribuido:\n{traza}') from error
+
+    return respuestas
+
+def _liberar(bloques, conexiones, procesos) -> None:
+    """
+        Detiene los procesos trabajadores y libera la memoria compartida.
+    """
+
+    for conexion in conexiones:
+        try:
+            conexion.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+
+    for proceso in procesos:
+        proceso.join(timeout=5)
+
+        if proceso.is_alive():
+            proceso.terminate()
+
+    for bloque in bloques:
+        bloque.close()
+        bloque.unlink()
+
+class IndiceDistribuido():
+    """
+        Índice de vecinos más cercanos repartido en fragmentos, cada uno con
+        su IndiceKNN en un proceso trabajador. Un lote de consultas se
+        escribe en memoria compartida, todos los fragmentos lo atienden al
+        mismo tiempo y el coordinador junta sus k vecinos, ordenados por
+        distancia y en empate por posición, como IndiceKNN.
+
+        Los patrones que se agregan después se guardan en el coordinador y
+        se buscan de forma exhaustiva. Tiene la misma interfaz que IndiceKNN
+        (consultar, votar, agregar) más cerrar() para detener los procesos.
+    """
+
+    def __init__(self, patrones, clases, fragmentos=None, particion='caso', tam_lote=TAM_LOTE) -> None:
+        """
+            Constructor de la clase. Lanza los procesos y espera a que cada
+            uno construya el índice de su fragmento.
+
+            Parámetros:
+            patrones: Arreglo (M, d) de patrones de entrenamiento
+            clases: Arreglo (M,) con la clase de cada patrón
+            fragmentos: Número de fragmentos y de procesos, por defecto uno por núcleo
+            particion: Cómo se reparten los patrones, ver particionar
+            tam_lote: Consultas por lote enviado a los fragmentos
+        """
+
+        patrones = np.asarray(patrones)
+        self.clases = np.asarray(clases, dtype=np.uint8)
+        self.tam_lote = tam_lote
+        self.dimension = patrones.shape[1]
+
+        self.buffer_patrones = []
+        self.buffer_clases = []
+        self.total = len(patrones)
+
+        self.bloques = []
+        self.conexiones = []
+        self.procesos = []
+        self.respuestas = []
+
+        # Las consultas y respuestas usan los mismos bloques, sólo un hilo a la vez los ocupa
+        self._candado = threading.Lock()
+
+        # Se libera al cerrar, al descartar el índice o al salir del programa
+        self._finalizador = weakref.finalize(self, _liberar, self.bloques, self.conexiones, self.procesos)
+
+        self.consultas, consultas = self._nuevo_bloque(np.zeros((tam_lote, self.dimension)))
+
+        for posiciones in particionar(patrones, fragmentos or os.cpu_count(), particion):
+            _, fragmento = self._nuevo_bloque(patrones[posiciones].astype(np.float64))
+            _, posiciones = self._nuevo_bloque(posiciones.astype(np.int64))
+            distancias, dis = self._nuevo_bloque(np.zeros(tam_lote * VECINOS_LOTE))
+            vecinos, vec = self._nuevo_bloque(np.zeros(tam_lote * VECINOS_LOTE, dtype=np.int64))
+
+            propio, remoto = CONTEXTO.Pipe()
+            proceso = CONTEXTO.Process(
+                target=_atender,
+                args=(fragmento, posiciones, consultas, dis, vec, remoto),
+                daemon=True
+            )
+            proceso.start()
+
+            self.conexiones.append(propio)
+            self.procesos.append(proceso)
+            self.respuestas.append((distancias, vecinos))
+
+        try:
+            _recibir(self.conexiones)
+        except Exception:
+            self._finalizador()
+            raise
+
+    def _nuevo_bloque(self, arreglo) -> tuple:
+        """
+            Copia el arreglo a memoria compartida que se libera con el índice.
+
+            Retorno:
+            Tupla (arreglo sobre el bloque, descripción para los trabajadores)
+        """
+
+        bloque, vista = _compartir(arreglo)
+        self.bloques.append(bloque)
+
+        return vista, (bloque.name, vista.shape, vista.dtype.str)
+
+    def __len__(self) -> int:
+        return self.total
+
+    @property
+    def fragmentos(self) -> int:
+        return len(self.procesos)
+
+    def agregar(self, patrones, clases) -> None:
+        """
+            Agrega nuevos patrones al índice, en el coordinador.
+
+            Parámetros:
+            patrones: Arreglo (n, d) o vector (d,) de patrones
+            clases: Clase o arreglo de clases de los patrones
+        """
+
+        patrones = np.atleast_2d(np.asarray(patrones))
+        clases = np.atleast_1d(np.asarray(clases, dtype=np.uint8))
+
+        with self._candado:
+            for patron, clase in zip(patrones, clases):
+                self.buffer_patrones.append(patron)
+                self.buffer_clases.append(clase)
+                self.total += 1
+
+    def _consultar_lote(self, patrones, k) -> tuple:
+        """
+            Envía un lote a todos los fragmentos y junta sus respuestas.
+
+            Retorno:
+            Tupla con las distancias (n, k') y posiciones (n, k') de todos
+            los fragmentos, sin ordenar
+        """
+
+        n = len(patrones)
+        self.consultas[:n] = patrones
+
+        for conexion in self.conexiones:
+            conexion.send((n, k))
+
+        distancias, posiciones = [], []
+
+        for k_fragmento, (dis, pos) in zip(_recibir(self.conexiones), self.respuestas):
+            distancias.append(dis[:n * k_fragmento].reshape(n, k_fragmento))
+            posiciones.append(pos[:n * k_fragmento].reshape(n, k_fragmento))
+
+        return np.concatenate(distancias, axis=1), np.concatenate(posiciones, axis=1)
+
+    def consultar(self, patrones, k=1) -> tuple:
+        """
+            Busca los k vecinos más cercanos de cada patrón en todos los
+            fragmentos. Los empates de distancia se resuelven a favor del
+            patrón agregado primero. Se puede llamar desde varios hilos:
+            cada consulta ocupa los bloques compartidos hasta leer todas
+            sus respuestas.
+
+            Parámetros:
+            patrones: Arreglo (N, d) o vector (d,) de patrones a consultar
+            k: Número de vecinos
+
+            Retorno:
+            Tupla con las distancias (N, k), las clases (N, k) y las
+            posiciones (N, k) de los vecinos, ordenados del más cercano
+        """
+
+        with self._candado:
+            if not self._finalizador.alive:
+                raise RuntimeError('El índice distribuido ya se cerró.')
+
+            return self._consultar(np.atleast_2d(np.asarray(patrones)), k)
+
+    def _consultar(self, patrones, k) -> tuple:
+        """
+            Cuerpo de consultar; se llama con el candado tomado.
+        """
+
+        k = min(k, self.total)
+        k_fragmentos = min(k, len(self.clases))
+
+        # Las respuestas de un lote caben en tam_lote x VECINOS_LOTE
+        paso = max(1, min(self.tam_lote, self.tam_lote * VECINOS_LOTE // max(1, k_fragmentos)))
+
+        if k_fragmentos > self.tam_lote * VECINOS_LOTE:
+            raise ValueError(f'El índice distribuido admite a lo más {self.tam_lote * VECINOS_LOTE} vecinos.')
+
+        distancias, posiciones = [], []
+
+        for inicio in range(0, len(patrones), paso):
+            dis, pos = self._consultar_lote(patrones[inicio:inicio + paso], k_fragmentos)
+            distancias.append(dis)
+            posiciones.append(pos)
+
+        distancias = np.concatenate(distancias)
+        posiciones = np.concatenate(posiciones)
+        clases = self.clases
+
+        if self.buffer_patrones:
+            dis = np.sqrt(distancias_por_lotes(patrones, np.array(self.buffer_patrones), cuadrada=True).astype(np.float64))
+            ind = np.argsort(dis, axis=1, kind='stable')[:, :k]
+
+            distancias = np.concatenate((distancias, np.take_along_axis(dis, ind, axis=1)), axis=1)
+            posiciones = np.concatenate((posiciones, ind + len(self.clases)), axis=1)
+            clases = np.concatenate((clases, np.array(self.buffer_clases, dtype=np.uint8)))
+
+        # Orden por distancia y, en empate, por posición en el conjunto de datos
+        orden = np.lexsort((posiciones, distancias), axis=1)[:, :k]
+        posiciones = np.take_along_axis(posiciones, orden, axis=1)
+
+        return np.take_along_axis(distancias, orden, axis=1), clases[posiciones], posiciones
+
+    def votar(self, patrones, k=1, desempate='cercano') -> np.ndarray:
+        """
+            Asigna a cada patrón la clase con más votos entre sus k vecinos,
+            ver IndiceKNN.votar.
+        """
+
+        if desempate not in DESEMPATES:
+            raise ValueError(f'Desempate desconocido: {desempate}')
+
+        distancias, clases, _ = self.consultar(patrones, k)
+        return votar_vecinos(distancias, clases, desempate)
+
+    def cerrar(self) -> None:
+        """
+            Detiene los procesos trabajadores y libera la memoria compartida,
+            después de la consulta en curso si la hay.
+        """
+
+        with self._candado:
+            self._finalizador()
+
+def medir_rendimiento(patrones, clases, consultas, fragmentos=(1, 2, 4), particion='caso', k=1) -> list:
+    """
+        Mide las consultas por segundo del índice con distinto número de
+        fragmentos, comparadas con IndiceKNN en un solo proceso.
+
+        Parámetros:
+        patrones: Arreglo (M, d) de entrenamiento
+        clases: Arreglo (M,) con la clase de cada patrón
+        consultas: Arreglo (N, d) de patrones a clasificar
+        fragmentos: Números de fragmentos que se prueban
+        particion: Cómo se reparten los patrones
+        k: Número de vecinos que votan
+
+        Retorno:
+        Lista de diccionarios, el primero de IndiceKNN
+    """
+
+    inicio = time.perf_counter()
+    indice = IndiceKNN(patrones, clases)
+    construccion = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    exactas = indice.votar(consultas, k)
+    lote = time.perf_counter() - inicio
+
+    resultados = [{
+        'indice': 'un proceso',
+        'construccion': construccion,
+        'consultas_por_segundo': len(consultas) / lote,
+        'coincidencia': 1.0
+    }]
+
+    for numero in fragmentos:
+        inicio = time.perf_counter()
+        distribuido = IndiceDistribuido(patrones, clases, numero, particion)
+        construccion = time.perf_counter() - inicio
+
+        try:
+            inicio = time.perf_counter()
+            asignadas = distribuido.votar(consultas, k)
+            lote = time.perf_counter() - inicio
+        finally:
+            distribuido.cerrar()
+
+        resultados.append({
+            'indice': f'{numero} fragmentos',
+            'construccion': construccion,
+            'consultas_por_segundo': len(consultas) / lote,
+            'coincidencia': float(np.mean(asignadas == exactas))
+        })
+
+    return resultados
+
+def main(argumentos=None) -> int:
+    from compactacion import patrones_prueba
+    from knn_aproximado import escalar_conjunto
+    from trabajar_csv import ArchivoCSV
+
+    parser = argparse.ArgumentParser(description='Mide el K-NN repartido en procesos.')
+    parser.add_argument('--fragmentos', type=int, nargs='*', default=[1, 2, os.cpu_count()],
+                        help='Números de fragmentos que se prueban')
+    parser.add_argument('--particion', choices=PARTICIONES, default='caso', help='Cómo se reparten los patrones')
+    parser.add_argument('--k', type=int, default=1, help='Número de vecinos')
+    parser.add_argument('--filas', type=int, help='Escala el conjunto de datos a este número de renglones')
+    parser.add_argument('--datos', default='datos.csv', help='Archivo csv de entrenamiento')
+    args = parser.parse_args(argumentos)
+
+    patrones, clases = ArchivoCSV(args.datos).leer_arreglos()
+
+    if args.filas:
+        patrones, clases = escalar_conjunto(patrones, clases, args.filas)
+
+    consultas, _ = patrones_prueba()
+
+    print(f'{len(patrones)} patrones, {len(consultas)} consultas, {os.cpu_count()} núcleos')
+
+    for resultado in medir_rendimiento(patrones, clases, consultas, args.fragmentos, args.particion, args.k):
+        print(
+            f"{resultado['indice']:>14}  construcción {resultado['construccion']:6.2f} s  "
+            f"{resultado['consultas_por_segundo']:10.0f} consultas/s  coincidencia {resultado['coincidencia']:7.2%}"
+        )
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,6 +10,7 @@
     bayesiano_param: Implementación del algoritmo distancia euclidiana
     knn_dis_min: Implementación del algoritmo K-NN con distancia mínima
     perceptron: Implementación del algoritmo perceptrón multicapa
+    registro: Modelos y patrones de entrenamiento compartidos por las ventanas
 """
 
 from tkinter import *
@@ -18,11 +19,14 @@ from tkinter import ttk
 from bayesiano_param import DistanciaEuclidiana
 from knn_dis_min import KNNDisMin
 from perceptron import PerceptronMulticapa
+from registro import RegistroModelos
 
 class Aplicacion():
     """
         Interfaz Gráfica de Usuario que permite elegir al usuario uno de los
-        3 métodos de clasificación.
+        3 métodos de clasificación. Cada método se abre en una ventana
+        secundaria que toma su modelo del registro de la aplicación, así
+        el modelo se carga sólo la primera vez que se abre.
     """
 
     def __init__(self, r) -> None:
@@ -33,10 +37,14 @@ class Aplicacion():
             r: Widget principal de la GUI
         """
 
+        self.r = r
+        self.registro = RegistroModelos()
+
         r.title('Reconocimiento de imágenes')
         r.geometry('400x100')
         barra_menu = Menu(r)
         r.config(menu=barra_menu)
+        r.protocol('WM_DELETE_WINDOW', self.cerrar)
 
         #------------- ELEMENTOS DE LA BARRA -------------
         bayesiano = Menu(barra_menu, tearoff=0)
@@ -74,21 +82,30 @@ class Aplicacion():
             Llamada a la GUI del algoritmo de distancia euclidiana.
         """
 
-        DistanciaEuclidiana()
+        DistanciaEuclidiana(maestro=self.r, registro=self.registro)
 
     def algoritmo_knn(self) -> None:
         """
             Llamada a la GUI del algoritmo K-NN con distancia mínima.
         """
 
-        KNNDisMin()
+        KNNDisMin(maestro=self.r, registro=self.registro)
 
     def algoritmo_PMC(self) -> None:
         """
             Llamada a la GUI del algoritmo perceptrón multicapa.
         """
 
-        PerceptronMulticapa()
+        PerceptronMulticapa(maestro=self.r, registro=self.registro)
+
+    def cerrar(self) -> None:
+        """
+            Descarta los modelos, guardando lo que aprendió el perceptrón,
+            y cierra la aplicación.
+        """
+
+        self.registro.cerrar()
+        self.r.destroy()
 
 #-----------------MAIN--------------
 raiz = Tk()
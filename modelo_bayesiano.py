@@ -0,0 +1,234 @@
+"""
+    Título del proyecto: MODELO BAYESIANO PARAMÉTRICO
+    Descripción del proyecto: Estima la media, covarianza y probabilidad a priori de cada clase a partir de sumas
+    acumuladas, y clasifica por lotes con distancia euclidiana, de Mahalanobis o verosimilitud gaussiana.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    threading: Aprender desde un hilo mientras otro clasifica
+    numpy: Sumas por clase y reglas de decisión vectorizadas
+    dis_euclidiana: Distancias de los patrones a las medias
+"""
+
+import threading
+
+import numpy as np
+
+from dis_euclidiana import distancias_por_lotes
+
+# Reglas de decisión: la media más cercana, la media más cercana según la
+# covarianza de su clase, o la clase de mayor probabilidad a posteriori
+REGLAS = ('euclidiana', 'mahalanobis', 'gaussiana')
+
+class ModeloBayesiano():
+    """
+        Guarda por cada clase el número de patrones, su suma y la suma de
+        sus productos externos. Con eso se obtienen la media y la
+        covarianza sin volver a recorrer el conjunto de datos, y los
+        patrones nuevos sólo se suman.
+
+        Las sumas y los parámetros derivados se leen y modifican bajo un
+        candado, y cada clasificación usa un solo juego de parámetros, así
+        un hilo puede sumar patrones mientras otro clasifica.
+    """
+
+    def __init__(self, regularizacion=1e-3) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            regularizacion: Valor que se suma a la diagonal de las covarianzas
+            para que sean invertibles aunque una clase tenga pocos colores
+        """
+
+        self.regularizacion = regularizacion
+
+        # Número de componentes de cada patrón, se fija con la primer actualización
+        self.dimension = 3
+
+        self.clases = np.zeros(0, dtype=np.uint8)
+        self.conteos = np.zeros(0, dtype=np.int64)
+        self.sumas = np.zeros((0, self.dimension))
+        self.productos = np.zeros((0, self.dimension, self.dimension))
+
+        self._parametros = None
+
+        # Aumenta con cada actualización
+        self.version = 0
+        self._candado = threading.Lock()
+
+    def actualizar(self, patrones, clases) -> 'ModeloBayesiano':
+        """
+            Suma los patrones nuevos a las estadísticas de su clase en un
+            solo recorrido: cada suma por clase es un producto de matrices
+            con la codificación one-hot de las clases.
+
+            Parámetros:
+            patrones: Arreglo (N, d) con los componentes RGB u otras características
+            clases: Arreglo (N,) con la clase de cada patrón
+
+            Retorno:
+            El mismo modelo, para encadenar llamadas
+        """
+
+        patrones = np.atleast_2d(np.asarray(patrones, dtype=np.float64))
+        clases = np.atleast_1d(np.asarray(clases)).astype(np.uint8)
+
+        if len(patrones) == 0:
+            return self
+
+        with self._candado:
+            if len(self.clases) == 0:
+                self.dimension = patrones.shape[1]
+                self.sumas = np.zeros((0, self.dimension))
+                self.productos = np.zeros((0, self.dimension, self.dimension))
+            elif patrones.shape[1] != self.dimension:
+                raise ValueError(f'Se esperaban patrones de {self.dimension} componentes.')
+
+            self._agregar_clases(np.unique(clases))
+
+            # Posición de cada patrón dentro de self.clases
+            posiciones = np.searchsorted(self.clases, clases)
+
+            uno_caliente = np.zeros((len(patrones), len(self.clases)))
+            uno_caliente[np.arange(len(patrones)), posiciones] = 1
+
+            externos = (patrones[:, :, None] * patrones[:, None, :]).reshape(len(patrones), -1)
+
+            self.conteos += np.bincount(posiciones, minlength=len(self.clases))
+            self.sumas += uno_caliente.T @ patrones
+            self.productos += (uno_caliente.T @ externos).reshape(self.productos.shape)
+
+            self._parametros = None
+            self.version += 1
+
+        return self
+
+    def _agregar_clases(self, nuevas) -> None:
+        """
+            Agrega estadísticas vacías para las clases que aún no existen,
+            manteniendo self.clases ordenado.
+        """
+
+        faltantes = np.setdiff1d(nuevas, self.clases)
+
+        if len(faltantes) == 0:
+            return
+
+        clases = np.union1d(self.clases, faltantes).astype(np.uint8)
+        anteriores = np.searchsorted(clases, self.clases)
+
+        conteos = np.zeros(len(clases), dtype=np.int64)
+        sumas = np.zeros((len(clases), self.dimension))
+        productos = np.zeros((len(clases), self.dimension, self.dimension))
+
+        conteos[anteriores] = self.conteos
+        sumas[anteriores] = self.sumas
+        productos[anteriores] = self.productos
+
+        self.clases, self.conteos, self.sumas, self.productos = clases, conteos, sumas, productos
+
+    @property
+    def parametros(self) -> dict:
+        """
+            Clases, medias, covarianzas, probabilidades a priori y los
+            términos que usan las reglas de decisión; se recalculan sólo
+            después de una actualización. El diccionario no cambia después,
+            las actualizaciones crean otro.
+        """
+
+        with self._candado:
+            if self._parametros is None:
+                if len(self.clases) == 0:
+                    raise ValueError('El modelo no tiene patrones de entrenamiento.')
+
+                conteos = self.conteos.astype(np.float64)
+                medias = self.sumas / conteos[:, None]
+
+                # Covarianza insesgada: (sum x x^T - n mu mu^T) / (n - 1)
+                dispersion = self.productos - conteos[:, None, None] * medias[:, :, None] * medias[:, None, :]
+                covarianzas = dispersion / np.maximum(conteos - 1, 1)[:, None, None]
+                covarianzas += self.regularizacion * np.eye(self.dimension)
+
+                # Con L L^T = covarianza, la distancia de Mahalanobis es |L^-1 (x - mu)|^2
+                cholesky = np.linalg.cholesky(covarianzas)
+
+                self._parametros = {
+                    'clases': self.clases,
+                    'medias': medias,
+                    'covarianzas': covarianzas,
+                    'priori': conteos / conteos.sum(),
+                    'blanqueo': np.linalg.inv(cholesky),
+                    'log_det': 2 * np.log(np.diagonal(cholesky, axis1=1, axis2=2)).sum(axis=1)
+                }
+
+            return self._parametros
+
+    def mahalanobis(self, patrones, parametros=None) -> np.ndarray:
+        """
+            Distancia de Mahalanobis al cuadrado de cada patrón a la media
+            de cada clase.
+
+            Parámetros:
+            patrones: Arreglo (N, d) con los componentes RGB u otras características
+            parametros: Parámetros que se usan, por defecto los actuales
+
+            Retorno:
+            Arreglo (N, K) con una columna por clase, en el orden de parametros['clases']
+        """
+
+        patrones = np.atleast_2d(np.asarray(patrones, dtype=np.float64))
+        parametros = self.parametros if parametros is None else parametros
+
+        distancias = np.empty((len(patrones), len(parametros['clases'])))
+
+        for k in range(len(parametros['clases'])):
+            blanqueados = (patrones - parametros['medias'][k]) @ parametros['blanqueo'][k].T
+            distancias[:, k] = np.einsum('ij,ij->i', blanqueados, blanqueados)
+
+        return distancias
+
+    def log_posteriori(self, patrones, parametros=None) -> np.ndarray:
+        """
+            Logaritmo de la verosimilitud gaussiana por la probabilidad a
+            priori de cada clase, sin la constante común a todas.
+
+            Parámetros:
+            patrones: Arreglo (N, d) con los componentes RGB u otras características
+            parametros: Parámetros que se usan, por defecto los actuales
+
+            Retorno:
+            Arreglo (N, K) con una columna por clase, en el orden de parametros['clases']
+        """
+
+        parametros = self.parametros if parametros is None else parametros
+
+        return -0.5 * (self.mahalanobis(patrones, parametros) + parametros['log_det']) + np.log(parametros['priori'])
+
+    def predecir_lote(self, patrones, regla='gaussiana') -> np.ndarray:
+        """
+            Asigna a cada patrón la clase que elige la regla de decisión.
+            Los empates se resuelven a favor de la clase menor.
+
+            Parámetros:
+            patrones: Arreglo (N, d) con los componentes RGB u otras características
+            regla: 'euclidiana', 'mahalanobis' o 'gaussiana'
+
+            Retorno:
+            Arreglo numpy uint8 (N,) con la clase asignada a cada patrón
+        """
+
+        parametros = self.parametros
+
+        if regla == 'euclidiana':
+            cercanos = distancias_por_lotes(patrones, parametros['medias'], solo_argmin=True)
+        elif regla == 'mahalanobis':
+            cercanos = self.mahalanobis(patrones, parametros).argmin(axis=1)
+        elif regla == 'gaussiana':
+            cercanos = self.log_posteriori(patrones, parametros).argmax(axis=1)
+        else:
+            raise ValueError(f'Regla de decisión desconocida: {regla}')
+
+        return parametros['clases'][cercanos]
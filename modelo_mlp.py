@@ -0,0 +1,503 @@
+"""
+    Título del proyecto: MODELO PERSISTENTE DEL PERCEPTRÓN MULTICAPA
+    Descripción del proyecto: Entrena el perceptrón una sola vez, lo guarda junto con la huella de los datos usados
+    y lo evalúa por lotes junto con su escalador.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    copy: Entrenar en línea sobre una copia del modelo que se está usando
+    hashlib: Cálcular la huella del conjunto de datos
+    os: Reemplazar el archivo del modelo de forma atómica
+    pickle: Guardar el escalador y el perceptrón entrenados
+    queue, threading, time: Entrenamiento en línea en un hilo de fondo
+    numpy: Operar el conjunto de datos como arreglos
+    sklearn: Implementa el escalador y el algoritmo de Perceptrón multicapa; su versión se guarda con el modelo
+    trabajar_csv: Conjunto de datos por defecto
+"""
+
+import copy
+import hashlib
+import os
+import pickle
+import queue
+import threading
+import time
+
+import numpy as np
+
+import sklearn
+from sklearn.model_selection import train_test_split
+from sklearn.neural_network import MLPClassifier
+from sklearn.preprocessing import StandardScaler
+
+from trabajar_csv import ArchivoCSV
+
+# Se incrementa cuando cambia el contenido del artefacto guardado
+VERSION_MODELO = 2
+
+RUTA_MODELO = 'modelo_mlp.pkl'
+
+PARAMETROS_MLP = {
+    'hidden_layer_sizes': (),
+    'max_iter': 300,
+    'activation': 'relu',
+    'solver': 'adam'
+}
+
+# Funciones de activación de las capas ocultas, con los nombres de sklearn
+ACTIVACIONES = {
+    'identity': lambda z: z,
+    'logistic': lambda z: 1 / (1 + np.exp(-z)),
+    'tanh': np.tanh,
+    'relu': lambda z: np.maximum(z, 0)
+}
+
+def huella_datos(patrones, clases) -> str:
+    """
+        Cálcula una huella SHA-256 de los patrones y sus clases, que cambia
+        en cuanto se agrega, elimina o modifica cualquier patrón.
+
+        Parámetros:
+        patrones: Arreglo (N, 3) con los componentes RGB
+        clases: Arreglo (N,) con la clase de cada patrón
+
+        Retorno:
+        Cadena hexadecimal de la huella
+    """
+
+    huella = hashlib.sha256()
+    huella.update(np.ascontiguousarray(patrones, dtype=np.uint8).tobytes())
+    huella.update(np.ascontiguousarray(clases, dtype=np.uint8).tobytes())
+
+    return huella.hexdigest()
+
+def entrenar_modelo(patrones, clases, parametros=None, semilla=0) -> dict:
+    """
+        Ajusta el escalador y el perceptrón con el 75 por ciento de los
+        patrones, igual que lo hacía la GUI.
+
+        Parámetros:
+        patrones: Arreglo (N, 3) con los componentes RGB
+        clases: Arreglo (N,) con la clase de cada patrón
+        parametros: Hiperparámetros del MLPClassifier, por defecto PARAMETROS_MLP
+        semilla: Semilla de la separación, para que el entrenamiento sea reproducible
+
+        Retorno:
+        Diccionario del artefacto con la versión, la de sklearn, la huella y
+        el número de filas de los datos, los patrones aprendidos después en línea, los
+        hiperparámetros, el escalador y el perceptrón
+    """
+
+    parametros = dict(PARAMETROS_MLP if parametros is None else parametros)
+
+    # Separamos la información en datos de testeo y entrenamiento
+    entmientoX, testX, entmientoY, testY = train_test_split(patrones, clases, random_state=semilla)
+
+    escalador = StandardScaler().fit(entmientoX)
+
+    mlp_clf = MLPClassifier(**parametros)
+    mlp_clf.fit(escalador.transform(entmientoX), entmientoY)
+
+    return {
+        'version': VERSION_MODELO,
+        'sklearn': sklearn.__version__,
+        'huella': huella_datos(patrones, clases),
+        'filas': len(patrones),
+        'agregados': (np.zeros((0, np.shape(patrones)[1]), dtype=np.uint8), np.zeros(0, dtype=np.uint8)),
+        'parametros': parametros,
+        'escalador': escalador,
+        'mlp': mlp_clf
+    }
+
+def guardar_modelo(artefacto, ruta=RUTA_MODELO) -> None:
+    """
+        Guarda el artefacto en disco; el archivo anterior sólo se reemplaza
+        cuando el nuevo está completo.
+
+        Parámetros:
+        artefacto: Diccionario devuelto por entrenar_modelo
+        ruta: Ruta del archivo del modelo
+    """
+
+    temporal = ruta + '.tmp'
+
+    with open(temporal, 'wb') as archivo:
+        pickle.dump(artefacto, archivo)
+
+    os.replace(temporal, ruta)
+
+def cargar_modelo(ruta=RUTA_MODELO) -> dict:
+    """
+        Lee el artefacto guardado.
+
+        Parámetros:
+        ruta: Ruta del archivo del modelo
+
+        Retorno:
+        Diccionario del artefacto, o None si no existe, está dañado o es
+        de otra versión del artefacto o de sklearn, para entrenarlo de nuevo
+    """
+
+    # Un modelo de otra versión de sklearn puede fallar al leerse con cualquiera de estos errores
+    try:
+        with open(ruta, 'rb') as archivo:
+            artefacto = pickle.load(archivo)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError, TypeError):
+        return None
+
+    if not isinstance(artefacto, dict) or artefacto.get('version') != VERSION_MODELO:
+        return None
+
+    if artefacto.get('sklearn') != sklearn.__version__:
+        return None
+
+    return artefacto
+
+def coincide_datos(artefacto, patrones, clases) -> bool:
+    """
+        Indica si el modelo se entrenó exactamente con los patrones del
+        almacén: las primeras filas son las del entrenamiento completo y el
+        resto, en el mismo orden, las que aprendió en línea.
+
+        Parámetros:
+        artefacto: Diccionario del modelo
+        patrones: Arreglo (N, 3) con los componentes RGB del almacén
+        clases: Arreglo (N,) con la clase de cada patrón
+
+        Retorno:
+        Verdadero si el modelo corresponde a los datos
+    """
+
+    filas = artefacto['filas']
+    agregados, clases_agregadas = artefacto['agregados']
+
+    if len(patrones) != filas + len(agregados):
+        return False
+
+    if huella_datos(patrones[:filas], clases[:filas]) != artefacto['huella']:
+        return False
+
+    return (np.array_equal(np.asarray(patrones[filas:], dtype=np.uint8), agregados)
+            and np.array_equal(np.asarray(clases[filas:], dtype=np.uint8), clases_agregadas))
+
+def obtener_modelo(almacen=None, ruta=RUTA_MODELO, parametros=None) -> dict:
+    """
+        Devuelve el modelo guardado si se entrenó con los mismos datos que
+        tiene hoy el almacén; si no, lo entrena de nuevo y lo guarda.
+
+        Parámetros:
+        almacen: Origen de los patrones, ArchivoCSV o AlmacenBinario
+        ruta: Ruta del archivo del modelo
+        parametros: Hiperparámetros para reentrenar; por defecto los del modelo guardado
+
+        Retorno:
+        Diccionario del artefacto
+    """
+
+    almacen = almacen if almacen is not None else ArchivoCSV()
+    patrones, clases = almacen.leer_arreglos()
+
+    artefacto = cargar_modelo(ruta)
+
+    if artefacto is not None and coincide_datos(artefacto, patrones, clases):
+        if parametros is None or parametros == artefacto['parametros']:
+            return artefacto
+
+    if parametros is None and artefacto is not None:
+        parametros = artefacto['parametros']
+
+    artefacto = entrenar_modelo(patrones, clases, parametros)
+    guardar_modelo(artefacto, ruta)
+
+    return artefacto
+
+class PipelineMLP():
+    """
+        Evaluación por lotes del escalador y el perceptrón ya entrenados,
+        hecha directamente con numpy: una multiplicación de matrices por capa.
+
+        El escalador es una transformación afín, (x - media) / escala, así
+        que puede fundirse con la primer capa:
+        W' = W / escala y b' = b - (media / escala) W.
+    """
+
+    def __init__(self, escalador, mlp_clf, fusionar=True, tipo=np.float32) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            escalador: StandardScaler ajustado con los datos de entrenamiento
+            mlp_clf: MLPClassifier entrenado con los datos escalados
+            fusionar: Si es verdadero funde el escalador con la primer capa
+            tipo: Tipo flotante en el que se hacen las multiplicaciones
+        """
+
+        self.clases = mlp_clf.classes_
+        self.activacion = ACTIVACIONES[mlp_clf.activation]
+        self.tipo = tipo
+        self.fusionado = fusionar
+
+        pesos = [w.astype(np.float64) for w in mlp_clf.coefs_]
+        sesgos = [b.astype(np.float64) for b in mlp_clf.intercepts_]
+
+        media = escalador.mean_ if escalador.with_mean else np.zeros(len(pesos[0]))
+        escala = escalador.scale_ if escalador.with_std else np.ones(len(pesos[0]))
+
+        if fusionar:
+            sesgos[0] = sesgos[0] - (media / escala) @ pesos[0]
+            pesos[0] = pesos[0] / escala[:, None]
+        else:
+            self.media = media.astype(tipo)
+            self.escala = escala.astype(tipo)
+
+        self.pesos = [w.astype(tipo) for w in pesos]
+        self.sesgos = [b.astype(tipo) for b in sesgos]
+
+    def _salidas(self, patrones) -> np.ndarray:
+        """
+            Salidas de la última capa antes de softmax o la logística.
+        """
+
+        z = np.atleast_2d(np.asarray(patrones)).astype(self.tipo)
+
+        if not self.fusionado:
+            z = (z - self.media) / self.escala
+
+        ultima = len(self.pesos) - 1
+        for capa, (w, b) in enumerate(zip(self.pesos, self.sesgos)):
+            z = z @ w
+            z += b
+
+            if capa < ultima:
+                z = self.activacion(z)
+
+        return z
+
+    def predecir_lote(self, patrones) -> np.ndarray:
+        """
+            Predice la clase de varios patrones a la vez.
+
+            Parámetros:
+            patrones: Arreglo (N, 3) con los componentes RGB, por ejemplo uint8
+
+            Retorno:
+            Arreglo numpy uint8 (N,) con la clase de cada patrón
+        """
+
+        z = self._salidas(patrones)
+
+        # softmax y logística son crecientes, no hace falta aplicarlas para elegir la clase
+        if z.shape[1] == 1:
+            indices = (z[:, 0] > 0).astype(np.intp)
+        else:
+            indices = np.argmax(z, axis=1)
+
+        return self.clases[indices].astype(np.uint8)
+
+    def probabilidades_lote(self, patrones) -> np.ndarray:
+        """
+            Probabilidad de cada clase para varios patrones, igual que
+            predict_proba del MLPClassifier.
+
+            Parámetros:
+            patrones: Arreglo (N, 3) con los componentes RGB
+
+            Retorno:
+            Arreglo (N, K) con una columna por clase, en el orden de self.clases
+        """
+
+        z = self._salidas(patrones).astype(np.float64)
+
+        if z.shape[1] == 1:
+            positiva = 1 / (1 + np.exp(-z[:, 0]))
+            return np.column_stack((1 - positiva, positiva))
+
+        z -= z.max(axis=1, keepdims=True)
+        np.exp(z, out=z)
+
+        return z / z.sum(axis=1, keepdims=True)
+
+def crear_pipeline(artefacto, fusionar=True) -> PipelineMLP:
+    """
+        Construye la evaluación por lotes de un artefacto guardado.
+
+        Parámetros:
+        artefacto: Diccionario devuelto por obtener_modelo
+        fusionar: Si es verdadero funde el escalador con la primer capa
+
+        Retorno:
+        PipelineMLP listo para predecir
+    """
+
+    return PipelineMLP(artefacto['escalador'], artefacto['mlp'], fusionar)
+
+class EntrenadorEnLinea():
+    """
+        Entrena en línea el perceptrón de un artefacto con lotes pequeños
+        de patrones etiquetados nuevos, en un hilo de fondo.
+
+        El entrenamiento se hace sobre una copia del modelo; al terminar
+        cada lote se construye un PipelineMLP nuevo y se entrega a la
+        función al_actualizar, que sólo tiene que reemplazar la referencia
+        del pipeline en uso. Así la clasificación nunca espera al
+        entrenamiento ni ve un modelo a medio actualizar. Cada cierto
+        tiempo, y al detenerlo, se guarda el modelo en disco.
+
+        El escalador queda fijo: sus medias y escalas están fundidas en los
+        pesos de la primer capa ya entrenados, y moverlas cambiaría las
+        entradas que esos pesos esperan.
+
+        Si un lote o un guardado falla, el hilo sigue con los siguientes
+        lotes; el error se entrega a al_fallar y el siguiente agregar lo
+        lanza, para que no se pierda en silencio.
+    """
+
+    def __init__(self, artefacto, al_actualizar=None, ruta=RUTA_MODELO,
+                 tam_lote=64, espera=0.5, intervalo_guardado=60.0, al_fallar=None) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            artefacto: Diccionario devuelto por obtener_modelo o entrenar_modelo
+            al_actualizar: Función que recibe (artefacto, pipeline) después de cada lote
+            ruta: Ruta del archivo del modelo, None para no guardarlo
+            tam_lote: Número de patrones con los que se hace una actualización
+            espera: Segundos máximos que un patrón espera a que se complete su lote
+            intervalo_guardado: Segundos mínimos entre dos guardados en disco
+            al_fallar: Función opcional que recibe la excepción de un lote o guardado fallido
+        """
+
+        if artefacto['mlp'].solver not in ('sgd', 'adam'):
+            raise ValueError("El entrenamiento en línea requiere el solver 'sgd' o 'adam'.")
+
+        self.artefacto = dict(artefacto, mlp=copy.deepcopy(artefacto['mlp']))
+
+        self.al_actualizar = al_actualizar
+        self.ruta = ruta
+        self.tam_lote = tam_lote
+        self.espera = espera
+        self.intervalo_guardado = intervalo_guardado
+        self.al_fallar = al_fallar
+
+        self.errores = []
+        self.cola = queue.Queue()
+        self.lotes = 0
+        self.sin_guardar = False
+        self._ultimo_guardado = time.monotonic()
+        self._hilo = threading.Thread(target=self._entrenar, daemon=True)
+        self._hilo.start()
+
+    def agregar(self, patrones, clases) -> None:
+        """
+            Encola patrones etiquetados; no espera al entrenamiento.
+
+            Parámetros:
+            patrones: Arreglo (N, 3) o vector con los componentes RGB
+            clases: Arreglo (N,) o entero con la clase de cada patrón
+        """
+
+        # El error de un lote anterior se lanza aquí, en el hilo de quien agrega
+        if self.errores:
+            raise self.errores.pop(0)
+
+        self.cola.put((np.atleast_2d(patrones), np.atleast_1d(clases)))
+
+    def _entrenar(self) -> None:
+        """
+            Junta los patrones de la cola en lotes y actualiza el modelo con
+            cada uno hasta recibir la marca de fin.
+        """
+
+        terminar = False
+
+        while not terminar:
+            patrones, clases = [], []
+            limite = None
+
+            while sum(len(p) for p in patrones) < self.tam_lote:
+                if patrones:
+                    limite_espera = max(limite - time.monotonic(), 0)
+                else:
+                    # Sin patrones sólo se despierta para el guardado pendiente
+                    limite_espera = self.intervalo_guardado if self.sin_guardar else None
+
+                try:
+                    elemento = self.cola.get(timeout=limite_espera)
+                except queue.Empty:
+                    break
+
+                if elemento is None:
+                    terminar = True
+                    break
+
+                if not patrones:
+                    limite = time.monotonic() + self.espera
+
+                patrones.append(elemento[0])
+                clases.append(elemento[1])
+
+            try:
+                if patrones:
+                    self._actualizar(np.concatenate(patrones), np.concatenate(clases))
+
+                if self.sin_guardar and (terminar or time.monotonic() - self._ultimo_guardado >= self.intervalo_guardado):
+                    self.guardar()
+            except Exception as error:
+                # El lote no queda entre los agregados, así que al iniciar de nuevo obtener_modelo reentrena
+                self._fallar(error)
+
+    def _fallar(self, error) -> None:
+        self.errores.append(error)
+
+        if self.al_fallar is not None:
+            self.al_fallar(error)
+
+    def _actualizar(self, patrones, clases) -> None:
+        """
+            Actualiza el perceptrón con un lote, lo anota entre los patrones
+            aprendidos y entrega el pipeline nuevo.
+        """
+
+        escalador = self.artefacto['escalador']
+        mlp_clf = self.artefacto['mlp']
+
+        mlp_clf.partial_fit(escalador.transform(patrones.astype(np.float64)), clases, classes=mlp_clf.classes_)
+
+        agregados, clases_agregadas = self.artefacto['agregados']
+        self.artefacto['agregados'] = (
+            np.concatenate((agregados, patrones.astype(np.uint8))),
+            np.concatenate((clases_agregadas, clases.astype(np.uint8)))
+        )
+
+        self.lotes += 1
+        self.sin_guardar = True
+
+        if self.al_actualizar is not None:
+            self.al_actualizar(dict(self.artefacto), PipelineMLP(escalador, mlp_clf))
+
+    def guardar(self) -> None:
+        """
+            Guarda el modelo actualizado. Conserva la huella de los datos del
+            entrenamiento completo y los patrones aprendidos desde entonces,
+            para que obtener_modelo lo cargue sólo si el almacén tiene esos
+            mismos patrones y ningún otro.
+        """
+
+        if self.ruta is None:
+            return
+
+        guardar_modelo(self.artefacto, self.ruta)
+
+        self.sin_guardar = False
+        self._ultimo_guardado = time.monotonic()
+
+    def detener(self) -> None:
+        """
+            Entrena los patrones pendientes, guarda el modelo si cambió y
+            termina el hilo.
+        """
+
+        self.cola.put(None)
+        self._hilo.join()
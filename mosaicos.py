@@ -0,0 +1,188 @@
+"""
+    Título del proyecto: SEGMENTACIÓN POR MOSAICOS
+    Descripción del proyecto: Segmenta imágenes más grandes que la memoria leyéndolas por mosaicos mapeados
+    en memoria y escribiendo el mapa de etiquetas en disco conforme avanza.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    argparse: Opciones de la línea de comandos
+    os, sys: Rutas y código de salida
+    numpy: Mapear en memoria la imágen de entrada y los archivos de salida
+    motor: Clasificadores sin interfaz gráfica
+    segmentacion: Superponer las regiones coloreadas de cada mosaico
+
+    Formatos de entrada:
+    .npy: Arreglo (alto, ancho, 3) BGR uint8, se lee sin cargarlo completo
+    .raw / .bgr: Pixeles BGR uint8 sin encabezado, requiere alto y ancho
+    Otros (PNG, JPG): cv2 sólo los decodifica completos; convertir_a_npy
+    los pasa una vez a .npy para procesarlos después por mosaicos.
+
+    Ejemplo:
+    python mosaicos.py mosaico.npy etiquetas.npy --metodo mlp --tam 2048
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from motor import METODOS, crear_clasificador
+from segmentacion import superponer
+
+def convertir_a_npy(ruta_imagen, ruta_npy) -> None:
+    """
+        Decodifica una imágen con cv2 y la guarda como .npy para poder
+        leerla por mosaicos sin decodificarla de nuevo.
+
+        Parámetros:
+        ruta_imagen: Ruta de la imágen PNG/JPG
+        ruta_npy: Ruta del archivo .npy de salida
+    """
+
+    import cv2
+
+    img = cv2.imread(ruta_imagen, 1)
+
+    if img is None:
+        raise ValueError(f'No se pudo leer la imagen {ruta_imagen}')
+
+    np.save(ruta_npy, img)
+
+def abrir_imagen(ruta, alto=None, ancho=None) -> np.ndarray:
+    """
+        Abre la imágen de entrada sin leerla completa cuando el formato lo permite.
+
+        Parámetros:
+        ruta: Ruta de la imágen (.npy, .raw/.bgr u otro formato de cv2)
+        alto: Alto en pixeles, sólo para archivos sin encabezado
+        ancho: Ancho en pixeles, sólo para archivos sin encabezado
+
+        Retorno:
+        Arreglo (alto, ancho, 3) BGR uint8, mapeado en memoria si es posible
+    """
+
+    extension = os.path.splitext(ruta)[1].lower()
+
+    if extension == '.npy':
+        img = np.load(ruta, mmap_mode='r')
+    elif extension in ('.raw', '.bgr'):
+        if alto is None or ancho is None:
+            raise ValueError('Los archivos sin encabezado requieren alto y ancho.')
+
+        img = np.memmap(ruta, dtype=np.uint8, mode='r', shape=(alto, ancho, 3))
+    else:
+        import cv2
+
+        img = cv2.imread(ruta, 1)
+
+        if img is None:
+            raise ValueError(f'No se pudo leer la imagen {ruta}')
+
+    if img.ndim != 3 or img.shape[2] != 3 or img.dtype != np.uint8:
+        raise ValueError('Se esperaba una imagen (alto, ancho, 3) de tipo uint8.')
+
+    return img
+
+def recorrer_mosaicos(alto, ancho, tam_mosaico) -> tuple:
+    """
+        Genera las ventanas (y0, y1, x0, x1) que cubren la imágen, renglón por renglón.
+    """
+
+    for y0 in range(0, alto, tam_mosaico):
+        for x0 in range(0, ancho, tam_mosaico):
+            yield y0, min(y0 + tam_mosaico, alto), x0, min(x0 + tam_mosaico, ancho)
+
+def segmentar_por_mosaicos(img, ruta_salida, clasificador, tam_mosaico=1024, ruta_superposicion=None) -> np.ndarray:
+    """
+        Segmenta la imágen mosaico por mosaico. Cada mosaico se copia a
+        memoria, se clasifica y su mapa de etiquetas se escribe en un .npy
+        mapeado en memoria; al terminar cada renglón de mosaicos se vacía
+        a disco, así que la memoria usada depende del tamaño del mosaico
+        y no del de la imágen. Si el clasificador usa textura local, cada
+        mosaico se lee con un margen del radio de la textura que se
+        recorta después de clasificarlo, para que los pixeles del borde
+        del mosaico tengan la misma vecindad que en la imágen completa.
+
+        Parámetros:
+        img: Arreglo (alto, ancho, 3) BGR uint8, normalmente de abrir_imagen
+        ruta_salida: Ruta del .npy (alto, ancho) uint8 de etiquetas
+        clasificador: Clasificador del motor ya cargado
+        tam_mosaico: Lado en pixeles de cada mosaico
+        ruta_superposicion: Ruta opcional de un .npy (alto, ancho, 3) con las regiones superpuestas
+
+        Retorno:
+        Arreglo con el número de pixeles de cada clase, indexado por clase
+    """
+
+    alto, ancho = img.shape[:2]
+
+    mapa = np.lib.format.open_memmap(ruta_salida, mode='w+', dtype=np.uint8, shape=(alto, ancho))
+
+    mezcla = None
+    if ruta_superposicion is not None:
+        mezcla = np.lib.format.open_memmap(ruta_superposicion, mode='w+', dtype=np.uint8, shape=(alto, ancho, 3))
+
+    etapa = getattr(clasificador, 'etapa', None)
+    margen = etapa.radio if etapa is not None and etapa.textura else 0
+
+    conteo = np.zeros(256, dtype=np.int64)
+    renglon = 0
+
+    for y0, y1, x0, x1 in recorrer_mosaicos(alto, ancho, tam_mosaico):
+        if y0 != renglon:
+            mapa.flush()
+            if mezcla is not None:
+                mezcla.flush()
+            renglon = y0
+
+        # En los bordes de la imágen el margen se recorta, como en la imágen completa
+        ym0, ym1 = max(y0 - margen, 0), min(y1 + margen, alto)
+        xm0, xm1 = max(x0 - margen, 0), min(x1 + margen, ancho)
+
+        extendido = np.ascontiguousarray(img[ym0:ym1, xm0:xm1])
+        etiquetas = clasificador.segmentar_imagen(extendido)[y0 - ym0:y1 - ym0, x0 - xm0:x1 - xm0]
+        mosaico = extendido[y0 - ym0:y1 - ym0, x0 - xm0:x1 - xm0]
+
+        mapa[y0:y1, x0:x1] = etiquetas
+        conteo += np.bincount(etiquetas.ravel(), minlength=256)
+
+        if mezcla is not None:
+            mezcla[y0:y1, x0:x1] = superponer(mosaico, etiquetas)
+
+    mapa.flush()
+    del mapa
+
+    if mezcla is not None:
+        mezcla.flush()
+        del mezcla
+
+    return conteo
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description='Segmenta una imagen grande por mosaicos.')
+    parser.add_argument('entrada', help='Imagen .npy, .raw/.bgr o PNG/JPG')
+    parser.add_argument('salida', help='Archivo .npy del mapa de etiquetas')
+    parser.add_argument('--metodo', choices=METODOS, default='euclidiana', help='Método de clasificación')
+    parser.add_argument('--lut', help='Tabla compilada con tabla_lut.compilar_lut, en lugar del método')
+    parser.add_argument('--tam', type=int, default=1024, help='Lado de cada mosaico en pixeles')
+    parser.add_argument('--alto', type=int, help='Alto de la imagen, para archivos sin encabezado')
+    parser.add_argument('--ancho', type=int, help='Ancho de la imagen, para archivos sin encabezado')
+    parser.add_argument('--superposicion', help='Archivo .npy opcional con las regiones superpuestas')
+    args = parser.parse_args(argumentos)
+
+    img = abrir_imagen(args.entrada, args.alto, args.ancho)
+    clasificador = crear_clasificador(args.metodo, args.lut)
+
+    conteo = segmentar_por_mosaicos(img, args.salida, clasificador, args.tam, args.superposicion)
+
+    total = conteo.sum()
+    for clase in (1, 2, 3):
+        print(f'C{clase}: {conteo[clase] / total:.1%}')
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
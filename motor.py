@@ -0,0 +1,620 @@
+"""
+    Título del proyecto: MOTOR DE CLASIFICACIÓN
+    Descripción del proyecto: Los métodos de clasificación sin interfaz gráfica, con una interfaz común.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    copy: Vistas de un clasificador con otra regla de decisión
+    numpy: Operar los patrones como arreglos
+    dis_euclidiana: Distancias de los patrones a los centroides
+    segmentacion: Clasificar imágenes completas y guardar sus regiones coloreadas
+
+    modelo_bayesiano, indice_knn y modelo_mlp (y con ellos sklearn) sólo se
+    importan cuando se ajusta o carga el clasificador que los necesita.
+"""
+
+import copy
+
+import numpy as np
+
+from dis_euclidiana import distancias_por_lotes
+from segmentacion import guardar_superposicion, segmentar_por_colores
+
+# Centroides RGB de las regiones: C1 cielo, C2 pasto, C3 tierra
+CENTROIDES = np.array(
+    (
+        (203, 212, 218),
+        (102, 92, 41),
+        (181, 146, 109)
+    ),
+    dtype=np.uint8
+)
+
+def mensaje_clase(clase) -> str:
+    """
+        Cadena que se le muestra al usuario final con la clase asignada:
+        C1: Clase cielo
+        C2: Clase pasto
+        C3: Clase tierra
+
+        Parámetros:
+        clase: Entero de la clase (1, 2 o 3)
+    """
+
+    if clase in (1, 2, 3):
+        return f"El patrón pertenece a la clase C{clase}"
+
+    return ""
+
+class Clasificador():
+    """
+        Interfaz común de los clasificadores: ajustar con patrones RGB y sus
+        clases, y predecir un patrón, un lote de patrones o una imágen completa.
+    """
+
+    # Qué miden las columnas de puntajes_lote; None si el clasificador no los calcula
+    PUNTAJE = None
+
+    # Cambia cada vez que el modelo aprende, así quien guarda sus respuestas sabe cuándo descartarlas
+    version = 0
+
+    def cargar(self) -> 'Clasificador':
+        """
+            Prepara el clasificador con sus datos por defecto.
+
+            Retorno:
+            El mismo clasificador, para encadenar llamadas
+        """
+
+        return self
+
+    def ajustar(self, patrones, clases) -> 'Clasificador':
+        """
+            Ajusta el clasificador con patrones de entrenamiento.
+
+            Parámetros:
+            patrones: Arreglo (N, 3) con los componentes RGB
+            clases: Arreglo (N,) con la clase de cada patrón
+
+            Retorno:
+            El mismo clasificador, para encadenar llamadas
+        """
+
+        raise NotImplementedError
+
+    def predecir_lote(self, patrones) -> np.ndarray:
+        """
+            Predice la clase de varios patrones a la vez.
+
+            Parámetros:
+            patrones: Arreglo (N, 3) con los componentes RGB
+
+            Retorno:
+            Arreglo numpy uint8 (N,) con la clase asignada a cada patrón
+        """
+
+        raise NotImplementedError
+
+    def puntajes_lote(self, patrones) -> tuple:
+        """
+            Puntaje de cada patrón para cada clase, como la distancia a la
+            clase, para mostrarle al usuario en qué se basó la decisión.
+
+            Parámetros:
+            patrones: Arreglo (N, 3) con los componentes RGB
+
+            Retorno:
+            Tupla con las clases (K,) y los puntajes (N, K), una columna por clase
+        """
+
+        raise NotImplementedError
+
+    def predecir(self, patron) -> int:
+        """
+            Predice la clase de un solo patrón.
+
+            Parámetros:
+            patron: Vector con los componentes RGB de un pixel
+
+            Retorno:
+            Entero de la clase asignada
+        """
+
+        return int(self.predecir_lote(np.atleast_2d(patron))[0])
+
+    def predecir_pixel(self, img, x, y) -> int:
+        """
+            Predice la clase de un pixel de una imágen, por ejemplo el que
+            se seleccionó con un clic.
+
+            Parámetros:
+            img: Arreglo numpy BGR tal como lo devuelve cv2.imread
+            x: Columna del pixel
+            y: Renglón del pixel
+
+            Retorno:
+            Entero de la clase asignada
+        """
+
+        return self.predecir(img[y, x, ::-1])
+
+    def segmentar_imagen(self, img, ruta_superposicion=None) -> np.ndarray:
+        """
+            Clasifica todos los pixeles de una imágen; cada color distinto
+            se clasifica una sola vez.
+
+            Parámetros:
+            img: Arreglo numpy BGR tal como lo devuelve cv2.imread
+            ruta_superposicion: Ruta opcional donde se guarda la imágen con las regiones coloreadas
+
+            Retorno:
+            Mapa de etiquetas (alto, ancho) uint8 con la clase de cada pixel
+        """
+
+        mapa = segmentar_por_colores(img, self.predecir_lote)
+
+        if ruta_superposicion is not None:
+            guardar_superposicion(ruta_superposicion, img, mapa)
+
+        return mapa
+
+class ClasificadorEuclidiano(Clasificador):
+    """
+        Asigna la clase del centroide más cercano en distancia euclidiana.
+    """
+
+    PUNTAJE = 'dE'
+
+    def __init__(self, centroides=CENTROIDES) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            centroides: Arreglo (3, 3) con el centroide RGB de C1, C2 y C3
+        """
+
+        self.centroides = np.asarray(centroides)
+        self.clases = np.arange(1, len(self.centroides) + 1, dtype=np.uint8)
+
+    def ajustar(self, patrones, clases) -> 'ClasificadorEuclidiano':
+        """
+            Toma como centroide de cada clase el promedio de sus patrones.
+        """
+
+        patrones = np.asarray(patrones, dtype=np.float64)
+        clases = np.asarray(clases)
+
+        self.clases = np.unique(clases).astype(np.uint8)
+        self.centroides = np.array([patrones[clases == clase].mean(axis=0) for clase in self.clases])
+
+        return self
+
+    def predecir_lote(self, patrones) -> np.ndarray:
+        cercanos = distancias_por_lotes(patrones, self.centroides, solo_argmin=True)
+
+        return self.clases[cercanos]
+
+    def puntajes_lote(self, patrones) -> tuple:
+        return self.clases, distancias_por_lotes(patrones, self.centroides)
+
+class ClasificadorBayesiano(Clasificador):
+    """
+        Clasificador bayesiano paramétrico: aprende la media, covarianza y
+        probabilidad a priori de cada clase del conjunto de datos y decide
+        con la regla indicada. Los patrones etiquetados nuevos se suman al
+        modelo sin volver a leer el conjunto de datos: al cargarlo desde un
+        almacén, cada patrón que se agrega a ese almacén, por ejemplo los
+        que K-NN o el perceptrón aprenden, se suma con actualizar.
+    """
+
+    def __init__(self, regla='gaussiana', almacen=None) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            regla: Regla de decisión ('euclidiana', 'mahalanobis' o 'gaussiana')
+            almacen: Origen de los patrones de entrenamiento, ArchivoCSV o AlmacenBinario
+        """
+
+        self.regla = regla
+        self.almacen = almacen
+        self.modelo = None
+
+    def cargar(self) -> 'ClasificadorBayesiano':
+        """
+            Ajusta el modelo con los patrones del almacén, por defecto
+            datos.csv, y se suscribe a los que se le agreguen después.
+        """
+
+        if self.almacen is None:
+            from trabajar_csv import ArchivoCSV
+            self.almacen = ArchivoCSV()
+
+        self.almacen.suscribir(self.actualizar, self.ajustar)
+
+        return self
+
+    def cerrar(self) -> None:
+        """
+            Deja de recibir los patrones que se agregan al almacén.
+        """
+
+        if self.almacen is not None:
+            self.almacen.desuscribir(self.actualizar)
+
+    def ajustar(self, patrones, clases) -> 'ClasificadorBayesiano':
+        from modelo_bayesiano import ModeloBayesiano
+
+        self.modelo = ModeloBayesiano().actualizar(patrones, clases)
+
+        return self
+
+    def actualizar(self, patrones, clases) -> 'ClasificadorBayesiano':
+        """
+            Incorpora patrones etiquetados nuevos a las estadísticas de su clase.
+
+            Parámetros:
+            patrones: Arreglo (N, 3) con los componentes RGB
+            clases: Arreglo (N,) con la clase de cada patrón
+
+            Retorno:
+            El mismo clasificador, para encadenar llamadas
+        """
+
+        self.modelo.actualizar(patrones, clases)
+
+        return self
+
+    def con_regla(self, regla) -> 'ClasificadorBayesiano':
+        """
+            Otro clasificador con la regla indicada que comparte el modelo
+            aprendido, así cada ventana decide con su propia regla sobre
+            las mismas estadísticas.
+
+            Parámetros:
+            regla: Regla de decisión ('euclidiana', 'mahalanobis' o 'gaussiana')
+
+            Retorno:
+            Clasificador con el mismo modelo y la regla indicada
+        """
+
+        vista = copy.copy(self)
+        vista.regla = regla
+
+        return vista
+
+    @property
+    def version(self) -> int:
+        # Las vistas de con_regla comparten el modelo y con él su versión
+        return self.modelo.version
+
+    def predecir_lote(self, patrones) -> np.ndarray:
+        return self.modelo.predecir_lote(patrones, self.regla)
+
+    @property
+    def PUNTAJE(self) -> str:
+        # Distancia euclidiana o de Mahalanobis a la media, o -ln de la posteriori sin la constante
+        return {'euclidiana': 'dE', 'mahalanobis': 'dM', 'gaussiana': '-ln p'}[self.regla]
+
+    def puntajes_lote(self, patrones) -> tuple:
+        """
+            La medida que usa la regla de decisión: en las tres, la clase
+            asignada es la de menor puntaje.
+        """
+
+        # Un solo juego de parámetros aunque otro hilo actualice el modelo
+        parametros = self.modelo.parametros
+
+        if self.regla == 'euclidiana':
+            puntajes = distancias_por_lotes(patrones, parametros['medias'])
+        elif self.regla == 'mahalanobis':
+            puntajes = np.sqrt(self.modelo.mahalanobis(patrones, parametros))
+        else:
+            puntajes = -self.modelo.log_posteriori(patrones, parametros)
+
+        return parametros['clases'], puntajes
+
+class ClasificadorKNN(Clasificador):
+    """
+        K-NN con distancia mínima sobre un índice espacial del conjunto de
+        datos. Los patrones que se agregan quedan en el índice y, si se
+        indicó un almacén, también en el conjunto de datos.
+    """
+
+    # Distancia al vecino más cercano de cada clase entre los k que votan
+    PUNTAJE = 'd'
+
+    def __init__(self, k=1, desempate='cercano', almacen=None, compactacion=None, bits=8, aproximado=None,
+                 fragmentos=None) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            k: Número de vecinos que votan por la clase del patrón
+            desempate: Regla cuando dos clases empatan en votos ('cercano', 'menor' o 'distancia')
+            almacen: Origen y destino de los patrones, ArchivoCSV o AlmacenBinario
+            compactacion: None para usar todos los patrones, o un método de compactacion.METODOS_COMPACTACION
+            bits: Bits por componente RGB al compactar
+            aproximado: None para K-NN exacto, o el radio de sondeo de knn_aproximado.IndiceIVF
+            fragmentos: None para buscar en este proceso, o el número de procesos de knn_distribuido.IndiceDistribuido
+        """
+
+        self.k = k
+        self.desempate = desempate
+        self.almacen = almacen
+        self.compactacion = compactacion
+        self.bits = bits
+        self.aproximado = aproximado
+        self.fragmentos = fragmentos
+        self.indice = None
+        self.pesos = None
+        self.clases = None
+
+    def cargar(self) -> 'ClasificadorKNN':
+        """
+            Construye el índice con los patrones del almacén, por defecto datos.csv.
+        """
+
+        if self.almacen is None:
+            from trabajar_csv import ArchivoCSV
+            self.almacen = ArchivoCSV()
+
+        return self.ajustar(*self.almacen.leer_arreglos())
+
+    def ajustar(self, patrones, clases) -> 'ClasificadorKNN':
+        """
+            Construye el índice con los patrones, o con sus prototipos y el
+            peso de cada uno si se pidió compactarlos. El índice es exacto,
+            la rejilla aproximada si se indicó un radio de sondeo, o
+            repartido en procesos si se indicaron fragmentos.
+        """
+
+        from indice_knn import IndiceKNN
+
+        if self.compactacion is not None:
+            from compactacion import seleccionar_prototipos
+
+            patrones, clases, self.pesos = seleccionar_prototipos(
+                patrones, clases, self.compactacion, self.bits, self.k
+            )
+
+        self.cerrar()
+
+        if self.fragmentos is not None:
+            from knn_distribuido import IndiceDistribuido
+            self.indice = IndiceDistribuido(patrones, clases, self.fragmentos)
+        elif self.aproximado is None:
+            self.indice = IndiceKNN(patrones, clases)
+        else:
+            from knn_aproximado import IndiceIVF
+            self.indice = IndiceIVF(patrones, clases, self.aproximado)
+
+        self.clases = np.unique(clases).astype(np.uint8)
+        self.version += 1
+
+        return self
+
+    def cerrar(self) -> None:
+        """
+            Detiene los procesos del índice repartido, si los hay.
+        """
+
+        cerrar = getattr(self.indice, 'cerrar', None)
+
+        if cerrar is not None:
+            cerrar()
+
+    def predecir_lote(self, patrones) -> np.ndarray:
+        if self.pesos is not None:
+            from compactacion import votar_ponderado
+            return votar_ponderado(self.indice, self.pesos, patrones, self.k, self.desempate)
+
+        return self.indice.votar(patrones, self.k, self.desempate)
+
+    def puntajes_lote(self, patrones) -> tuple:
+        """
+            Las clases sin vecinos entre los k tienen puntaje infinito.
+        """
+
+        distancias, vecinas, _ = self.indice.consultar(patrones, self.k)
+
+        puntajes = np.where(vecinas[:, :, None] == self.clases, distancias[:, :, None], np.inf).min(axis=1)
+
+        return self.clases, puntajes
+
+    def agregar(self, patron, clase) -> None:
+        """
+            Agrega un patrón ya clasificado al índice y al almacén.
+
+            Parámetros:
+            patron: Vector con los componentes RGB
+            clase: Clase asignada al patrón
+        """
+
+        self.indice.agregar(patron, clase)
+        self.clases = np.union1d(self.clases, np.uint8(clase)).astype(np.uint8)
+        self.version += 1
+
+        if self.pesos is not None:
+            self.pesos = np.append(self.pesos, 1)
+
+        if self.almacen is not None:
+            self.almacen.escribir_patron(patron, clase)
+
+    def predecir_y_agregar(self, patron) -> int:
+        """
+            Clasifica el patrón y lo incorpora al conjunto de datos con la
+            clase asignada, como lo hace K-NN con distancia mínima.
+
+            Parámetros:
+            patron: Vector con los componentes RGB
+
+            Retorno:
+            Entero de la clase asignada
+        """
+
+        clase = self.predecir(patron)
+        self.agregar(patron, clase)
+
+        return clase
+
+class ClasificadorMLP(Clasificador):
+    """
+        Perceptrón multicapa entrenado con sklearn y evaluado por lotes
+        con el escalador fundido en la primer capa. Con el aprendizaje en
+        línea activo, los patrones etiquetados nuevos actualizan el modelo
+        en un hilo de fondo y el pipeline en uso se reemplaza al terminar
+        cada lote.
+    """
+
+    # Probabilidad de cada clase
+    PUNTAJE = 'p'
+
+    def __init__(self, ruta_modelo=None, almacen=None, parametros=None) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            ruta_modelo: Archivo del modelo guardado, por defecto modelo_mlp.RUTA_MODELO
+            almacen: Origen de los patrones de entrenamiento, por defecto datos.csv
+            parametros: Hiperparámetros del MLPClassifier, por defecto modelo_mlp.PARAMETROS_MLP
+        """
+
+        self.ruta_modelo = ruta_modelo
+        self.almacen = almacen
+        self.parametros = parametros
+        self.artefacto = None
+        self.pipeline = None
+        self.entrenador = None
+
+    def _usar(self, artefacto, pipeline=None) -> 'ClasificadorMLP':
+        from modelo_mlp import crear_pipeline
+
+        # Una sola asignación: predecir_lote usa el pipeline anterior o el nuevo, nunca una mezcla
+        self.pipeline = pipeline if pipeline is not None else crear_pipeline(artefacto)
+        self.artefacto = artefacto
+        self.version += 1
+
+        return self
+
+    def cargar(self) -> 'ClasificadorMLP':
+        """
+            Carga el modelo guardado, o lo entrena si el almacén cambió.
+        """
+
+        from modelo_mlp import RUTA_MODELO, obtener_modelo
+
+        if self.almacen is None:
+            from trabajar_csv import ArchivoCSV
+            self.almacen = ArchivoCSV()
+
+        artefacto = obtener_modelo(self.almacen, self.ruta_modelo or RUTA_MODELO, self.parametros)
+
+        return self._usar(artefacto)
+
+    def ajustar(self, patrones, clases) -> 'ClasificadorMLP':
+        """
+            Entrena un nuevo modelo con los patrones dados; no lo guarda.
+        """
+
+        from modelo_mlp import entrenar_modelo
+
+        return self._usar(entrenar_modelo(patrones, clases, self.parametros))
+
+    def predecir_lote(self, patrones) -> np.ndarray:
+        return self.pipeline.predecir_lote(patrones)
+
+    def puntajes_lote(self, patrones) -> tuple:
+        # El entrenamiento en línea puede reemplazar el pipeline en cualquier momento
+        pipeline = self.pipeline
+
+        return pipeline.clases, pipeline.probabilidades_lote(patrones)
+
+    def iniciar_aprendizaje(self, **opciones) -> None:
+        """
+            Inicia el entrenamiento en línea del modelo actual.
+
+            Parámetros:
+            opciones: Argumentos de modelo_mlp.EntrenadorEnLinea, como tam_lote o intervalo_guardado
+        """
+
+        from modelo_mlp import RUTA_MODELO, EntrenadorEnLinea
+
+        opciones.setdefault('ruta', self.ruta_modelo or RUTA_MODELO)
+
+        self.entrenador = EntrenadorEnLinea(self.artefacto, self._usar, **opciones)
+
+    def aprender(self, patron, clase) -> None:
+        """
+            Guarda un patrón etiquetado en el almacén y lo encola para el
+            entrenamiento en línea; regresa sin esperar a que se entrene.
+
+            Parámetros:
+            patron: Vector con los componentes RGB
+            clase: Clase correcta del patrón
+        """
+
+        patron = np.asarray(patron).astype(np.uint8)
+
+        if self.almacen is not None:
+            self.almacen.escribir_patron(patron, clase)
+
+        self.entrenador.agregar(patron, clase)
+
+    def detener_aprendizaje(self) -> None:
+        """
+            Entrena los patrones pendientes, guarda el modelo y detiene el
+            entrenamiento en línea.
+        """
+
+        if self.entrenador is not None:
+            self.entrenador.detener()
+            self.entrenador = None
+
+METODOS = ('euclidiana', 'bayesiano', 'knn', 'mlp')
+
+def crear_clasificador(metodo, ruta_lut=None, etapa=None) -> Clasificador:
+    """
+        Construye y carga el clasificador de uno de los métodos con sus
+        datos por defecto, o la tabla de consulta si se indica una.
+
+        Parámetros:
+        metodo: 'euclidiana', 'bayesiano', 'knn' o 'mlp'
+        ruta_lut: Ruta opcional de una tabla compilada con tabla_lut.compilar_lut
+        etapa: EtapaCaracteristicas opcional; el clasificador se entrena sobre sus características
+
+        Retorno:
+        Clasificador listo para predecir
+    """
+
+    if ruta_lut is not None:
+        from tabla_lut import ClasificadorLUT
+        return ClasificadorLUT(ruta_lut)
+
+    if etapa is not None:
+        from caracteristicas import ClasificadorCaracteristicas
+
+        clases = {
+            'euclidiana': ClasificadorEuclidiano,
+            'bayesiano': ClasificadorBayesiano,
+            'knn': ClasificadorKNN,
+            'mlp': ClasificadorMLP
+        }
+
+        if metodo not in clases:
+            raise ValueError(f'Método desconocido: {metodo}')
+
+        return ClasificadorCaracteristicas(clases[metodo](), etapa).cargar()
+
+    if metodo == 'euclidiana':
+        return ClasificadorEuclidiano().cargar()
+    if metodo == 'bayesiano':
+        return ClasificadorBayesiano().cargar()
+    if metodo == 'knn':
+        return ClasificadorKNN().cargar()
+    if metodo == 'mlp':
+        return ClasificadorMLP().cargar()
+
+    raise ValueError(f'Método desconocido: {metodo}')
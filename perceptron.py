@@ -7,24 +7,30 @@
 
     Librerías:
     tkinter: Kit de herramientas GUI.
+    os: Construir la ruta de la imágen segmentada
     cv2: Abrir imágen y extraer RGB de pixel seleccionado
     numpy: Convertir valores RGB en vector numpy para fácil operación de vectores
-    pandas: Operar datos de archivo csv
-    sklearn: Implementa el algoritmo de Perceptrón multicapa
+    motor: Perceptrón multicapa, entrenado o cargado si ya se entrenó con los mismos datos
+    segmentacion: Superponer las regiones coloreadas sobre la imágen
+    tareas: Cargar el modelo y clasificar en segundo plano sin congelar la ventana
+    visor: Mostrar las imágenes de OpenCV sin bloquear a tkinter
+    registro: Modelos compartidos con las demás ventanas de la aplicación
 """
 
 from tkinter import *
 from tkinter import ttk
 from tkinter import filedialog, messagebox
 
+import os
+
 import cv2
 import numpy as np
-import pandas as pd
 
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import confusion_matrix
-from sklearn.preprocessing import StandardScaler
-from sklearn.neural_network import MLPClassifier
+from motor import ClasificadorMLP, mensaje_clase
+from registro import RegistroModelos
+from segmentacion import superponer
+from tareas import GestorTareas, PanelTareas, segmentar_por_franjas
+from visor import InspectorPixeles, VisorImagen
 
 class PerceptronMulticapa():
     """
@@ -33,42 +39,37 @@ class PerceptronMulticapa():
         de clasificación percceptrón multicapa, y enviar una respuesta al usuario final.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, maestro=None, registro=None) -> None:
         """
             Constructor de la clase.
-            Además construye el perceptrón para no calcularlo por cada
-            nuevo patrón que analiza.
-        """
-
-        df = pd.read_csv('datos.csv')
-        # Removemos la columna CLASE y CASO
-        x = df.drop('CLASE', axis=1).drop('CASO', axis=1)
-        # Se asigna la columna CLASE para manejarla individualmente
-        y = df['CLASE']
-
-        # Separamos la información en datos de testeo y entrenamiento
-        entmientoX, testX, entmientoY, testY = train_test_split(x, y)
-
-        # Ajustamos los datos al modelo
-        sc = StandardScaler()
-        escalador = sc.fit(entmientoX)
-        entmientoX_escalado = escalador.transform(entmientoX)
-
-        # Creamos nuestro perceptrón
-        self.mlp_clf = MLPClassifier(
-            hidden_layer_sizes=(),
-            max_iter=300,
-            activation='relu',
-            solver='adam'
-        )
+            Además obtiene el perceptrón en segundo plano para no calcularlo
+            por cada nuevo patrón que analiza; sólo se entrena si el conjunto
+            de datos cambió desde la última vez que se guardó el modelo.
+
+            Parámetros:
+            maestro: Ventana de la aplicación; sin ella la GUI crea su propia ventana principal
+            registro: RegistroModelos compartido con las demás ventanas
+        """
+
+        self.motor = None
+        self.registro = registro if registro is not None else RegistroModelos()
+        self.clave = 'mlp'
+        self.registro.adquirir(self.clave)
 
-        # Ajustamos los datos para el modelo
-        self.mlp_clf.fit(entmientoX_escalado, entmientoY)
+        # Otras ventanas usan el mismo modelo desde sus propios hilos
+        self.candado = self.registro.candado(self.clave)
 
-        print('Se creó el perceptron')
+        # Dentro de la aplicación es una ventana secundaria; sola, es la principal
+        if maestro is None:
+            nueva_ventana = Tk()
+        else:
+            nueva_ventana = Toplevel(maestro)
 
-        nueva_ventana = Tk()
         nueva_ventana.title('Perceptrón Multicapa')
+        nueva_ventana.protocol('WM_DELETE_WINDOW', self.cerrar)
+        self.ventana = nueva_ventana
+        self.v_imagen = None
+        self.v_segmentacion = None
 
         #------------- VARIABLES GLOBALES -------------
         self.dir_img = StringVar()
@@ -99,6 +100,13 @@ class PerceptronMulticapa():
         self.e_blue = ttk.Entry(frm_principal, justify='center')
         self.e_blue.grid(row=3, column=1)
 
+        l_clase = ttk.Label(frm_principal, text="Clase:")
+        l_clase.grid(row=4, column=0)
+
+        self.c_clase = ttk.Combobox(frm_principal, values=('C1', 'C2', 'C3'), state='readonly', justify='center')
+        self.c_clase.set('C1')
+        self.c_clase.grid(row=4, column=1)
+
         #------------- BOTONES -------------
         btn_euc_manual = ttk.Button(frm_principal, text='Patrón digitado', command=self.evento_manual)
         btn_euc_manual.grid(row=5, column=0)
@@ -106,10 +114,35 @@ class PerceptronMulticapa():
         btn_euclidiano = ttk.Button(frm_principal, text='Desde imagen', command=self.abrir_imagen)
         btn_euclidiano.grid(row=5, column=1)
 
+        btn_segmentar = ttk.Button(frm_principal, text='Segmentar imagen', command=self.evento_segmentar)
+        btn_segmentar.grid(row=6, column=0, columnspan=2)
+
+        btn_ensenar = ttk.Button(frm_principal, text='Enseñar patrón', command=self.evento_ensenar)
+        btn_ensenar.grid(row=7, column=0, columnspan=2)
+
+        self.tareas = GestorTareas(nueva_ventana)
+        self.panel = PanelTareas(frm_principal, self.tareas, 8)
+
         for child in frm_principal.winfo_children():
             child.grid_configure(padx=5, pady=5)
 
-        nueva_ventana.mainloop()
+        # Si otra ventana ya cargó el modelo se usa de inmediato; si no, se carga en segundo plano
+        modelo = self.registro.modelo(self.clave)
+
+        if modelo is not None:
+            self.modelo_cargado(modelo)
+        else:
+            self.tareas.enviar(
+                self.registro.obtener, self.clave, lambda almacen: ClasificadorMLP(almacen=almacen),
+                descripcion='Cargando el perceptrón...',
+                al_terminar=self.modelo_cargado,
+                al_fallar=self.error_tarea
+            )
+
+        # Al cerrar el registro el perceptrón guarda lo aprendido
+        if maestro is None:
+            nueva_ventana.mainloop()
+            self.registro.cerrar()
 
     def abrir_imagen(self) -> None:
         """
@@ -118,6 +151,9 @@ class PerceptronMulticapa():
             su posterior uso en otro método.
         """
 
+        if not self.modelo_listo():
+            return
+
         try:
             archivo = filedialog.askopenfilename(
                 title="Seleccionar imagen", 
@@ -133,9 +169,9 @@ class PerceptronMulticapa():
     def clasificar(self, patron) -> str:
         """
             Predice a qué clase pertenece el patrón analizado, esto con ayuda
-            del método proporcionado por la librería sklearn, luego analiza el entero
-            asignado para devolver una cadena que le indique al usuario final la clase
-            a le fue asignada al patrón que seleccionó.
+            del perceptrón entrenado con sklearn, aplicando la misma escala que
+            se usó al entrenarlo, luego devuelve una cadena que le indique al
+            usuario final la clase que le fue asignada al patrón que seleccionó.
 
             Parámetros:
             patron: Arreglo numpy de los componentes RGB del pixel seleccionado
@@ -144,19 +180,16 @@ class PerceptronMulticapa():
             Cadena que indica la clase que le fue asignada
         """
 
-        clase_asignada = ""
+        with self.candado:
+            return mensaje_clase(self.motor.predecir(patron))
 
-        clase_calculada = self.mlp_clf.predict([list(patron)])[0]
-        print('se calculó el patron')
-
-        if clase_calculada == 1:
-            clase_asignada = "El patrón pertenece a la clase C1"
-        elif clase_calculada == 2:
-            clase_asignada = "El patrón pertenece a la clase C2"
-        elif clase_calculada == 3:
-            clase_asignada = "El patrón pertenece a la clase C3"
+    def clasificar_pixel(self, x, y) -> int:
+        """
+            Clasifica el pixel (x, y) de la imágen abierta.
+        """
 
-        return clase_asignada
+        with self.candado:
+            return self.motor.predecir_pixel(self.img, x, y)
 
     def evento_manual(self) -> None:
         """
@@ -166,28 +199,174 @@ class PerceptronMulticapa():
             asignada al patrón que digitó.
         """
 
+        if not self.modelo_listo():
+            return
+
         try:
             red = float(self.e_red.get())
             green = float(self.e_green.get())
             blue = float(self.e_blue.get())
 
             patron = np.array( (red, green, blue) )
+        except:
+            messagebox.showerror('Error de valor', 'Ingrese un valor válido RGB.')
+            return
+
+        self.tareas.enviar(
+            self.clasificar, patron,
+            descripcion='Clasificando...',
+            al_terminar=lambda clase: messagebox.showinfo('Clasificación', clase),
+            al_fallar=self.error_tarea
+        )
+
+    def evento_ensenar(self) -> None:
+        """
+            Toma el componente RGB que digita el usuario junto con la clase
+            elegida y lo entrega al perceptrón en un hilo trabajador, ya que
+            guardarlo en el almacén escribe en disco, para que aprenda de él
+            sin detener la interfaz.
+        """
+
+        if not self.modelo_listo():
+            return
+
+        try:
+            red = int(self.e_red.get())
+            green = int(self.e_green.get())
+            blue = int(self.e_blue.get())
+
+            if not all(0 <= valor <= 255 for valor in (red, green, blue)):
+                raise ValueError
+
+            clase = int(self.c_clase.get()[1])
+        except ValueError:
+            messagebox.showerror('Error de valor', 'Ingrese un valor válido RGB.')
+            return
+
+        self.tareas.enviar(
+            self.ensenar, np.array( (red, green, blue) ), clase,
+            descripcion='Guardando el patrón...',
+            al_terminar=lambda clase: messagebox.showinfo('Aprendizaje', f'El patrón se agregó a la clase C{clase}'),
+            al_fallar=self.error_tarea
+        )
+
+    def ensenar(self, patron, clase) -> int:
+        """
+            Guarda el patrón etiquetado y lo encola para el entrenamiento en
+            línea, en un hilo trabajador.
+
+            Retorno:
+            La clase del patrón, para el aviso al usuario
+        """
+
+        with self.candado:
+            self.motor.aprender(patron, clase)
+
+        return clase
+
+    def evento_segmentar(self) -> None:
+        """
+            Permite elegir una imágen, la segmenta completa en las 3 regiones
+            en segundo plano, guarda la superposición coloreada junto a la
+            imágen original y se la muestra al usuario.
+        """
 
-            clase = self.clasificar(patron)
+        if not self.modelo_listo():
+            return
 
-            messagebox.showinfo(
-                'Clasificación',
-                clase
+        try:
+            archivo = filedialog.askopenfilename(
+                title="Seleccionar imagen", 
+                filetypes=(("PNG", "*.png"), ("JPG", "*.jpg"), ("JPEG", "*.jpeg"))
             )
+
+            img = cv2.imread(archivo, 1)
+            if img is None:
+                raise ValueError
+
+            ruta_salida = os.path.splitext(archivo)[0] + '_segmentada.png'
         except:
-            messagebox.showerror('Error de valor', 'Ingrese un valor válido RGB.')
+            messagebox.showerror('Error', 'No se seleccionó ninguna imagen.')
+            return
+
+        self.tareas.enviar(
+            self.segmentar, img, ruta_salida,
+            descripcion='Segmentando...',
+            al_terminar=self.mostrar_segmentacion,
+            al_fallar=self.error_tarea,
+            con_tarea=True
+        )
+
+    def segmentar(self, tarea, img, ruta_salida) -> np.ndarray:
+        """
+            Segmenta la imágen por franjas en un hilo trabajador y guarda la
+            superposición junto a la original.
+
+            Retorno:
+            Imágen con las regiones coloreadas superpuestas
+        """
+
+        mapa = segmentar_por_franjas(tarea, self.motor, img, ruta_salida, candado=self.candado)
+
+        return superponer(img, mapa)
+
+    def mostrar_segmentacion(self, superposicion) -> None:
+        """
+            Muestra la imágen segmentada; si ya hay una abierta la reemplaza.
+        """
+
+        if self.v_segmentacion is not None and self.v_segmentacion.abierto:
+            self.v_segmentacion.mostrar(superposicion)
+        else:
+            self.v_segmentacion = VisorImagen(self.ventana, f'{self.ventana.title()} - segmentacion', superposicion)
+
+    def modelo_cargado(self, motor) -> None:
+        """
+            Recibe el perceptrón cargado en segundo plano y empieza a
+            aprender de los patrones que el usuario enseña.
+        """
+
+        self.motor = motor
+
+        # El aprendizaje sigue activo mientras el modelo esté en el registro
+        if self.motor.entrenador is None:
+            self.motor.iniciar_aprendizaje()
+
+    def modelo_listo(self) -> bool:
+        """
+            Indica si el clasificador ya se cargó, y si no, se lo avisa al usuario.
+        """
+
+        if self.motor is None:
+            messagebox.showwarning('Espere', 'El modelo todavía no está cargado.')
+            return False
+
+        return True
+
+    def error_tarea(self, error) -> None:
+        messagebox.showerror('Error', str(error))
+
+    def cerrar(self) -> None:
+        """
+            Cierra la ventana y sus imágenes; el modelo queda en el registro
+            para la próxima vez que se abra el método.
+        """
+
+        self.tareas.cerrar()
+
+        for visor in (self.v_imagen, self.v_segmentacion):
+            if visor is not None:
+                visor.cerrar()
+
+        self.registro.liberar(self.clave)
+        self.ventana.destroy()
 
     def m_event(self, event, x, y, flags, params) -> None:
         """
             Detecta cuando se ha hecho un clic en la imágen,
             y según las coordenadas extrae los componentes RGB,
-            los procesa con el método clasificar, y finalmente 
-            imprime en consola la clase asignada.
+            los procesa con el método clasificar, y finalmente
+            muestra en una ventana emergente el color y la clase asignada.
 
             Parámetros:
             event: Evento detectado
@@ -197,38 +376,39 @@ class PerceptronMulticapa():
             params: datos de usuario que se pasan cuando se devuelve la llamada
         """
 
-        # Evento con mouse, descomentar uno de los dos
-        #if event == cv2.EVENT_MOUSEMOVE:
-
-        # Evento con clic
+        # El movimiento del mouse lo atiende el InspectorPixeles, que muestra la clase sobre la imágen
         if event == cv2.EVENT_LBUTTONDOWN:
             b = self.img[y, x, 0]
             g = self.img[y, x, 1]
             r = self.img[y, x, 2]
-            print(r, g, b)
 
-            patron = np.array( (r, g, b) )
-
-            print(self.clasificar(patron))
-            
-            cv2.imshow('image', self.img)
+            # Las características de la imágen se calculan en el primer clic y se reutilizan
+            self.tareas.enviar(
+                self.clasificar_pixel, x, y,
+                descripcion='Clasificando...',
+                al_terminar=lambda clase: messagebox.showinfo('Clasificación', f'RGB ({r}, {g}, {b})\n{mensaje_clase(clase)}'),
+                al_fallar=self.error_tarea
+            )
 
     def trabajar_imagen(self) -> None:
         """
             Abre la imágen indicada por la ruta relativa para luego
-            mostrarla al usuario en un bucle infinito hasta que decida
-            cerrarla, y espera a que el vento de clic ocurra.
+            mostrarla al usuario hasta que decida cerrarla, atendiendo
+            los eventos de clic y mostrando la clase del pixel bajo el
+            cursor mientras la ventana principal sigue activa.
         """
 
         self.img = cv2.imread(self.dir_img, 1)
-    
-        cv2.imshow('image', self.img)
-    
-        cv2.setMouseCallback('image', self.m_event)
-    
-        cv2.waitKey(0)
-    
-        cv2.destroyAllWindows()
+
+        if self.v_imagen is not None:
+            self.v_imagen.cerrar()
+
+        # La ventana de OpenCV se revisa desde el ciclo de tkinter, sin bloquearlo, y
+        # clasifica el pixel bajo el cursor mientras la imágen se clasifica en segundo plano
+        self.v_imagen = InspectorPixeles(
+            self.ventana, f'{self.ventana.title()} - imagen', self.img, self.motor, self.tareas, self.m_event,
+            candado=self.candado
+        )
 
 if __name__ == "__main__":
     PerceptronMulticapa()
@@ -0,0 +1,135 @@
+"""
+    Título del proyecto: REGIONES DE ENTRENAMIENTO
+    Descripción del proyecto: Convierte los archivos Binarioreg* de listas de patrones a arreglos .npy contiguos con
+    sus metadatos, los carga mapeados en memoria y los divide en entrenamiento y prueba.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    hashlib: Huella de los patrones convertidos
+    json: Escribir y leer los metadatos de cada región
+    os: Rutas de los archivos
+    pickle: Leer, una sola vez, los archivos originales
+    numpy: Guardar, cargar y dividir los patrones como arreglos (N, 3) uint8
+
+    Cada región queda en dos archivos: Binarioreg<Región>.npy con los
+    patrones RGB y Binarioreg<Región>.json con la clase, el número de
+    patrones, el archivo de origen y la huella sha256 de los datos.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+
+# Clase de cada región: C1 cielo, C2 pasto (bosque), C3 tierra
+REGIONES = {'Cielo': 1, 'Bosque': 2, 'Tierra': 3}
+
+def _ruta_region(region, extension, directorio='.') -> str:
+    return os.path.join(directorio, f'Binarioreg{region}{extension}')
+
+def convertir_region(region, directorio='.') -> dict:
+    """
+        Convierte el archivo original de una región, una lista de arreglos
+        de 3 componentes, a un solo arreglo (N, 3) uint8 y escribe sus
+        metadatos. El archivo original se lee con pickle, así que sólo
+        debe usarse con los archivos del proyecto.
+
+        Parámetros:
+        region: Nombre de la región, una llave de REGIONES
+        directorio: Carpeta donde están los archivos
+
+        Retorno:
+        Diccionario de metadatos de la región
+    """
+
+    origen = _ruta_region(region, '', directorio)
+
+    with open(origen, 'rb') as fichero:
+        lista = pickle.load(fichero)
+
+    patrones = np.ascontiguousarray(np.stack(lista), dtype=np.uint8).reshape(-1, 3)
+
+    metadatos = {
+        'region': region,
+        'clase': REGIONES[region],
+        'patrones': int(len(patrones)),
+        'componentes': 'RGB',
+        'origen': os.path.basename(origen),
+        'sha256': hashlib.sha256(patrones.tobytes()).hexdigest()
+    }
+
+    np.save(_ruta_region(region, '.npy', directorio), patrones)
+
+    with open(_ruta_region(region, '.json', directorio), 'w') as archivo:
+        json.dump(metadatos, archivo, indent=2)
+
+    return metadatos
+
+def cargar_region(region, directorio='.', mapear=True) -> tuple:
+    """
+        Carga los patrones de una región ya convertida.
+
+        Parámetros:
+        region: Nombre de la región, una llave de REGIONES
+        directorio: Carpeta donde están los archivos
+        mapear: Si el arreglo se mapea en memoria en lugar de leerse completo
+
+        Retorno:
+        Tupla (patrones, metadatos); patrones es un arreglo (N, 3) uint8 de sólo lectura si se mapea
+    """
+
+    patrones = np.load(_ruta_region(region, '.npy', directorio), mmap_mode='r' if mapear else None)
+
+    with open(_ruta_region(region, '.json', directorio), 'r') as archivo:
+        metadatos = json.load(archivo)
+
+    if patrones.shape != (metadatos['patrones'], 3):
+        raise ValueError(f'La región {region} no coincide con sus metadatos.')
+
+    return patrones, metadatos
+
+def dividir_entrenamiento_prueba(patrones, proporcion=0.7, semilla=0) -> tuple:
+    """
+        Separa los patrones en entrenamiento y prueba con una permutación
+        aleatoria reproducible.
+
+        Parámetros:
+        patrones: Arreglo (N, 3) de una región
+        proporcion: Fracción de los patrones que va a entrenamiento
+        semilla: Semilla del generador aleatorio
+
+        Retorno:
+        Tupla (entrenamiento, prueba) de arreglos nuevos
+    """
+
+    orden = np.random.default_rng(semilla).permutation(len(patrones))
+    corte = int(len(patrones) * proporcion)
+
+    return patrones[orden[:corte]], patrones[orden[corte:]]
+
+def dividir_como_datos(patrones, proporcion=0.7) -> tuple:
+    """
+        Separa los patrones como se construyó datos.csv: el primer 70 por
+        ciento, en el orden del archivo, para entrenamiento y el resto para
+        prueba, así la prueba no comparte pixeles con el entrenamiento.
+
+        Parámetros:
+        patrones: Arreglo (N, 3) de una región
+        proporcion: Fracción de los patrones que va a entrenamiento
+
+        Retorno:
+        Tupla (entrenamiento, prueba) de vistas del arreglo
+    """
+
+    corte = int(len(patrones) * proporcion)
+
+    return patrones[:corte], patrones[corte:]
+
+if __name__ == '__main__':
+    for region in REGIONES:
+        metadatos = convertir_region(region)
+        print(f"{region}: {metadatos['patrones']} patrones, clase C{metadatos['clase']}")
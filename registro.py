@@ -0,0 +1,179 @@
+"""
+    Título del proyecto: REGISTRO DE MODELOS DE LA APLICACIÓN
+    Descripción del proyecto: Guarda los clasificadores ya cargados para que todas las ventanas de la aplicación los
+    compartan, junto con un solo almacén de patrones de entrenamiento.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    collections: Orden de uso de los modelos para descartar el menos reciente
+    threading: Cargar los modelos desde los hilos trabajadores de las ventanas
+"""
+
+import threading
+from collections import OrderedDict
+
+# Modelos cargados que se conservan sin ninguna ventana que los use
+CAPACIDAD = 3
+
+class RegistroModelos():
+    """
+        Clasificadores compartidos por las ventanas de la aplicación. Cada
+        uno se carga la primera vez que una ventana lo pide y se conserva
+        al cerrarla, así volver a abrir el método no cuesta nada. Todos se
+        cargan con el mismo almacén, de modo que K-NN y el perceptrón leen
+        el mismo conjunto de datos en memoria y ven los patrones que el
+        otro agrega.
+
+        Como cada ventana clasifica en sus propios hilos trabajadores, cada
+        modelo tiene un candado que las ventanas toman alrededor de cada
+        predicción o patrón agregado, así nunca lo usan dos hilos a la vez.
+
+        Los modelos que ninguna ventana usa se descartan del menos
+        reciente al más reciente cuando hay más de la capacidad indicada.
+    """
+
+    def __init__(self, almacen=None, capacidad=CAPACIDAD) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            almacen: Origen de los patrones de entrenamiento, por defecto ArchivoCSV de datos.csv
+            capacidad: Número de modelos sin usar que se conservan cargados
+        """
+
+        if almacen is None:
+            from trabajar_csv import ArchivoCSV
+            almacen = ArchivoCSV()
+
+        self.almacen = almacen
+        self.capacidad = capacidad
+
+        # Clave -> clasificador cargado, del uso menos reciente al más reciente
+        self._modelos = OrderedDict()
+        # Clave -> número de ventanas que usan el modelo
+        self._usos = {}
+        # Clave -> candado de carga, para que dos ventanas no carguen el mismo modelo
+        self._cargas = {}
+        # Clave -> candado de uso del modelo, compartido por las ventanas que lo usan
+        self._candados = {}
+        self._candado = threading.Lock()
+
+    def modelo(self, clave):
+        """
+            Devuelve el modelo si ya está cargado, sin cargarlo.
+
+            Parámetros:
+            clave: Nombre del modelo
+
+            Retorno:
+            El clasificador o None
+        """
+
+        with self._candado:
+            modelo = self._modelos.get(clave)
+
+            if modelo is not None:
+                self._modelos.move_to_end(clave)
+
+            return modelo
+
+    def candado(self, clave):
+        """
+            Devuelve el candado de uso del modelo, el mismo para todas las
+            ventanas que lo piden; se toma alrededor de cada predicción o
+            patrón agregado.
+
+            Parámetros:
+            clave: Nombre del modelo
+
+            Retorno:
+            threading.RLock del modelo
+        """
+
+        with self._candado:
+            return self._candados.setdefault(clave, threading.RLock())
+
+    def obtener(self, clave, crear):
+        """
+            Devuelve el modelo, cargándolo si es la primera vez que se pide.
+            La carga puede tardar, se llama desde un hilo trabajador.
+
+            Parámetros:
+            clave: Nombre del modelo, incluye las opciones con que se crea
+            crear: Función que recibe el almacén y devuelve el clasificador sin cargar
+
+            Retorno:
+            El clasificador cargado
+        """
+
+        with self._candado:
+            carga = self._cargas.setdefault(clave, threading.Lock())
+
+        with carga:
+            modelo = self.modelo(clave)
+
+            if modelo is None:
+                modelo = crear(self.almacen).cargar()
+
+                with self._candado:
+                    self._modelos[clave] = modelo
+                    self._expulsar()
+
+        return modelo
+
+    def adquirir(self, clave) -> None:
+        """
+            Marca el modelo como usado por una ventana; mientras tenga
+            ventanas no se descarta.
+        """
+
+        with self._candado:
+            self._usos[clave] = self._usos.get(clave, 0) + 1
+
+    def liberar(self, clave) -> None:
+        """
+            Indica que una ventana dejó de usar el modelo.
+        """
+
+        with self._candado:
+            self._usos[clave] -= 1
+
+            if self._usos[clave] == 0:
+                del self._usos[clave]
+
+            self._expulsar()
+
+    def _expulsar(self) -> None:
+        """
+            Descarta los modelos sin ventanas menos recientes hasta que
+            sólo quede la capacidad; se llama con el candado tomado.
+        """
+
+        libres = [clave for clave in self._modelos if clave not in self._usos]
+
+        for clave in libres[:max(0, len(libres) - self.capacidad)]:
+            self._descartar(self._modelos.pop(clave))
+
+    def _descartar(self, modelo) -> None:
+        # El perceptrón guarda lo aprendido en línea antes de descartarse
+        detener = getattr(modelo, 'detener_aprendizaje', None)
+
+        if detener is not None:
+            detener()
+
+        # K-NN repartido detiene sus procesos trabajadores
+        cerrar = getattr(modelo, 'cerrar', None)
+
+        if cerrar is not None:
+            cerrar()
+
+    def cerrar(self) -> None:
+        """
+            Descarta todos los modelos; se llama al salir de la aplicación.
+        """
+
+        with self._candado:
+            while self._modelos:
+                self._descartar(self._modelos.popitem()[1])
@@ -0,0 +1,201 @@
+"""
+    Título del proyecto: SEGMENTACIÓN DE IMÁGENES COMPLETAS
+    Descripción del proyecto: Funciones para clasificar todos los pixeles de una imágen en un solo paso, y una
+    memoria de colores para secuencias de imágenes.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    numpy: Operar todos los pixeles de la imágen como un solo arreglo
+    cv2: Mezclar y guardar la imágen con las regiones coloreadas; se importa
+         sólo en las funciones que lo usan, para que el motor no dependa de él
+"""
+
+import numpy as np
+
+# Colores BGR de cada clase: 0 sin clase, C1 cielo, C2 pasto, C3 tierra
+COLORES_CLASE = np.array(
+    (
+        (0, 0, 0),
+        (235, 206, 135),
+        (34, 139, 34),
+        (45, 82, 160)
+    ),
+    dtype=np.uint8
+)
+
+TOTAL_COLORES = 1 << 24
+
+def codificar_patrones(patrones) -> np.ndarray:
+    """
+        Empaqueta los componentes R, G, B de cada patrón en un solo
+        entero de 24 bits, que sirve como índice de una tabla de colores.
+
+        Parámetros:
+        patrones: Arreglo numpy (N, 3) con los componentes RGB
+
+        Retorno:
+        Arreglo numpy unidimensional uint32 con un código por patrón
+    """
+
+    patrones = np.atleast_2d(np.asarray(patrones))
+
+    codigos = patrones[:, 0].astype(np.uint32) << 16
+    codigos |= patrones[:, 1].astype(np.uint32) << 8
+    codigos |= patrones[:, 2].astype(np.uint32)
+
+    return codigos
+
+def codificar_colores(img) -> np.ndarray:
+    """
+        Empaqueta los componentes de cada pixel de una imágen BGR en un
+        solo entero de 24 bits con el orden R, G, B.
+
+        Parámetros:
+        img: Arreglo numpy (alto, ancho, 3) de tipo uint8 como lo entrega cv2.imread
+
+        Retorno:
+        Arreglo numpy unidimensional uint32 con un código por pixel
+    """
+
+    # Se invierte el orden de los canales sin copiar la imágen
+    return codificar_patrones(img.reshape(-1, 3)[:, ::-1])
+
+def decodificar_colores(codigos) -> np.ndarray:
+    """
+        Operación inversa de codificar_colores.
+
+        Parámetros:
+        codigos: Arreglo numpy de enteros de 24 bits
+
+        Retorno:
+        Arreglo numpy (N, 3) uint8 con los componentes R, G, B
+    """
+
+    codigos = np.asarray(codigos, dtype=np.uint32)
+
+    patrones = np.empty((codigos.size, 3), dtype=np.uint8)
+    patrones[:, 0] = codigos >> 16
+    patrones[:, 1] = (codigos >> 8) & 0xFF
+    patrones[:, 2] = codigos & 0xFF
+
+    return patrones
+
+def segmentar_por_colores(img, clasificar_lote) -> np.ndarray:
+    """
+        Clasifica una sola vez cada color distinto presente en la imágen
+        y reparte el resultado a todos los pixeles que lo comparten, de
+        modo que el costo depende del número de colores y no de pixeles.
+
+        Parámetros:
+        img: Arreglo numpy (alto, ancho, 3) BGR de tipo uint8
+        clasificar_lote: Función que recibe un arreglo (N, 3) RGB uint8 y devuelve N clases
+
+        Retorno:
+        Mapa de etiquetas (alto, ancho) uint8 con la clase de cada pixel
+    """
+
+    codigos = codificar_colores(img)
+
+    presentes = np.zeros(TOTAL_COLORES, dtype=bool)
+    presentes[codigos] = True
+    unicos = np.flatnonzero(presentes)
+
+    tabla = np.zeros(TOTAL_COLORES, dtype=np.uint8)
+    tabla[unicos] = clasificar_lote(decodificar_colores(unicos))
+
+    return tabla[codigos].reshape(img.shape[:2])
+
+def colorear(mapa) -> np.ndarray:
+    """
+        Pinta cada pixel del mapa de etiquetas con el color de su clase.
+
+        Parámetros:
+        mapa: Mapa de etiquetas (alto, ancho) uint8
+
+        Retorno:
+        Imágen BGR (alto, ancho, 3) uint8
+    """
+
+    # np.take es varias veces más rápido que indexar con el mapa directamente
+    return np.take(COLORES_CLASE, mapa, axis=0)
+
+def superponer(img, mapa, alfa=0.5) -> np.ndarray:
+    """
+        Mezcla la imágen original con las regiones coloreadas.
+
+        Parámetros:
+        img: Imágen BGR original
+        mapa: Mapa de etiquetas de la imágen
+        alfa: Peso de las regiones coloreadas en la mezcla
+
+        Retorno:
+        Imágen BGR con las regiones superpuestas
+    """
+
+    import cv2
+
+    return cv2.addWeighted(img, 1 - alfa, colorear(mapa), alfa, 0)
+
+def guardar_superposicion(ruta, img, mapa, alfa=0.5) -> None:
+    """
+        Escribe en disco la imágen original con las regiones superpuestas.
+
+        Parámetros:
+        ruta: Ruta del archivo de salida
+        img: Imágen BGR original
+        mapa: Mapa de etiquetas de la imágen
+        alfa: Peso de las regiones coloreadas en la mezcla
+    """
+
+    import cv2
+
+    cv2.imwrite(ruta, superponer(img, mapa, alfa))
+
+class MemoriaColores():
+    """
+        Tabla de 2^24 clases que se llena conforme aparecen colores nuevos,
+        para segmentar una secuencia de imágenes parecidas (los cuadros de
+        un video) clasificando sólo los colores que no se habían visto.
+        El 0 marca los colores que aún no se clasifican.
+    """
+
+    def __init__(self) -> None:
+        """
+            Constructor de la clase.
+        """
+
+        self.tabla = np.zeros(TOTAL_COLORES, dtype=np.uint8)
+
+    def reiniciar(self) -> None:
+        """
+            Olvida las clases guardadas, por ejemplo al cambiar de clasificador.
+        """
+
+        self.tabla.fill(0)
+
+    def segmentar(self, img, clasificar_lote) -> np.ndarray:
+        """
+            Igual que segmentar_por_colores, pero reutiliza las clases de
+            las imágenes anteriores.
+
+            Parámetros:
+            img: Arreglo numpy (alto, ancho, 3) BGR de tipo uint8
+            clasificar_lote: Función que recibe un arreglo (N, 3) RGB uint8 y devuelve N clases
+
+            Retorno:
+            Mapa de etiquetas (alto, ancho) uint8 con la clase de cada pixel
+        """
+
+        codigos = codificar_colores(img)
+        mapa = self.tabla[codigos]
+
+        faltantes = mapa == 0
+
+        if faltantes.any():
+            nuevos = np.unique(codigos[faltantes])
+            self.tabla[nuevos] = clasificar_lote(decodificar_colores(nuevos))
+            mapa[faltantes] = self.tabla[codigos[faltantes]]
+
+        return mapa.reshape(img.shape[:2])
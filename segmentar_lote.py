@@ -0,0 +1,278 @@
+"""
+    Título del proyecto: SEGMENTACIÓN POR LOTES
+    Descripción del proyecto: Segmenta desde la línea de comandos todas las imágenes de una carpeta o patrón
+    en las 3 regiones, repartiendo las imágenes entre varios procesos.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    argparse: Opciones de la línea de comandos
+    csv: Escribir las estadísticas de cada imágen
+    glob, os: Encontrar las imágenes y construir las rutas de salida
+    tempfile: Archivo del perceptrón entrenado con características para los trabajadores
+    concurrent.futures: Procesar las imágenes en paralelo
+    cv2: Leer las imágenes y escribir los mapas de etiquetas
+    numpy: Contar los pixeles de cada clase
+    caracteristicas: Clasificar en otros espacios de color
+    modelo_mlp: Guardar y cargar el perceptrón entrenado una sola vez
+    motor: Clasificadores sin interfaz gráfica y K-NN repartido en procesos
+    segmentacion: Superponer las regiones coloreadas sobre la imágen
+
+    Ejemplo:
+    python segmentar_lote.py fotos/ "otras/*.jpg" --metodo knn --salida resultados --procesos 8
+"""
+
+import argparse
+import csv
+import glob
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from caracteristicas import ESPACIOS, ClasificadorCaracteristicas, EtapaCaracteristicas
+from modelo_mlp import cargar_modelo, guardar_modelo
+from motor import METODOS, ClasificadorKNN, ClasificadorMLP, crear_clasificador
+from segmentacion import guardar_superposicion
+
+EXTENSIONES = ('.png', '.jpg', '.jpeg')
+
+# Clasificador de cada proceso trabajador, se crea una sola vez por proceso
+_clasificador = None
+
+def buscar_imagenes(entradas) -> list:
+    """
+        Expande las carpetas y patrones glob a la lista de imágenes PNG/JPG.
+
+        Parámetros:
+        entradas: Lista de carpetas, archivos o patrones glob
+
+        Retorno:
+        Lista ordenada de rutas de imágenes, sin repetidos
+    """
+
+    rutas = set()
+
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = [os.path.join(entrada, nombre) for nombre in os.listdir(entrada)]
+        else:
+            candidatos = glob.glob(entrada)
+
+        for ruta in candidatos:
+            if os.path.isfile(ruta) and ruta.lower().endswith(EXTENSIONES):
+                rutas.add(os.path.normpath(ruta))
+
+    return sorted(rutas)
+
+def nombres_salida(rutas) -> list:
+    """
+        Nombre de los resultados de cada imágen: su ruta sin extensión
+        relativa a la carpeta común de todas, así imágenes con el mismo
+        nombre en distintas carpetas no se sobreescriben. Si dos imágenes
+        de la misma carpeta sólo difieren en la extensión, ésta se agrega
+        al nombre.
+
+        Parámetros:
+        rutas: Lista de rutas de imágenes
+
+        Retorno:
+        Lista de nombres relativos a la carpeta de salida, en el orden de rutas
+    """
+
+    if not rutas:
+        return []
+
+    absolutas = [os.path.abspath(ruta) for ruta in rutas]
+    raiz = os.path.commonpath([os.path.dirname(ruta) for ruta in absolutas])
+
+    nombres = [os.path.relpath(os.path.splitext(ruta)[0], raiz) for ruta in absolutas]
+    repetidos = {nombre for nombre in nombres if nombres.count(nombre) > 1}
+
+    return [
+        nombre + '_' + os.path.splitext(ruta)[1][1:].lower() if nombre in repetidos else nombre
+        for nombre, ruta in zip(nombres, absolutas)
+    ]
+
+def _crear_etapa(espacios) -> EtapaCaracteristicas:
+    """
+        Etapa de características de las opciones, o None si se clasifica en
+        RGB. Sin textura, porque los clasificadores se entrenan con el
+        almacén, que sólo guarda RGB.
+    """
+
+    if espacios is None:
+        return None
+
+    return EtapaCaracteristicas(espacios)
+
+def _iniciar_trabajador(metodo, ruta_lut, espacios=None, ruta_modelo=None) -> None:
+    """
+        Crea el clasificador del proceso trabajador; con ruta_modelo carga
+        el perceptrón que el proceso principal ya entrenó con las
+        características en lugar de entrenarlo de nuevo.
+    """
+
+    global _clasificador
+
+    if ruta_modelo is not None:
+        perceptron = ClasificadorMLP()._usar(cargar_modelo(ruta_modelo))
+        _clasificador = ClasificadorCaracteristicas(perceptron, _crear_etapa(espacios))
+    else:
+        _clasificador = crear_clasificador(metodo, ruta_lut, _crear_etapa(espacios))
+
+def segmentar_archivo(ruta, dir_salida, nombre=None) -> dict:
+    """
+        Segmenta una imágen y escribe su mapa de etiquetas y su superposición.
+
+        Parámetros:
+        ruta: Ruta de la imágen
+        dir_salida: Carpeta donde se escriben los resultados
+        nombre: Nombre de los resultados relativo a dir_salida, ver nombres_salida; por defecto el de la imágen
+
+        Retorno:
+        Diccionario con la imágen, su número de pixeles y la fracción de cada clase
+    """
+
+    img = cv2.imread(ruta, 1)
+
+    if img is None:
+        raise ValueError(f'No se pudo leer la imagen {ruta}')
+
+    if nombre is None:
+        nombre = os.path.splitext(os.path.basename(ruta))[0]
+
+    os.makedirs(os.path.dirname(os.path.join(dir_salida, nombre)), exist_ok=True)
+
+    mapa = _clasificador.segmentar_imagen(img)
+
+    cv2.imwrite(os.path.join(dir_salida, nombre + '_etiquetas.png'), mapa)
+    guardar_superposicion(os.path.join(dir_salida, nombre + '_superposicion.png'), img, mapa)
+
+    conteo = np.bincount(mapa.ravel(), minlength=4)
+
+    return {
+        'IMAGEN': ruta,
+        'PIXELES': int(mapa.size),
+        'C1': conteo[1] / mapa.size,
+        'C2': conteo[2] / mapa.size,
+        'C3': conteo[3] / mapa.size
+    }
+
+def _segmentar_con_fragmentos(rutas, nombres, dir_salida, fragmentos, etapa) -> list:
+    """
+        Segmenta las imágenes una tras otra con un solo K-NN repartido en
+        procesos, en lugar de una copia del índice completo por proceso.
+    """
+
+    global _clasificador
+
+    knn = ClasificadorKNN(fragmentos=fragmentos)
+
+    if etapa is None:
+        _clasificador = knn.cargar()
+    else:
+        _clasificador = ClasificadorCaracteristicas(knn, etapa).cargar()
+
+    try:
+        return [segmentar_archivo(ruta, dir_salida, nombre) for ruta, nombre in zip(rutas, nombres)]
+    finally:
+        knn.cerrar()
+        _clasificador = None
+
+def segmentar_lote(rutas, metodo, dir_salida, procesos=None, ruta_lut=None, espacios=None, fragmentos=None) -> list:
+    """
+        Segmenta las imágenes repartiéndolas entre procesos y escribe el
+        archivo estadisticas.csv en la carpeta de salida. Los resultados
+        conservan las subcarpetas de las imágenes, ver nombres_salida. Con K-NN se puede
+        repartir en cambio el conjunto de datos, cada fragmento en su
+        proceso, útil cuando el conjunto es demasiado grande para copiarlo
+        en cada proceso.
+
+        Parámetros:
+        rutas: Lista de rutas de imágenes
+        metodo: Uno de motor.METODOS
+        dir_salida: Carpeta donde se escriben los resultados
+        procesos: Número de procesos trabajadores, por defecto uno por núcleo
+        ruta_lut: Ruta opcional de una tabla compilada, en lugar del método
+        espacios: Espacios de color de la etapa de características, None para RGB
+        fragmentos: Con K-NN, número de fragmentos del conjunto de datos; None reparte las imágenes
+
+        Retorno:
+        Lista con las estadísticas de cada imágen, en el mismo orden que rutas
+    """
+
+    os.makedirs(dir_salida, exist_ok=True)
+
+    if fragmentos is not None and (metodo != 'knn' or ruta_lut is not None):
+        raise ValueError('Sólo K-NN sin tabla compilada se puede repartir en fragmentos.')
+
+    nombres = nombres_salida(rutas)
+    ruta_modelo = None
+
+    # El perceptrón se entrena aquí, si hace falta, para que los trabajadores sólo lo carguen
+    if metodo == 'mlp' and ruta_lut is None:
+        etapa = _crear_etapa(espacios)
+
+        if etapa is None:
+            crear_clasificador(metodo)
+        else:
+            # Con características no hay modelo guardado, se pasa uno temporal
+            perceptron = crear_clasificador(metodo, etapa=etapa).base
+            descriptor, ruta_modelo = tempfile.mkstemp(suffix='.pkl')
+            os.close(descriptor)
+            guardar_modelo(perceptron.artefacto, ruta_modelo)
+
+    try:
+        if fragmentos is not None:
+            estadisticas = _segmentar_con_fragmentos(rutas, nombres, dir_salida, fragmentos, _crear_etapa(espacios))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=procesos,
+                initializer=_iniciar_trabajador,
+                initargs=(metodo, ruta_lut, espacios, ruta_modelo)
+            ) as ejecutor:
+                estadisticas = list(ejecutor.map(segmentar_archivo, rutas, [dir_salida] * len(rutas), nombres))
+    finally:
+        if ruta_modelo is not None:
+            os.remove(ruta_modelo)
+
+    with open(os.path.join(dir_salida, 'estadisticas.csv'), 'w') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=['IMAGEN', 'PIXELES', 'C1', 'C2', 'C3'])
+        escritor.writeheader()
+        escritor.writerows(estadisticas)
+
+    return estadisticas
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description='Segmenta imágenes en las regiones cielo, pasto y tierra.')
+    parser.add_argument('entradas', nargs='+', help='Carpetas, imágenes o patrones glob')
+    parser.add_argument('--metodo', choices=METODOS, default='euclidiana', help='Método de clasificación')
+    parser.add_argument('--salida', default='segmentadas', help='Carpeta de resultados')
+    parser.add_argument('--procesos', type=int, default=os.cpu_count(), help='Número de procesos trabajadores')
+    parser.add_argument('--lut', help='Tabla compilada con tabla_lut.compilar_lut, en lugar del método')
+    parser.add_argument('--espacios', nargs='+', choices=list(ESPACIOS), help='Espacios de color de las características')
+    parser.add_argument('--fragmentos', type=int, help='Con knn, reparte el conjunto de datos en este número de procesos')
+    args = parser.parse_args(argumentos)
+
+    rutas = buscar_imagenes(args.entradas)
+
+    if not rutas:
+        print('No se encontraron imágenes PNG o JPG.', file=sys.stderr)
+        return 1
+
+    estadisticas = segmentar_lote(
+        rutas, args.metodo, args.salida, args.procesos, args.lut, args.espacios, args.fragmentos
+    )
+
+    for fila in estadisticas:
+        print(f"{fila['IMAGEN']}: C1 {fila['C1']:.1%}  C2 {fila['C2']:.1%}  C3 {fila['C3']:.1%}")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
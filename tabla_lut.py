@@ -0,0 +1,145 @@
+"""
+    Título del proyecto: TABLA DE CONSULTA RGB
+    Descripción del proyecto: Compila cualquiera de los clasificadores en una tabla con la clase de los 256³ colores posibles.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    os: Reemplazar el archivo de la tabla de forma atómica y contar los núcleos
+    concurrent.futures: Clasificar los bloques de la tabla en paralelo
+    numpy: Crear y leer la tabla como arreglo mapeado en memoria
+    motor: Interfaz común de los clasificadores
+    segmentacion: Códigos de 24 bits de los colores y superposición de regiones
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from motor import Clasificador
+from segmentacion import (TOTAL_COLORES, codificar_colores, codificar_patrones,
+                          decodificar_colores, guardar_superposicion)
+
+# Cada bloque abarca todos los colores con el mismo componente R
+TAM_BLOQUE = 1 << 16
+
+def _compilar_bloque(tabla, clasificador, inicio) -> None:
+    """
+        Clasifica los colores de un bloque y los escribe en la tabla.
+    """
+
+    codigos = np.arange(inicio, inicio + TAM_BLOQUE, dtype=np.uint32)
+    tabla[inicio:inicio + TAM_BLOQUE] = clasificador.predecir_lote(decodificar_colores(codigos))
+
+def _escribir_tabla(ruta, clasificador, hilos) -> None:
+    """
+        Crea la tabla mapeada en memoria en la ruta y la llena por bloques;
+        el mapa se libera al terminar la función, antes de mover el archivo.
+    """
+
+    tabla = np.lib.format.open_memmap(ruta, mode='w+', dtype=np.uint8, shape=(TOTAL_COLORES,))
+
+    with ThreadPoolExecutor(max_workers=hilos or os.cpu_count()) as ejecutor:
+        inicios = range(0, TOTAL_COLORES, TAM_BLOQUE)
+
+        # list() para que se propague cualquier excepción de los hilos
+        list(ejecutor.map(_compilar_bloque, [tabla] * len(inicios), [clasificador] * len(inicios), inicios))
+
+    tabla.flush()
+
+def compilar_lut(clasificador, ruta='lut_rgb.npy', hilos=None) -> None:
+    """
+        Clasifica los 16.7 millones de colores RGB con el método
+        predecir_lote del clasificador y guarda el resultado en un
+        archivo .npy que después se puede mapear en memoria.
+
+        Los bloques se reparten entre hilos; numpy y sklearn liberan el
+        GIL en sus operaciones pesadas, así que se aprovechan los núcleos
+        sin copiar el clasificador a otros procesos.
+
+        Parámetros:
+        clasificador: Clasificador ya ajustado o cargado
+        ruta: Ruta del archivo .npy de salida
+        hilos: Número de hilos, por defecto uno por núcleo
+    """
+
+    temporal = ruta + '.tmp'
+    _escribir_tabla(temporal, clasificador, hilos)
+
+    # El archivo anterior sólo se reemplaza cuando la tabla está completa
+    os.replace(temporal, ruta)
+
+class ClasificadorLUT(Clasificador):
+    """
+        Clasificador que responde consultando una tabla compilada con
+        compilar_lut. La tabla se abre mapeada en memoria la primera vez
+        que se usa, y el sistema operativo sólo carga las páginas que se
+        consultan.
+    """
+
+    def __init__(self, ruta='lut_rgb.npy') -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            ruta: Ruta del archivo .npy generado por compilar_lut
+        """
+
+        self.ruta = ruta
+        self._tabla = None
+
+    @property
+    def tabla(self) -> np.ndarray:
+        """
+            Tabla de 2^24 clases, abierta al primer acceso.
+        """
+
+        if self._tabla is None:
+            self._tabla = np.load(self.ruta, mmap_mode='r')
+
+        return self._tabla
+
+    def ajustar(self, patrones, clases) -> 'ClasificadorLUT':
+        """
+            La tabla es de sólo lectura: no se ajusta con patrones, se
+            vuelve a compilar con compilar_lut a partir de un clasificador
+            ya ajustado.
+        """
+
+        raise TypeError('La tabla compilada es de sólo lectura; ajuste el clasificador original '
+                        f'y vuelva a generar {self.ruta} con compilar_lut.')
+
+    def predecir_lote(self, patrones) -> np.ndarray:
+        """
+            Consulta la clase de varios patrones con un solo índice.
+
+            Parámetros:
+            patrones: Arreglo numpy (N, 3) con los componentes RGB
+
+            Retorno:
+            Arreglo numpy uint8 con la clase asignada a cada patrón
+        """
+
+        return self.tabla[codificar_patrones(patrones)]
+
+    def segmentar_imagen(self, img, ruta_superposicion=None) -> np.ndarray:
+        """
+            Clasifica todos los pixeles de una imágen con un solo índice
+            sobre la tabla.
+
+            Parámetros:
+            img: Arreglo numpy BGR tal como lo devuelve cv2.imread
+            ruta_superposicion: Ruta opcional donde se guarda la imágen con las regiones coloreadas
+
+            Retorno:
+            Mapa de etiquetas (alto, ancho) uint8 con la clase de cada pixel
+        """
+
+        mapa = self.tabla[codificar_colores(img)].reshape(img.shape[:2])
+
+        if ruta_superposicion is not None:
+            guardar_superposicion(ruta_superposicion, img, mapa)
+
+        return mapa
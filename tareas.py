@@ -0,0 +1,362 @@
+"""
+    Título del proyecto: TAREAS EN SEGUNDO PLANO PARA LAS GUI
+    Descripción del proyecto: Ejecuta el entrenamiento y la clasificación en hilos trabajadores y entrega los resultados
+    al hilo de tkinter con after(), para que las ventanas sigan respondiendo mientras tanto.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    contextlib: Segmentar sin candado cuando el clasificador no se comparte
+    itertools: Números de las tareas
+    queue, threading: Mensajes de los trabajadores al hilo de tkinter y cancelación
+    time: Tiempo transcurrido de cada tarea
+    concurrent.futures: Hilos trabajadores
+    tkinter: Barra de progreso y botón de cancelar
+    numpy: Armar el mapa de etiquetas por franjas
+    segmentacion: Memoria de colores y guardar la imágen con las regiones coloreadas
+
+    Los trabajadores son hilos y no procesos porque los clasificadores ya
+    cargados se comparten con la GUI sin copiarlos, y numpy y sklearn
+    liberan el GIL en sus operaciones pesadas. tkinter sólo se toca desde
+    su propio hilo: los trabajadores ponen mensajes en una cola y la
+    ventana los revisa cada 16 ms (60 veces por segundo).
+"""
+
+import contextlib
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tkinter import TclError, ttk
+
+import numpy as np
+
+from segmentacion import MemoriaColores, guardar_superposicion
+
+# Milisegundos entre dos revisiones de la cola de mensajes
+INTERVALO_SONDEO = 16
+
+class TareaCancelada(Exception):
+    """
+        Se lanza dentro de una tarea cancelada la próxima vez que reporta progreso.
+    """
+
+class Tarea():
+    """
+        Trabajo enviado al GestorTareas. La función de la tarea puede
+        recibirla como primer argumento para reportar su avance; cada
+        reporte es también el punto donde se detiene si fue cancelada.
+        Una tarea que no reporta avance no se interrumpe, pero al
+        cancelarla su resultado se descarta.
+    """
+
+    def __init__(self, numero, descripcion, al_terminar, al_fallar) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            numero: Número consecutivo de la tarea
+            descripcion: Texto que se muestra mientras se ejecuta
+            al_terminar: Función que recibe el resultado, en el hilo de tkinter
+            al_fallar: Función que recibe la excepción, en el hilo de tkinter
+        """
+
+        self.numero = numero
+        self.descripcion = descripcion
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+
+        self.progreso = None
+        self.inicio = None
+        self._cancelada = threading.Event()
+        self._mensajes = None
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelada.is_set()
+
+    def cancelar(self) -> None:
+        self._cancelada.set()
+
+    def reportar(self, fraccion, texto=None) -> None:
+        """
+            Informa el avance de la tarea; se llama desde el hilo trabajador.
+
+            Parámetros:
+            fraccion: Avance entre 0 y 1
+            texto: Texto opcional que reemplaza la descripción
+
+            Excepciones:
+            TareaCancelada si la tarea se canceló
+        """
+
+        if self.cancelada:
+            raise TareaCancelada()
+
+        self._mensajes.put(('progreso', self, (fraccion, texto)))
+
+class GestorTareas():
+    """
+        Grupo de hilos trabajadores ligado a una ventana de tkinter. Los
+        resultados, errores y avances se entregan en el hilo de tkinter
+        con after(), nunca desde los trabajadores.
+    """
+
+    def __init__(self, ventana, hilos=1, al_cambiar=None) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            ventana: Widget de tkinter cuyo after() se usa para revisar los mensajes
+            hilos: Número de hilos trabajadores; con 1 las tareas se ejecutan
+             en el orden en que se envían. Aun así otras ventanas pueden usar el
+             mismo clasificador desde sus hilos, por eso las tareas que lo usan
+             toman el candado del modelo (RegistroModelos.candado)
+            al_cambiar: Función sin argumentos que se llama cuando una tarea empieza, avanza o termina
+        """
+
+        self.ventana = ventana
+        self.al_cambiar = al_cambiar
+
+        self.ejecutor = ThreadPoolExecutor(max_workers=hilos)
+        self.mensajes = queue.Queue()
+        self.activas = {}
+        self._numeros = itertools.count(1)
+        self._id_sondeo = None
+        self._cerrado = False
+
+        self._sondear()
+
+    def enviar(self, funcion, *args, descripcion='Procesando...', al_terminar=None, al_fallar=None,
+               con_tarea=False) -> Tarea:
+        """
+            Envía un trabajo a los hilos trabajadores.
+
+            Parámetros:
+            funcion: Función que se ejecuta en un hilo trabajador
+            args: Argumentos de la función
+            descripcion: Texto que se muestra mientras se ejecuta
+            al_terminar: Función que recibe el resultado, en el hilo de tkinter
+            al_fallar: Función que recibe la excepción, en el hilo de tkinter
+            con_tarea: Si la función recibe la Tarea como primer argumento para reportar su avance
+
+            Retorno:
+            La Tarea, que se puede cancelar
+        """
+
+        tarea = Tarea(next(self._numeros), descripcion, al_terminar, al_fallar)
+        tarea._mensajes = self.mensajes
+        self.activas[tarea.numero] = tarea
+
+        def ejecutar() -> None:
+            if tarea.cancelada:
+                self.mensajes.put(('cancelada', tarea, None))
+                return
+
+            self.mensajes.put(('inicio', tarea, time.perf_counter()))
+
+            try:
+                resultado = funcion(tarea, *args) if con_tarea else funcion(*args)
+            except TareaCancelada:
+                self.mensajes.put(('cancelada', tarea, None))
+            except Exception as error:
+                self.mensajes.put(('error', tarea, error))
+            else:
+                self.mensajes.put(('resultado', tarea, resultado))
+
+        self.ejecutor.submit(ejecutar)
+
+        return tarea
+
+    def cancelar_todas(self) -> None:
+        for tarea in list(self.activas.values()):
+            tarea.cancelar()
+
+    def _sondear(self) -> None:
+        """
+            Entrega en el hilo de tkinter los mensajes de los trabajadores y
+            se vuelve a programar con after().
+        """
+
+        cambio = False
+
+        while True:
+            try:
+                tipo, tarea, dato = self.mensajes.get_nowait()
+            except queue.Empty:
+                break
+
+            cambio = True
+
+            if tipo == 'inicio':
+                tarea.inicio = dato
+                continue
+
+            if tipo == 'progreso':
+                tarea.progreso = dato
+                continue
+
+            self.activas.pop(tarea.numero, None)
+
+            # El resultado de una tarea cancelada se descarta aunque haya terminado
+            if tarea.cancelada or tipo == 'cancelada':
+                continue
+
+            if tipo == 'resultado' and tarea.al_terminar is not None:
+                tarea.al_terminar(dato)
+            elif tipo == 'error':
+                if tarea.al_fallar is None:
+                    raise dato
+                tarea.al_fallar(dato)
+
+        if cambio and self.al_cambiar is not None:
+            self.al_cambiar()
+
+        if not self._cerrado:
+            self._id_sondeo = self.ventana.after(INTERVALO_SONDEO, self._sondear)
+
+    def cerrar(self) -> None:
+        """
+            Cancela las tareas, deja de revisar los mensajes y libera los
+            hilos sin esperar a que terminen.
+        """
+
+        self._cerrado = True
+        self.cancelar_todas()
+
+        if self._id_sondeo is not None:
+            try:
+                self.ventana.after_cancel(self._id_sondeo)
+            except TclError:
+                # La ventana ya se destruyó junto con sus after() pendientes
+                pass
+
+        self.ejecutor.shutdown(wait=False, cancel_futures=True)
+
+class PanelTareas():
+    """
+        Barra de progreso, texto de estado y botón para cancelar la tarea
+        más antigua en curso de un GestorTareas.
+    """
+
+    def __init__(self, contenedor, gestor, renglon) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            contenedor: Frame donde se colocan los elementos
+            gestor: GestorTareas que se muestra
+            renglon: Renglón del grid donde empieza el panel, ocupa dos
+        """
+
+        self.gestor = gestor
+        gestor.al_cambiar = self.actualizar
+
+        self.l_estado = ttk.Label(contenedor, text='Listo')
+        self.l_estado.grid(row=renglon, column=0, columnspan=2)
+
+        self.barra = ttk.Progressbar(contenedor, mode='determinate', maximum=1.0)
+        self.barra.grid(row=renglon + 1, column=0)
+
+        self.btn_cancelar = ttk.Button(contenedor, text='Cancelar', command=self.cancelar, state='disabled')
+        self.btn_cancelar.grid(row=renglon + 1, column=1)
+
+        self._animando = False
+
+    def _tarea_actual(self) -> Tarea:
+        if not self.gestor.activas:
+            return None
+
+        return self.gestor.activas[min(self.gestor.activas)]
+
+    def cancelar(self) -> None:
+        tarea = self._tarea_actual()
+
+        if tarea is not None:
+            tarea.cancelar()
+
+    def actualizar(self) -> None:
+        """
+            Muestra el estado de la tarea en curso; las tareas que no
+            reportan avance se muestran con la barra en movimiento.
+        """
+
+        tarea = self._tarea_actual()
+
+        if tarea is None:
+            self._detener_animacion()
+            self.barra['value'] = 0
+            self.l_estado['text'] = 'Listo'
+            self.btn_cancelar['state'] = 'disabled'
+            return
+
+        self.btn_cancelar['state'] = 'normal'
+
+        if tarea.progreso is None:
+            self.l_estado['text'] = tarea.descripcion
+            if not self._animando:
+                self.barra.configure(mode='indeterminate', maximum=100)
+                self.barra.start(INTERVALO_SONDEO)
+                self._animando = True
+        else:
+            self._detener_animacion()
+            fraccion, texto = tarea.progreso
+            self.barra['value'] = fraccion
+            self.l_estado['text'] = texto or tarea.descripcion
+
+    def _detener_animacion(self) -> None:
+        if self._animando:
+            self.barra.stop()
+            self.barra.configure(mode='determinate', maximum=1.0)
+            self._animando = False
+
+def segmentar_por_franjas(tarea, clasificador, img, ruta_superposicion=None, franjas=16, candado=None) -> np.ndarray:
+    """
+        Segmenta la imágen por franjas horizontales, reportando el avance
+        después de cada una para que la tarea muestre su progreso y se
+        pueda cancelar. Las franjas sólo cambian el resultado si el
+        clasificador usa textura local, por eso entonces se segmenta de una vez.
+        Todas las franjas comparten una memoria de colores, así cada color
+        se clasifica una sola vez en toda la imágen y la tabla de colores
+        se crea una sola vez.
+
+        Parámetros:
+        tarea: Tarea en la que se ejecuta
+        clasificador: Clasificador del motor ya cargado
+        img: Arreglo numpy BGR tal como lo devuelve cv2.imread
+        ruta_superposicion: Ruta opcional donde guardar la imágen con las regiones coloreadas
+        franjas: Número de franjas, y de reportes de avance
+        candado: Candado del modelo compartido, se toma mientras se clasifica cada franja
+
+        Retorno:
+        Mapa de etiquetas (alto, ancho) uint8 con la clase de cada pixel
+    """
+
+    if candado is None:
+        candado = contextlib.nullcontext()
+
+    etapa = getattr(clasificador, 'etapa', None)
+
+    if etapa is not None and etapa.textura:
+        with candado:
+            return clasificador.segmentar_imagen(img, ruta_superposicion)
+
+    alto = img.shape[0]
+    mapa = np.empty(img.shape[:2], dtype=np.uint8)
+    paso = max(1, -(-alto // franjas))
+    memoria = MemoriaColores()
+
+    for y in range(0, alto, paso):
+        tarea.reportar(y / alto, f'Segmentando {100 * y // alto}%')
+
+        # El candado se suelta entre franjas para que las otras ventanas no esperen toda la imágen
+        with candado:
+            mapa[y:y + paso] = memoria.segmentar(img[y:y + paso], clasificador.predecir_lote)
+
+    if ruta_superposicion is not None:
+        guardar_superposicion(ruta_superposicion, img, mapa)
+
+    return mapa
@@ -0,0 +1,9 @@
+"""
+    Configuración de las pruebas: los módulos del proyecto se importan desde
+    la raíz del repositorio.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
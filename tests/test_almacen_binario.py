@@ -0,0 +1,75 @@
+"""
+    Pruebas del almacén binario y de su conversión desde y hacia csv.
+"""
+
+import threading
+
+import numpy as np
+
+from almacen_binario import AlmacenBinario, exportar_csv, importar_csv
+
+
+def _escribir_csv(ruta, filas):
+    with open(ruta, 'w') as archivo:
+        archivo.write('CASO,R,G,B,CLASE\n')
+        for fila in filas:
+            archivo.write(','.join(str(valor) for valor in fila) + '\n')
+
+
+def test_importar_exportar(tmp_path):
+    filas = [(1, 10, 20, 30, 1), (2, 200, 100, 0, 2), (5, 255, 255, 255, 3)]
+    _escribir_csv(tmp_path / 'datos.csv', filas)
+
+    almacen = importar_csv(str(tmp_path / 'datos.csv'), str(tmp_path / 'datos.bin'), tam_bloque=2)
+    patrones, clases = almacen.leer_arreglos()
+
+    np.testing.assert_array_equal(patrones, [fila[1:4] for fila in filas])
+    np.testing.assert_array_equal(clases, [fila[4] for fila in filas])
+    assert almacen.ultimo_caso() == 5
+
+    exportar_csv(almacen, str(tmp_path / 'copia.csv'))
+    assert (tmp_path / 'copia.csv').read_text() == (tmp_path / 'datos.csv').read_text()
+
+
+def test_agregar_y_eliminar(tmp_path):
+    almacen = AlmacenBinario(str(tmp_path / 'datos.bin'))
+
+    assert len(almacen) == 0 and almacen.ultimo_caso() == 0
+
+    almacen.agregar_arreglos(np.array([[1, 2, 3], [4, 5, 6]]), [1, 2])
+    assert almacen.escribir_patron(np.array([7, 8, 9]), 3) == 3
+
+    almacen.eliminar_dato()
+    patrones, clases = almacen.leer_arreglos()
+
+    np.testing.assert_array_equal(patrones, [[1, 2, 3], [4, 5, 6]])
+    np.testing.assert_array_equal(clases, [1, 2])
+    assert almacen.ultimo_caso() == 2
+
+
+def test_casos_unicos_entre_hilos(tmp_path):
+    almacen = AlmacenBinario(str(tmp_path / 'datos.bin'))
+
+    def escribir():
+        for i in range(100):
+            almacen.escribir_patron(np.array([i, i, i]), 1)
+
+    hilos = [threading.Thread(target=escribir) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    casos = almacen.leer_datos()['CASO']
+    assert len(casos) == 400 and len(np.unique(casos)) == 400
+
+
+def test_suscribir(tmp_path):
+    almacen = AlmacenBinario(str(tmp_path / 'datos.bin'))
+    almacen.agregar_arreglos(np.array([[1, 2, 3]]), [1])
+
+    recibidos = []
+    almacen.suscribir(lambda patrones, clases: recibidos.append(len(patrones)), lambda patrones, clases: recibidos.append(len(patrones)))
+    almacen.escribir_patron(np.array([4, 5, 6]), 2)
+
+    assert recibidos == [1, 1]
@@ -0,0 +1,57 @@
+"""
+    Pruebas de la etapa de características con textura.
+"""
+
+import numpy as np
+import pytest
+
+from almacen_binario import AlmacenBinario
+from caracteristicas import ClasificadorCaracteristicas, EtapaCaracteristicas
+from motor import ClasificadorEuclidiano
+
+
+def _imagen():
+    generador = np.random.default_rng(0)
+    img = np.zeros((40, 60, 3), dtype=np.uint8)
+    # Cielo liso arriba y pasto con ruido abajo
+    img[:20] = (230, 180, 120)
+    img[20:] = np.clip(generador.normal((40, 140, 60), 30, (20, 60, 3)), 0, 255).astype(np.uint8)
+    return img
+
+
+def test_muestras_con_la_textura_de_la_imagen():
+    etapa = EtapaCaracteristicas(('rgb', 'lab'), textura=True)
+    img = _imagen()
+
+    filas, columnas = np.nonzero(np.ones(img.shape[:2], dtype=bool))
+    muestras = etapa.muestras(img, filas, columnas)
+
+    np.testing.assert_allclose(etapa.de_colores(muestras), etapa.de_imagen(img).reshape(-1, etapa.dimension), atol=1e-4)
+
+
+def test_rechaza_patrones_sin_textura(tmp_path):
+    etapa = EtapaCaracteristicas(textura=True)
+
+    with pytest.raises(ValueError):
+        etapa.de_colores(np.array([[1, 2, 3]]))
+
+    almacen = AlmacenBinario(str(tmp_path / 'datos.bin'))
+    almacen.agregar_arreglos(np.array([[1, 2, 3]]), [1])
+
+    with pytest.raises(ValueError):
+        ClasificadorCaracteristicas(ClasificadorEuclidiano(), etapa, almacen).cargar()
+
+
+def test_entrenar_y_predecir_con_textura():
+    etapa = EtapaCaracteristicas(textura=True)
+    img = _imagen()
+
+    filas, columnas = np.nonzero(np.ones(img.shape[:2], dtype=bool))
+    clases = np.where(filas < 20, 1, 2).astype(np.uint8)
+
+    clasificador = ClasificadorCaracteristicas(ClasificadorEuclidiano(), etapa)
+    clasificador.ajustar(etapa.muestras(img, filas, columnas), clases)
+
+    mapa = clasificador.segmentar_imagen(img)
+    assert clasificador.predecir_pixel(img, 5, 30) == mapa[30, 5]
+    assert np.mean(mapa.ravel() == clases) > 0.95
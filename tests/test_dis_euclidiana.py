@@ -0,0 +1,47 @@
+"""
+    Pruebas del núcleo de distancias por lotes contra el cálculo directo.
+"""
+
+import numpy as np
+
+from dis_euclidiana import distancia_euclidiana, distancias_por_lotes
+
+
+def _directas(consultas, prototipos):
+    diferencias = consultas[:, None, :].astype(np.float64) - prototipos[None, :, :].astype(np.float64)
+    return np.sqrt((diferencias ** 2).sum(axis=2))
+
+
+def test_enteros_de_8_bits():
+    generador = np.random.default_rng(0)
+    consultas = generador.integers(0, 256, (500, 3), dtype=np.uint8)
+    prototipos = generador.integers(0, 256, (70, 3), dtype=np.uint8)
+
+    np.testing.assert_allclose(distancias_por_lotes(consultas, prototipos, tam_bloque=64), _directas(consultas, prototipos), rtol=1e-6)
+
+    # Con enteros de 8 bits las distancias al cuadrado son exactas
+    cuadradas = distancias_por_lotes(consultas, prototipos, cuadrada=True)
+    np.testing.assert_array_equal(cuadradas, np.rint(_directas(consultas, prototipos) ** 2))
+
+
+def test_flotantes():
+    generador = np.random.default_rng(1)
+    consultas = generador.normal(size=(300, 5))
+    prototipos = generador.normal(size=(40, 5))
+
+    np.testing.assert_allclose(distancias_por_lotes(consultas, prototipos), _directas(consultas, prototipos), atol=1e-9)
+
+
+def test_solo_argmin():
+    generador = np.random.default_rng(2)
+    consultas = generador.integers(0, 256, (1000, 3), dtype=np.uint8)
+    prototipos = generador.integers(0, 256, (9, 3), dtype=np.uint8)
+
+    indices = distancias_por_lotes(consultas, prototipos, solo_argmin=True, tam_bloque=100)
+    directas = _directas(consultas, prototipos)
+
+    np.testing.assert_array_equal(directas[np.arange(len(consultas)), indices], directas.min(axis=1))
+
+
+def test_un_solo_par():
+    assert np.isclose(distancia_euclidiana((0, 0, 0), (3, 4, 0)), 5.0)
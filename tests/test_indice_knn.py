@@ -0,0 +1,59 @@
+"""
+    Pruebas de IndiceKNN contra la búsqueda exhaustiva.
+"""
+
+import numpy as np
+import pytest
+
+from indice_knn import IndiceKNN, votar_vecinos
+
+
+def _exhaustiva(consultas, patrones, k):
+    # El orden estable resuelve los empates a favor del patrón agregado primero
+    cuadradas = ((consultas[:, None, :].astype(np.int64) - patrones[None, :, :].astype(np.int64)) ** 2).sum(axis=2)
+    posiciones = np.argsort(cuadradas, axis=1, kind='stable')[:, :k]
+    return np.sqrt(np.take_along_axis(cuadradas, posiciones, axis=1)), posiciones
+
+
+def test_vecinos_y_empates():
+    generador = np.random.default_rng(0)
+    # Pocos niveles por componente, así hay muchos empates de distancia
+    patrones = generador.integers(0, 30, (3000, 3), dtype=np.uint8)
+    clases = generador.integers(1, 4, len(patrones)).astype(np.uint8)
+    consultas = generador.integers(0, 30, (2000, 3), dtype=np.uint8)
+
+    indice = IndiceKNN(patrones[:2000], clases[:2000], tam_buffer=128)
+    indice.agregar(patrones[2000:], clases[2000:])
+
+    for k in (1, 4):
+        distancias, vecinas, posiciones = indice.consultar(consultas, k)
+        esperadas, esperadas_pos = _exhaustiva(consultas, patrones, k)
+
+        np.testing.assert_allclose(distancias, esperadas)
+        np.testing.assert_array_equal(posiciones, esperadas_pos)
+        np.testing.assert_array_equal(vecinas, clases[posiciones])
+
+
+def test_votacion():
+    distancias = np.array([[1.0, 2.0, 3.0, 4.0]])
+    clases = np.array([[2, 3, 3, 2]], dtype=np.uint8)
+
+    assert votar_vecinos(distancias, clases, 'cercano')[0] == 2
+    assert votar_vecinos(distancias, clases, 'menor')[0] == 2
+    assert votar_vecinos(distancias[:, :3], clases[:, :3], 'cercano')[0] == 3
+
+
+def test_indice_vacio():
+    indice = IndiceKNN()
+    distancias, clases, posiciones = indice.consultar(np.zeros((4, 3)), 3)
+
+    assert distancias.shape == clases.shape == posiciones.shape == (4, 0)
+
+    with pytest.raises(ValueError):
+        indice.votar(np.zeros((4, 3)))
+
+    # Con el primer patrón ya responde, aunque siga en el búfer
+    indice.agregar(np.array([1, 2, 3]), 2)
+    distancias, clases, posiciones = indice.consultar(np.zeros((4, 3)), 3)
+
+    assert distancias.shape == (4, 1) and np.all(clases == 2) and np.all(posiciones == 0)
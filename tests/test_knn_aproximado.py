@@ -0,0 +1,46 @@
+"""
+    Pruebas del índice aproximado IVF contra K-NN exacto.
+"""
+
+import numpy as np
+
+from indice_knn import IndiceKNN
+from knn_aproximado import IndiceIVF
+
+
+def _datos(semilla=0):
+    generador = np.random.default_rng(semilla)
+    patrones = generador.integers(0, 256, (20000, 3), dtype=np.uint8)
+    clases = (patrones[:, 1] > patrones[:, 2]).astype(np.uint8) + 1
+    return patrones, clases, generador.integers(0, 256, (3000, 3), dtype=np.uint8)
+
+
+def test_recall_con_sondeo():
+    patrones, clases, consultas = _datos()
+    exactas, _, posiciones = IndiceKNN(patrones, clases).consultar(consultas, 1)
+
+    recuerdos = []
+    for sondeo in (0, 1, 2):
+        distancias, _, aproximadas = IndiceIVF(patrones, clases, sondeo).consultar(consultas, 1)
+        # Ningún vecino aproximado está más cerca que el exacto
+        assert np.all(distancias >= exactas - 1e-9)
+        recuerdos.append(np.mean(distancias == exactas))
+
+    assert recuerdos[0] <= recuerdos[1] <= recuerdos[2]
+    assert recuerdos[1] > 0.95 and recuerdos[2] > 0.99
+
+
+def test_radio_completo_es_exacto():
+    patrones, clases, consultas = _datos(1)
+    patrones, clases, consultas = patrones[:4000], clases[:4000], consultas[:300]
+
+    # Con un radio que cubre toda la rejilla la búsqueda es exhaustiva
+    indice = IndiceIVF(patrones[:3000], clases[:3000], sondeo=8, bits=3, tam_buffer=200)
+    indice.agregar(patrones[3000:], clases[3000:])
+
+    distancias, vecinas, posiciones = indice.consultar(consultas, 3)
+    esperadas, _, esperadas_pos = IndiceKNN(patrones, clases).consultar(consultas, 3)
+
+    np.testing.assert_allclose(distancias, esperadas)
+    np.testing.assert_array_equal(posiciones, esperadas_pos)
+    np.testing.assert_array_equal(vecinas, clases[posiciones])
@@ -0,0 +1,104 @@
+"""
+    Pruebas del índice K-NN distribuido contra IndiceKNN.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from indice_knn import IndiceKNN
+from knn_distribuido import IndiceDistribuido
+
+
+def _datos(n=3000, consultas=800, semilla=0):
+    generador = np.random.default_rng(semilla)
+    patrones = generador.random((n, 3)) * 255
+    clases = generador.integers(1, 4, n).astype(np.uint8)
+    return patrones, clases, generador.random((consultas, 3)) * 255
+
+
+def test_coincide_con_indice_exacto():
+    patrones, clases, consultas = _datos()
+    exacto = IndiceKNN(patrones, clases)
+    distribuido = IndiceDistribuido(patrones, clases, fragmentos=3)
+
+    try:
+        dis, cla, pos = distribuido.consultar(consultas, k=5)
+    finally:
+        distribuido.cerrar()
+
+    dis_exacto, _, _ = exacto.consultar(consultas, k=5)
+    np.testing.assert_allclose(dis, dis_exacto)
+    np.testing.assert_array_equal(cla, clases[pos])
+
+
+def test_empates_por_region():
+    generador = np.random.default_rng(1)
+    # Coordenadas enteras de poco rango para forzar empates entre fragmentos
+    patrones = generador.integers(0, 20, (3000, 3)).astype(np.float64)
+    clases = generador.integers(1, 4, len(patrones)).astype(np.uint8)
+    consultas = generador.integers(0, 20, (500, 3)).astype(np.float64)
+
+    cuadradas = ((consultas[:, None, :] - patrones[None, :, :]) ** 2).sum(axis=2)
+    esperadas = np.argsort(cuadradas, axis=1, kind='stable')[:, :4]
+
+    for particion in ('caso', 'region'):
+        distribuido = IndiceDistribuido(patrones, clases, fragmentos=3, particion=particion)
+        try:
+            dis, cla, pos = distribuido.consultar(consultas, k=4)
+        finally:
+            distribuido.cerrar()
+
+        np.testing.assert_array_equal(pos, esperadas)
+        np.testing.assert_allclose(dis, np.sqrt(np.take_along_axis(cuadradas, esperadas, axis=1)))
+        np.testing.assert_array_equal(cla, clases[pos])
+
+
+def test_consultas_concurrentes():
+    patrones, clases, consultas = _datos()
+    exacto = IndiceKNN(patrones, clases)
+    dis_exacto, _, _ = exacto.consultar(consultas, k=3)
+    distribuido = IndiceDistribuido(patrones, clases, fragmentos=2, tam_lote=64)
+    resultados = {}
+
+    def consultar(hilo):
+        # Cada hilo consulta un desplazamiento distinto del mismo lote
+        orden = np.roll(np.arange(len(consultas)), hilo * 97)
+        for _ in range(3):
+            dis, cla, pos = distribuido.consultar(consultas[orden], k=3)
+            resultados.setdefault(hilo, []).append((orden, dis, cla, pos))
+
+    hilos = [threading.Thread(target=consultar, args=(hilo,)) for hilo in range(4)]
+
+    try:
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    finally:
+        distribuido.cerrar()
+
+    assert len(resultados) == 4
+    for respuestas in resultados.values():
+        for orden, dis, cla, pos in respuestas:
+            np.testing.assert_allclose(dis, dis_exacto[orden])
+            np.testing.assert_array_equal(cla, clases[pos])
+
+
+def test_error_de_un_fragmento():
+    patrones, clases, _ = _datos(n=300)
+    # El árbol KD rechaza los valores no finitos al construirse en el trabajador
+    patrones[250] = np.nan
+
+    with pytest.raises(RuntimeError, match='fragmento 1') as error:
+        IndiceDistribuido(patrones, clases, fragmentos=2)
+
+    assert isinstance(error.value.__cause__, ValueError)
+
+
+def test_arbol_sin_copiar_el_fragmento():
+    patrones, clases, _ = _datos(n=300)
+    indice = IndiceKNN(patrones, clases)
+
+    assert np.shares_memory(np.asarray(indice.niveles[0]['arbol'].data), patrones)
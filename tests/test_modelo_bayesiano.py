@@ -0,0 +1,58 @@
+"""
+    Pruebas de las sumas acumuladas del modelo bayesiano contra numpy.
+"""
+
+import numpy as np
+
+from modelo_bayesiano import ModeloBayesiano
+
+
+def _datos(semilla=0):
+    generador = np.random.default_rng(semilla)
+    clases = generador.integers(1, 4, 3000).astype(np.uint8)
+    patrones = generador.normal(clases[:, None] * 60, 15, (3000, 3))
+    return patrones, clases
+
+
+def test_medias_y_covarianzas():
+    patrones, clases = _datos()
+    parametros = ModeloBayesiano(regularizacion=0).actualizar(patrones, clases).parametros
+
+    for i, clase in enumerate(parametros['clases']):
+        propios = patrones[clases == clase]
+
+        np.testing.assert_allclose(parametros['medias'][i], propios.mean(axis=0))
+        np.testing.assert_allclose(parametros['covarianzas'][i], np.cov(propios.T), rtol=1e-6)
+        assert np.isclose(parametros['priori'][i], len(propios) / len(patrones))
+
+
+def test_actualizar_por_partes():
+    patrones, clases = _datos(1)
+
+    completo = ModeloBayesiano().actualizar(patrones, clases)
+    por_partes = ModeloBayesiano()
+
+    # La primer parte no tiene la clase 3, se agrega después
+    primera = clases != 3
+    por_partes.actualizar(patrones[primera][:500], clases[primera][:500])
+    por_partes.actualizar(np.concatenate((patrones[primera][500:], patrones[~primera])),
+                          np.concatenate((clases[primera][500:], clases[~primera])))
+
+    np.testing.assert_array_equal(completo.conteos, por_partes.conteos)
+    np.testing.assert_allclose(completo.sumas, por_partes.sumas)
+    np.testing.assert_allclose(completo.productos, por_partes.productos)
+
+    for regla in ('euclidiana', 'mahalanobis', 'gaussiana'):
+        np.testing.assert_array_equal(completo.predecir_lote(patrones, regla), por_partes.predecir_lote(patrones, regla))
+
+
+def test_mahalanobis_directa():
+    patrones, clases = _datos(2)
+    modelo = ModeloBayesiano().actualizar(patrones, clases)
+    parametros = modelo.parametros
+
+    inversas = np.linalg.inv(parametros['covarianzas'])
+    diferencias = patrones[:50, None, :] - parametros['medias'][None, :, :]
+    directas = np.einsum('nki,kij,nkj->nk', diferencias, inversas, diferencias)
+
+    np.testing.assert_allclose(modelo.mahalanobis(patrones[:50]), directas, rtol=1e-8)
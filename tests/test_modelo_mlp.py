@@ -0,0 +1,124 @@
+"""
+    Pruebas del modelo persistente del perceptrón multicapa.
+"""
+
+import importlib
+import pickle
+import warnings
+
+import numpy as np
+import pytest
+
+from almacen_binario import AlmacenBinario
+from modelo_mlp import (EntrenadorEnLinea, PipelineMLP, cargar_modelo, coincide_datos, crear_pipeline, entrenar_modelo,
+                        guardar_modelo, obtener_modelo)
+
+PARAMETROS = {'hidden_layer_sizes': (4,), 'max_iter': 20, 'activation': 'relu', 'solver': 'adam', 'random_state': 0}
+
+
+@pytest.fixture(autouse=True)
+def sin_avisos():
+    # Con pocas iteraciones sklearn avisa que no convergió
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        yield
+
+
+def _almacen(ruta):
+    generador = np.random.default_rng(0)
+    clases = generador.integers(1, 4, 300).astype(np.uint8)
+    patrones = np.clip(generador.normal(clases[:, None] * 70, 20, (300, 3)), 0, 255).astype(np.uint8)
+
+    almacen = AlmacenBinario(str(ruta))
+    almacen.agregar_arreglos(patrones, clases)
+    return almacen
+
+
+def test_huella_invalida_el_modelo(tmp_path):
+    almacen = _almacen(tmp_path / 'datos.bin')
+    ruta = str(tmp_path / 'modelo.pkl')
+
+    artefacto = obtener_modelo(almacen, ruta, PARAMETROS)
+    assert artefacto['filas'] == 300
+
+    # Los mismos datos cargan el modelo guardado sin entrenar
+    assert obtener_modelo(almacen, ruta)['mlp'].coefs_[0].tobytes() == artefacto['mlp'].coefs_[0].tobytes()
+
+    almacen.escribir_patron(np.array([10, 20, 30]), 1)
+
+    nuevo = obtener_modelo(almacen, ruta)
+    assert nuevo['filas'] == 301 and nuevo['huella'] != artefacto['huella']
+    assert nuevo['parametros'] == PARAMETROS
+
+
+class _Incompatible():
+    # Al leerse importa un módulo que no existe, como un modelo de otra versión de sklearn
+    def __reduce__(self):
+        return importlib.import_module, ('sklearn_de_otra_version',)
+
+
+@pytest.mark.parametrize('contenido', [_Incompatible(), {'version': -1}, b'no es un modelo'])
+def test_modelo_ilegible_se_reentrena(tmp_path, contenido):
+    ruta = str(tmp_path / 'modelo.pkl')
+
+    with open(ruta, 'wb') as archivo:
+        if isinstance(contenido, bytes):
+            archivo.write(contenido)
+        else:
+            pickle.dump(contenido, archivo)
+
+    assert cargar_modelo(ruta) is None
+
+    artefacto = obtener_modelo(_almacen(tmp_path / 'datos.bin'), ruta, PARAMETROS)
+    assert cargar_modelo(ruta)['huella'] == artefacto['huella']
+
+
+def test_otra_version_de_sklearn(tmp_path):
+    ruta = str(tmp_path / 'modelo.pkl')
+    artefacto = obtener_modelo(_almacen(tmp_path / 'datos.bin'), ruta, PARAMETROS)
+
+    guardar_modelo(dict(artefacto, sklearn='0.0'), ruta)
+    assert cargar_modelo(ruta) is None
+
+
+@pytest.mark.parametrize('capas', [(), (6, 4)])
+@pytest.mark.parametrize('clases_distintas', [2, 3])
+def test_pipeline_igual_que_sklearn(capas, clases_distintas):
+    generador = np.random.default_rng(1)
+    clases = generador.integers(1, clases_distintas + 1, 400).astype(np.uint8)
+    patrones = np.clip(generador.normal(clases[:, None] * 60, 30, (400, 3)), 0, 255).astype(np.uint8)
+
+    artefacto = entrenar_modelo(patrones, clases, dict(PARAMETROS, hidden_layer_sizes=capas, activation='tanh'))
+    escalados = artefacto['escalador'].transform(patrones.astype(np.float64))
+
+    for fusionar in (True, False):
+        pipeline = crear_pipeline(artefacto, fusionar)
+        pipeline64 = PipelineMLP(artefacto['escalador'], artefacto['mlp'], fusionar, np.float64)
+
+        np.testing.assert_array_equal(pipeline64.predecir_lote(patrones), artefacto['mlp'].predict(escalados))
+        np.testing.assert_allclose(pipeline64.probabilidades_lote(patrones), artefacto['mlp'].predict_proba(escalados),
+                                   rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(pipeline.probabilidades_lote(patrones), artefacto['mlp'].predict_proba(escalados),
+                                   atol=1e-4)
+
+
+def test_entrenador_en_linea(tmp_path):
+    almacen = _almacen(tmp_path / 'datos.bin')
+    artefacto = obtener_modelo(almacen, str(tmp_path / 'modelo.pkl'), PARAMETROS)
+
+    recibidos, fallas = [], []
+    entrenador = EntrenadorEnLinea(artefacto, lambda artefacto, pipeline: recibidos.append(artefacto),
+                                   str(tmp_path / 'modelo.pkl'), tam_lote=2, espera=0.01, al_fallar=fallas.append)
+
+    entrenador.agregar(np.array([[10, 20, 30], [200, 210, 220]]), np.array([1, 3]))
+    # Una clase que el perceptrón no conoce hace fallar su lote sin detener el hilo
+    entrenador.agregar(np.array([[1, 2, 3], [4, 5, 6]]), np.array([9, 9]))
+    entrenador.detener()
+
+    assert len(recibidos) == 1 and len(fallas) == 1
+    with pytest.raises(ValueError):
+        entrenador.agregar(np.array([7, 8, 9]), 1)
+
+    # El modelo guardado sólo tiene el lote que sí se aprendió
+    almacen.agregar_arreglos(np.array([[10, 20, 30], [200, 210, 220]]), [1, 3])
+    assert coincide_datos(cargar_modelo(str(tmp_path / 'modelo.pkl')), *almacen.leer_arreglos())
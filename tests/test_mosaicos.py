@@ -0,0 +1,49 @@
+"""
+    Pruebas de la segmentación por mosaicos contra la imágen completa.
+"""
+
+import numpy as np
+
+from caracteristicas import ClasificadorCaracteristicas, EtapaCaracteristicas
+from mosaicos import abrir_imagen, segmentar_por_mosaicos
+from motor import ClasificadorEuclidiano
+from segmentacion import superponer
+
+
+def _imagen():
+    generador = np.random.default_rng(0)
+    return np.clip(generador.normal(128, 60, (70, 90, 3)), 0, 255).astype(np.uint8)
+
+
+def test_igual_que_imagen_completa(tmp_path):
+    img = _imagen()
+    np.save(tmp_path / 'entrada.npy', img)
+
+    clasificador = ClasificadorEuclidiano()
+    completo = clasificador.segmentar_imagen(img)
+
+    # Mosaicos que no dividen exactamente a la imágen
+    conteo = segmentar_por_mosaicos(abrir_imagen(str(tmp_path / 'entrada.npy')), str(tmp_path / 'etiquetas.npy'),
+                                    clasificador, tam_mosaico=32, ruta_superposicion=str(tmp_path / 'mezcla.npy'))
+
+    np.testing.assert_array_equal(np.load(tmp_path / 'etiquetas.npy'), completo)
+    np.testing.assert_array_equal(np.load(tmp_path / 'mezcla.npy'), superponer(img, completo))
+    np.testing.assert_array_equal(conteo[:4], np.bincount(completo.ravel(), minlength=4))
+
+
+def test_textura_con_margen(tmp_path):
+    img = _imagen()
+    np.save(tmp_path / 'entrada.npy', img)
+
+    etapa = EtapaCaracteristicas(textura=True)
+    filas, columnas = np.nonzero(np.ones(img.shape[:2], dtype=bool))
+    clases = np.array([1, 2, 3], dtype=np.uint8)[(filas + columnas) % 3]
+
+    clasificador = ClasificadorCaracteristicas(ClasificadorEuclidiano(), etapa)
+    clasificador.ajustar(etapa.muestras(img, filas, columnas), clases)
+    completo = clasificador.segmentar_imagen(img)
+
+    segmentar_por_mosaicos(abrir_imagen(str(tmp_path / 'entrada.npy')), str(tmp_path / 'etiquetas.npy'),
+                           clasificador, tam_mosaico=32)
+
+    np.testing.assert_array_equal(np.load(tmp_path / 'etiquetas.npy'), completo)
@@ -0,0 +1,57 @@
+"""
+    Pruebas de la segmentación vectorizada contra la clasificación pixel por pixel.
+"""
+
+import numpy as np
+import pytest
+
+from motor import ClasificadorBayesiano, ClasificadorEuclidiano, ClasificadorKNN
+from segmentacion import MemoriaColores
+
+
+def _entrenamiento():
+    generador = np.random.default_rng(0)
+    clases = generador.integers(1, 4, 600).astype(np.uint8)
+    patrones = np.clip(generador.normal(clases[:, None] * 70, 30, (600, 3)), 0, 255).astype(np.uint8)
+    return patrones, clases
+
+
+def _imagen(semilla=1):
+    # Pocos colores repetidos en toda la imágen
+    generador = np.random.default_rng(semilla)
+    paleta = generador.integers(0, 256, (12, 3), dtype=np.uint8)
+    return paleta[generador.integers(0, len(paleta), (24, 32))]
+
+
+def _por_pixel(clasificador, img):
+    alto, ancho = img.shape[:2]
+    return np.array([[clasificador.predecir_pixel(img, x, y) for x in range(ancho)] for y in range(alto)], dtype=np.uint8)
+
+
+@pytest.mark.parametrize('clasificador', [ClasificadorEuclidiano(), ClasificadorBayesiano('gaussiana'), ClasificadorKNN(k=3)],
+                         ids=['euclidiano', 'bayesiano', 'knn'])
+def test_igual_que_por_pixel(clasificador):
+    clasificador.ajustar(*_entrenamiento())
+    img = _imagen()
+
+    np.testing.assert_array_equal(clasificador.segmentar_imagen(img), _por_pixel(clasificador, img))
+
+
+def test_memoria_entre_imagenes():
+    clasificador = ClasificadorEuclidiano().ajustar(*_entrenamiento())
+    memoria = MemoriaColores()
+    llamadas = []
+
+    def clasificar_lote(patrones):
+        llamadas.append(len(patrones))
+        return clasificador.predecir_lote(patrones)
+
+    img = _imagen()
+    for _ in range(2):
+        np.testing.assert_array_equal(memoria.segmentar(img, clasificar_lote), _por_pixel(clasificador, img))
+
+    # La segunda imágen no tiene colores nuevos
+    assert llamadas == [len(np.unique(img.reshape(-1, 3), axis=0))]
+
+    otra = _imagen(2)
+    np.testing.assert_array_equal(memoria.segmentar(otra, clasificar_lote), _por_pixel(clasificador, otra))
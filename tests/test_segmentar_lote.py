@@ -0,0 +1,58 @@
+"""
+    Pruebas de la segmentación por lotes de una carpeta de imágenes.
+"""
+
+import csv
+import os
+
+import cv2
+import numpy as np
+
+from motor import crear_clasificador
+from segmentar_lote import buscar_imagenes, nombres_salida, segmentar_lote
+
+
+def _escribir_imagenes(carpeta):
+    generador = np.random.default_rng(0)
+    rutas = ['a/foto.png', 'b/foto.png', 'a/cielo.png', 'a/cielo.jpg']
+
+    for ruta in rutas:
+        os.makedirs(carpeta / os.path.dirname(ruta), exist_ok=True)
+        cv2.imwrite(str(carpeta / ruta), generador.integers(0, 256, (20, 30, 3), dtype=np.uint8))
+
+    return buscar_imagenes([str(carpeta / 'a'), str(carpeta / 'b')])
+
+
+def test_nombres_sin_colisiones(tmp_path):
+    rutas = _escribir_imagenes(tmp_path)
+    nombres = nombres_salida(rutas)
+
+    assert len(set(nombres)) == len(rutas) == 4
+    assert sorted(nombres) == sorted([os.path.join('a', 'cielo_jpg'), os.path.join('a', 'cielo_png'),
+                                      os.path.join('a', 'foto'), os.path.join('b', 'foto')])
+
+
+def test_resultados_y_porcentajes(tmp_path):
+    rutas = _escribir_imagenes(tmp_path / 'entrada')
+    salida = tmp_path / 'salida'
+
+    estadisticas = segmentar_lote(rutas, 'euclidiana', str(salida), procesos=2)
+    clasificador = crear_clasificador('euclidiana')
+
+    for ruta, nombre, fila in zip(rutas, nombres_salida(rutas), estadisticas):
+        mapa = clasificador.segmentar_imagen(cv2.imread(ruta, 1))
+        etiquetas = cv2.imread(str(salida / (nombre + '_etiquetas.png')), cv2.IMREAD_UNCHANGED)
+
+        np.testing.assert_array_equal(etiquetas, mapa)
+        assert os.path.isfile(salida / (nombre + '_superposicion.png'))
+
+        assert fila['IMAGEN'] == ruta and fila['PIXELES'] == mapa.size
+        for clase in (1, 2, 3):
+            assert np.isclose(fila[f'C{clase}'], np.mean(mapa == clase))
+        assert np.isclose(fila['C1'] + fila['C2'] + fila['C3'], 1)
+
+    with open(salida / 'estadisticas.csv') as archivo:
+        filas = list(csv.DictReader(archivo))
+
+    assert [fila['IMAGEN'] for fila in filas] == rutas
+    np.testing.assert_allclose([float(fila['C2']) for fila in filas], [fila['C2'] for fila in estadisticas])
@@ -0,0 +1,28 @@
+"""
+    Pruebas de la tabla de consulta compilada contra el clasificador original.
+"""
+
+import numpy as np
+import pytest
+
+from motor import ClasificadorEuclidiano
+from tabla_lut import ClasificadorLUT, compilar_lut
+
+
+def test_tabla_igual_al_clasificador(tmp_path):
+    clasificador = ClasificadorEuclidiano().cargar()
+    ruta = str(tmp_path / 'lut.npy')
+
+    compilar_lut(clasificador, ruta, hilos=2)
+    tabla = ClasificadorLUT(ruta)
+
+    patrones = np.random.default_rng(0).integers(0, 256, (20000, 3), dtype=np.uint8)
+    np.testing.assert_array_equal(tabla.predecir_lote(patrones), clasificador.predecir_lote(patrones))
+
+    img = patrones[:10000, ::-1].reshape(100, 100, 3).copy()
+    np.testing.assert_array_equal(tabla.segmentar_imagen(img), clasificador.segmentar_imagen(img))
+
+
+def test_tabla_de_solo_lectura(tmp_path):
+    with pytest.raises(TypeError, match='compilar_lut'):
+        ClasificadorLUT(str(tmp_path / 'lut.npy')).ajustar(np.zeros((1, 3)), [1])
@@ -0,0 +1,99 @@
+"""
+    Pruebas del archivo csv: búfer de escritura, caché y recuperación del diario.
+"""
+
+import numpy as np
+import pytest
+
+from trabajar_csv import ArchivoCSV
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    ruta = tmp_path / 'datos.csv'
+    ruta.write_text('CASO,R,G,B,CLASE\n1,10,20,30,1\n2,40,50,60,2\n')
+
+    yield str(ruta)
+
+    ArchivoCSV.vaciar_todos()
+    ArchivoCSV._cache.clear()
+
+
+def _terminar_sin_vaciar(archivo):
+    """
+        Deja el archivo como si el programa hubiera terminado sin vaciar el búfer.
+    """
+
+    clave = archivo._clave()
+
+    temporizador = ArchivoCSV._temporizadores.pop(clave, None)
+    if temporizador is not None:
+        temporizador.cancel()
+
+    ArchivoCSV._diarios.pop(clave).close()
+    ArchivoCSV._pendientes.pop(clave, None)
+    ArchivoCSV._cache.pop(clave, None)
+    ArchivoCSV._recuperados.discard(clave)
+
+
+def test_lectura_y_cache(ruta):
+    archivo = ArchivoCSV(ruta)
+    patrones, clases = archivo.leer_arreglos()
+
+    np.testing.assert_array_equal(patrones, [[10, 20, 30], [40, 50, 60]])
+    np.testing.assert_array_equal(clases, [1, 2])
+
+    # Las escrituras de la clase actualizan la caché sin volver a leer el archivo
+    assert archivo.escribir_patron(np.array([70, 80, 90]), 3) == 3
+    assert len(ArchivoCSV(ruta).leer_datos()) == 3
+
+    archivo.vaciar_buffer()
+    ArchivoCSV._cache.clear()
+    assert ArchivoCSV(ruta).ultimo_caso() == 3
+
+
+def test_recuperar_diario(ruta):
+    archivo = ArchivoCSV(ruta)
+    archivo.leer_datos()
+
+    archivo.escribir_patron(np.array([1, 2, 3]), 1)
+    archivo.escribir_patron(np.array([4, 5, 6]), 3)
+
+    _terminar_sin_vaciar(archivo)
+
+    # El csv no tiene los patrones, sólo el diario
+    with open(ruta) as contenido:
+        assert len(contenido.readlines()) == 3
+
+    patrones, clases = ArchivoCSV(ruta).leer_arreglos()
+
+    np.testing.assert_array_equal(patrones[-2:], [[1, 2, 3], [4, 5, 6]])
+    np.testing.assert_array_equal(clases[-2:], [1, 3])
+    assert ArchivoCSV(ruta).ultimo_caso() == 4
+
+    with open(ruta) as contenido:
+        assert len(contenido.readlines()) == 5
+
+
+def test_eliminar_dato(ruta):
+    archivo = ArchivoCSV(ruta)
+    archivo.escribir_patron(np.array([1, 2, 3]), 1)
+    archivo.eliminar_dato()
+
+    assert archivo.ultimo_caso() == 2
+    assert len(archivo.leer_datos()) == 2
+
+
+def test_diario_en_disco(ruta, monkeypatch):
+    import trabajar_csv
+
+    sincronizados = []
+    fsync = trabajar_csv.os.fsync
+    monkeypatch.setattr(trabajar_csv.os, 'fsync', lambda descriptor: (sincronizados.append(descriptor), fsync(descriptor)))
+
+    archivo = ArchivoCSV(ruta)
+    archivo.escribir_patron(np.array([1, 2, 3]), 1)
+
+    # El patrón ya está en el disco antes de volver, aunque siga en el búfer
+    assert ArchivoCSV._diarios[archivo._clave()].fileno() in sincronizados
+    assert ArchivoCSV._pendientes[archivo._clave()]
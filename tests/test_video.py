@@ -0,0 +1,69 @@
+"""
+    Pruebas de la tubería de video con un video sintético.
+"""
+
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from motor import ClasificadorEuclidiano
+from video import SegmentadorVideo
+
+CUADROS = 40
+
+
+@pytest.fixture
+def ruta_video(tmp_path):
+    ruta = str(tmp_path / 'entrada.avi')
+    generador = np.random.default_rng(0)
+
+    escritor = cv2.VideoWriter(ruta, cv2.VideoWriter_fourcc(*'MJPG'), 200.0, (32, 24))
+    for _ in range(CUADROS):
+        escritor.write(generador.integers(0, 256, (24, 32, 3), dtype=np.uint8))
+    escritor.release()
+
+    return ruta
+
+
+class _Lento(ClasificadorEuclidiano):
+    # Más lento que los 200 cuadros por segundo del video
+    def predecir_lote(self, patrones):
+        time.sleep(0.02)
+        return super().predecir_lote(patrones)
+
+
+def _contar_cuadros(ruta):
+    captura = cv2.VideoCapture(ruta)
+    cuadros = 0
+    while captura.read()[0]:
+        cuadros += 1
+    captura.release()
+    return cuadros
+
+
+@pytest.mark.parametrize('trabajadores', [1, 3])
+def test_sin_descartar(tmp_path, ruta_video, trabajadores):
+    salida = str(tmp_path / 'salida.avi')
+    resumen = SegmentadorVideo(_Lento(), ruta_video, salida, trabajadores=trabajadores, descartar=False).ejecutar()
+
+    assert resumen['cuadros'] == CUADROS and resumen['descartados'] == 0
+    assert _contar_cuadros(salida) == CUADROS
+
+
+def test_descartar_cuenta_cada_cuadro(ruta_video):
+    resumen = SegmentadorVideo(_Lento(), ruta_video, tam_cola=2, descartar=True).ejecutar()
+
+    # Cada cuadro decodificado se escribe o se descarta, ninguno se pierde sin contarse
+    assert resumen['descartados'] > 0
+    assert resumen['cuadros'] + resumen['descartados'] == CUADROS
+
+
+def test_error_de_un_trabajador(ruta_video):
+    class _Falla(ClasificadorEuclidiano):
+        def predecir_lote(self, patrones):
+            raise ArithmeticError('falla de prueba')
+
+    with pytest.raises(ArithmeticError):
+        SegmentadorVideo(_Falla(), ruta_video, trabajadores=2, descartar=False).ejecutar()
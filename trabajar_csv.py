@@ -6,19 +6,327 @@
     Licencia: Ninguna
 
     Librerías:
+    atexit: Vaciar el búfer de escritura al salir del programa
     csv: Escribir y leer datos tabulares
-    pickle: Para transformar un objeto complejo en una secuencia de bytes
+    os: Detectar cambios en el archivo para la caché y asegurar en disco el diario
+    threading: Vaciar el búfer de escritura después de un intervalo
+    numpy: Entregar los patrones como arreglos para operaciones vectorizadas
+    regiones: Patrones de cada región para agregarlos al archivo csv
 """
 
+import atexit
 import csv
-import pickle
+import os
+import threading
+
+import numpy as np
+
+from regiones import cargar_region, dividir_como_datos
+
+NOMBRE_CAMPOS = ['CASO', 'R', 'G', 'B', 'CLASE']
+
+# Patrones pendientes que provocan una escritura al archivo csv
+TAM_BUFFER = 1024
+# Segundos máximos que un patrón permanece sólo en el diario
+INTERVALO_VACIADO = 2.0
 
 class ArchivoCSV():
     """
         Implementa funciones para operar archivos csv; escribir, leer,
         eliminar, modificar registros de tipo de dato diccionario.
+
+        El contenido leído se guarda en una caché compartida por todas las
+        instancias, identificada por la fecha de modificación y el tamaño
+        del archivo; las escrituras hechas con esta clase actualizan la
+        caché en lugar de descartarla.
+
+        Los patrones que llegan uno a uno con escribir_dato se acumulan en
+        un búfer y se escriben juntos al archivo csv cuando se juntan
+        TAM_BUFFER o pasan INTERVALO_VACIADO segundos, y siempre al salir
+        del programa. Mientras tanto cada patrón queda en un archivo diario
+        (ruta + '.diario') que se recupera si el programa termina sin vaciar.
+
+        Con suscribir, un modelo que aprende de forma incremental recibe
+        cada patrón que se agrega al archivo desde cualquier instancia.
     """
 
+    # Ruta absoluta -> {'firma', 'filas', 'arreglos', 'ultimo_caso'}
+    _cache = {}
+    # Ruta absoluta -> lista de filas pendientes de escribir
+    _pendientes = {}
+    # Ruta absoluta -> archivo diario abierto
+    _diarios = {}
+    # Ruta absoluta -> temporizador del siguiente vaciado
+    _temporizadores = {}
+    # Rutas cuyo diario ya se revisó en este proceso
+    _recuperados = set()
+    # Ruta absoluta -> funciones que reciben los patrones agregados
+    _suscriptores = {}
+    _candado = threading.RLock()
+
+    def __init__(self, ruta="datos.csv") -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            ruta: Ruta del archivo csv de patrones
+        """
+
+        self.ruta = ruta
+
+    def _clave(self) -> str:
+        return os.path.abspath(self.ruta)
+
+    def _firma(self) -> tuple:
+        """
+            Fecha de modificación y tamaño del archivo, o None si no existe.
+        """
+
+        try:
+            estado = os.stat(self.ruta)
+        except FileNotFoundError:
+            return None
+
+        return (estado.st_mtime_ns, estado.st_size)
+
+    def _ruta_diario(self) -> str:
+        return self.ruta + '.diario'
+
+    def _entrada_cache(self) -> dict:
+        """
+            Devuelve la entrada de la caché del archivo, leyéndolo sólo si
+            cambió desde la última lectura o escritura. Las filas pendientes
+            del búfer siempre forman parte de la entrada.
+        """
+
+        with ArchivoCSV._candado:
+            self._recuperar_diario()
+
+            firma = self._firma()
+            entrada = ArchivoCSV._cache.get(self._clave())
+
+            if entrada is None or entrada['firma'] != firma:
+                with open(self.ruta, 'r') as archivo:
+                    filas = list(csv.DictReader(archivo))
+
+                filas.extend(ArchivoCSV._pendientes.get(self._clave(), []))
+                entrada = self._guardar_cache(filas)
+
+            return entrada
+
+    def _recuperar_diario(self) -> None:
+        """
+            La primera vez que se usa el archivo en el proceso, agrega al csv
+            las filas del diario que no alcanzaron a escribirse. Sólo se toman
+            las filas con CASO mayor al último del csv, por si el programa
+            terminó después de escribir el csv pero antes de limpiar el diario.
+        """
+
+        if self._clave() in ArchivoCSV._recuperados:
+            return
+
+        ArchivoCSV._recuperados.add(self._clave())
+
+        if not os.path.exists(self._ruta_diario()):
+            return
+
+        with open(self._ruta_diario(), 'r') as diario:
+            filas = [fila for fila in csv.DictReader(diario, fieldnames=NOMBRE_CAMPOS) if fila['CLASE']]
+
+        if filas:
+            with open(self.ruta, 'r') as archivo:
+                existentes = list(csv.DictReader(archivo))
+
+            ultimo = int(existentes[-1]['CASO']) if existentes else 0
+            faltantes = [fila for fila in filas if int(fila['CASO']) > ultimo]
+
+            self._escribir_al_final(faltantes)
+
+        os.remove(self._ruta_diario())
+
+    def _guardar_cache(self, filas) -> dict:
+        """
+            Reemplaza la entrada de la caché con las filas dadas.
+        """
+
+        entrada = {
+            'firma': self._firma(),
+            'filas': filas,
+            'arreglos': None,
+            'ultimo_caso': int(filas[-1]['CASO']) if filas else 0
+        }
+        ArchivoCSV._cache[self._clave()] = entrada
+
+        return entrada
+
+    def _actualizar_cache(self, firma_previa, lista_diccs) -> None:
+        """
+            Agrega a la caché las filas recién escritas al final del archivo.
+            Si la caché no correspondía al archivo antes de escribir, se
+            descarta para que la siguiente lectura lo lea de nuevo.
+
+            Parámetros:
+            firma_previa: Firma del archivo antes de la escritura
+            lista_diccs: Filas agregadas
+        """
+
+        entrada = ArchivoCSV._cache.get(self._clave())
+
+        if entrada is None or entrada['firma'] != firma_previa:
+            ArchivoCSV._cache.pop(self._clave(), None)
+            return
+
+        # Se guardan como cadenas, igual que las entrega csv.DictReader
+        for fila in lista_diccs:
+            entrada['filas'].append({campo: str(fila[campo]) for campo in NOMBRE_CAMPOS})
+            entrada['ultimo_caso'] = int(fila['CASO'])
+
+        entrada['arreglos'] = None
+        entrada['firma'] = self._firma()
+
+    def _escribir_al_final(self, lista_diccs) -> None:
+        """
+            Agrega las filas al final del archivo csv y espera a que
+            lleguen al disco.
+        """
+
+        with open(self.ruta, "a") as archivo:
+            escritor = csv.DictWriter(archivo, fieldnames=NOMBRE_CAMPOS)
+            escritor.writerows(lista_diccs)
+
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+    def suscribir(self, al_agregar, al_leer) -> None:
+        """
+            Entrega los patrones actuales del archivo y después cada lote de
+            patrones que se agregue. Las dos llamadas se hacen bajo el
+            candado del archivo, así ningún patrón se pierde ni se cuenta
+            dos veces. Sólo se avisan las altas; sobreescribir o eliminar
+            filas no llega a los suscriptores.
+
+            Parámetros:
+            al_agregar: Función que recibe (patrones (n, 3), clases (n,)) de cada lote agregado
+            al_leer: Función que recibe (patrones, clases) con el contenido actual
+        """
+
+        with ArchivoCSV._candado:
+            al_leer(*self.leer_arreglos())
+            ArchivoCSV._suscriptores.setdefault(self._clave(), []).append(al_agregar)
+
+    def desuscribir(self, al_agregar) -> None:
+        """
+            Deja de avisar a la función registrada con suscribir.
+        """
+
+        with ArchivoCSV._candado:
+            suscriptores = ArchivoCSV._suscriptores.get(self._clave(), [])
+
+            if al_agregar in suscriptores:
+                suscriptores.remove(al_agregar)
+
+    def _avisar(self, filas) -> None:
+        """
+            Entrega las filas agregadas a los suscriptores; se llama con el candado tomado.
+        """
+
+        suscriptores = ArchivoCSV._suscriptores.get(self._clave())
+
+        if not suscriptores or not filas:
+            return
+
+        datos = np.array([[int(fila[campo]) for campo in ('R', 'G', 'B', 'CLASE')] for fila in filas], dtype=np.uint8)
+
+        for al_agregar in suscriptores:
+            al_agregar(datos[:, :3], datos[:, 3])
+
+    def _encolar(self, fila) -> None:
+        """
+            Registra la fila en el diario y en el búfer, y vacía el búfer
+            si ya alcanzó su tamaño máximo.
+        """
+
+        clave = self._clave()
+        fila = {campo: str(fila[campo]) for campo in NOMBRE_CAMPOS}
+
+        with ArchivoCSV._candado:
+            entrada = self._entrada_cache()
+
+            if clave not in ArchivoCSV._diarios:
+                ArchivoCSV._diarios[clave] = open(self._ruta_diario(), 'a')
+
+            diario = ArchivoCSV._diarios[clave]
+            csv.DictWriter(diario, fieldnames=NOMBRE_CAMPOS).writerow(fila)
+
+            # La fila sólo sobrevive a una caída del sistema cuando llega al disco, no al caché del sistema operativo
+            diario.flush()
+            os.fsync(diario.fileno())
+
+            pendientes = ArchivoCSV._pendientes.setdefault(clave, [])
+            pendientes.append(fila)
+
+            entrada['filas'].append(fila)
+            entrada['ultimo_caso'] = int(fila['CASO'])
+            entrada['arreglos'] = None
+
+            self._avisar([fila])
+
+            if len(pendientes) >= TAM_BUFFER:
+                self.vaciar_buffer()
+            elif clave not in ArchivoCSV._temporizadores:
+                temporizador = threading.Timer(INTERVALO_VACIADO, self.vaciar_buffer)
+                temporizador.daemon = True
+                ArchivoCSV._temporizadores[clave] = temporizador
+                temporizador.start()
+
+    def vaciar_buffer(self) -> None:
+        """
+            Escribe en el archivo csv todas las filas pendientes del búfer
+            y limpia el diario.
+        """
+
+        clave = self._clave()
+
+        with ArchivoCSV._candado:
+            temporizador = ArchivoCSV._temporizadores.pop(clave, None)
+            if temporizador is not None:
+                temporizador.cancel()
+
+            pendientes = ArchivoCSV._pendientes.pop(clave, [])
+            if not pendientes:
+                return
+
+            firma_previa = self._firma()
+            self._escribir_al_final(pendientes)
+
+            # La caché ya contenía las filas pendientes, sólo cambia la firma
+            entrada = ArchivoCSV._cache.get(clave)
+            if entrada is not None and entrada['firma'] == firma_previa:
+                entrada['firma'] = self._firma()
+
+            diario = ArchivoCSV._diarios[clave]
+            diario.seek(0)
+            diario.truncate()
+
+    @classmethod
+    def vaciar_todos(cls) -> None:
+        """
+            Vacía los búferes de todos los archivos; se llama al salir del programa.
+        """
+
+        with cls._candado:
+            for clave in list(cls._pendientes):
+                cls(clave).vaciar_buffer()
+
+            for diario in cls._diarios.values():
+                diario.close()
+
+                # El archivo pudo haberse borrado junto con su carpeta
+                if os.path.exists(diario.name):
+                    os.remove(diario.name)
+
+            cls._diarios.clear()
+
     def escribir_datos(self, lista_diccs) -> None:
         """
             Escribe el archivo y agrega los patrones de la primer clase.
@@ -29,14 +337,14 @@ class ArchivoCSV():
              No. caso, canal R, canal G, canal B, clase asignada
         """
 
-        with open("datos.csv", "w") as archivo:
-            nombre_campos = ['CASO', 'R', 'G', 'B', 'CLASE']
+        self.vaciar_buffer()
 
-            escritor = csv.DictWriter(archivo, fieldnames=nombre_campos)
+        with open(self.ruta, "w") as archivo:
+            escritor = csv.DictWriter(archivo, fieldnames=NOMBRE_CAMPOS)
             escritor.writeheader()
             escritor.writerows(lista_diccs)
 
-            archivo.close()
+        ArchivoCSV._cache.pop(self._clave(), None)
 
     def agregar_datos(self, lista_diccs) -> None:
         """
@@ -48,30 +356,57 @@ class ArchivoCSV():
              No. caso, canal R, canal G, canal B, clase asignada
         """
 
-        with open("datos.csv", "a") as archivo:
-            nombre_campos = ['CASO', 'R', 'G', 'B', 'CLASE']
+        with ArchivoCSV._candado:
+            # Primero las filas pendientes, para conservar el orden de los casos
+            self.vaciar_buffer()
 
-            escritor = csv.DictWriter(archivo, fieldnames=nombre_campos)
-            escritor.writerows(lista_diccs)
+            firma_previa = self._firma()
 
-            archivo.close()
+            with open(self.ruta, "a") as archivo:
+                escritor = csv.DictWriter(archivo, fieldnames=NOMBRE_CAMPOS)
+                escritor.writerows(lista_diccs)
+
+            self._actualizar_cache(firma_previa, lista_diccs)
+            self._avisar(lista_diccs)
 
     def escribir_dato(self, fila) -> None:
         """
             Después de analizar el patrón desconocido y asignarle un número de CASO 
-            y su CLASE, se agrega la nueva fila en el archivo csv.
+            y su CLASE, se agrega la nueva fila al búfer de escritura del archivo csv.
 
             Parámetros:
              fila: Diccionario de datos donde se tiene la información de un patrón;
              No. caso, canal R, canal G, canal B, clase asignada
         """
 
-        with open("datos.csv", "a") as archivo:
-            nombre_campos = ['CASO', 'R', 'G', 'B', 'CLASE']
-            escritor = csv.DictWriter(archivo, fieldnames=nombre_campos)
-            escritor.writerow(fila)
+        self._encolar(fila)
+
+    def escribir_patron(self, patron, clase) -> int:
+        """
+            Agrega un patrón con el siguiente número de CASO. El número se
+            asigna y el patrón se encola en una sola operación, así dos
+            hilos que agregan a la vez nunca reciben el mismo CASO.
+
+            Parámetros:
+            patron: Vector con los componentes RGB
+            clase: Clase asignada al patrón
+
+            Retorno:
+            Número de CASO asignado
+        """
+
+        with ArchivoCSV._candado:
+            caso = self.ultimo_caso() + 1
+
+            self._encolar({
+                'CASO': caso,
+                'R': int(patron[0]),
+                'G': int(patron[1]),
+                'B': int(patron[2]),
+                'CLASE': int(clase)
+            })
 
-            archivo.close()
+        return caso
 
     def leer_datos(self) -> list:
         """
@@ -81,12 +416,40 @@ class ArchivoCSV():
             Lista de diccionarios de los patrones de aprendizaje.
         """
 
-        with open("datos.csv", 'r') as archivo:
-            lector = list(csv.DictReader(archivo))
+        # Copia de la lista para que quien la modifique no altere la caché
+        return list(self._entrada_cache()['filas'])
+
+    def leer_arreglos(self) -> tuple:
+        """
+            Devuelve los patrones del archivo csv como arreglos numpy, para
+            los métodos que operan todos los patrones a la vez.
+
+            Retorno:
+            Tupla con el arreglo (N, 3) uint8 de componentes RGB y el
+            arreglo (N,) uint8 de clases asignadas
+        """
+
+        entrada = self._entrada_cache()
 
-            archivo.close()
+        if entrada['arreglos'] is None:
+            datos = np.array(
+                [[fila[campo] for campo in NOMBRE_CAMPOS] for fila in entrada['filas']],
+                dtype=np.int64
+            ).reshape(-1, len(NOMBRE_CAMPOS))
 
-            return lector
+            entrada['arreglos'] = (datos[:, 1:4].astype(np.uint8), datos[:, 4].astype(np.uint8))
+
+        patrones, clases = entrada['arreglos']
+
+        return patrones.copy(), clases.copy()
+
+    def ultimo_caso(self) -> int:
+        """
+            Devuelve el número de caso del último patrón del archivo,
+            mantenido en memoria junto con la caché.
+        """
+
+        return self._entrada_cache()['ultimo_caso']
 
     def eliminar_dato(self) -> None:
         """
@@ -94,11 +457,10 @@ class ArchivoCSV():
             que actualiza ese cambio en el archivo.
         """
 
-        with open("datos.csv", "r") as lectura:
-            lineas = list(csv.DictReader(lectura))
-            lineas.pop()
+        self.vaciar_buffer()
 
-            lectura.close()
+        lineas = self.leer_datos()
+        lineas.pop()
 
         self.escribir_nuevo(lineas)
 
@@ -110,14 +472,12 @@ class ArchivoCSV():
             dic: Lista de diccionarios de todos los casos de aprendizaje
         """
 
-        with open("datos.csv", "w") as archivo:
-            nombre_campos = ['CASO', 'R', 'G', 'B', 'CLASE']
-
-            escritor = csv.DictWriter(archivo, fieldnames=nombre_campos)
+        with open(self.ruta, "w") as archivo:
+            escritor = csv.DictWriter(archivo, fieldnames=NOMBRE_CAMPOS)
             escritor.writeheader()
             escritor.writerows(dic)
 
-            archivo.close()
+        self._guardar_cache([{campo: str(fila[campo]) for campo in NOMBRE_CAMPOS} for fila in dic])
 
     def lista_a_diccionario(self, lista, clase) -> list:
         """
@@ -134,8 +494,7 @@ class ArchivoCSV():
         """
 
         # Solo se usa cuando ya haya datos en el archivo csv
-        datos = self.leer_datos()
-        contador_caso = int(datos[-1]['CASO'])
+        contador_caso = self.ultimo_caso()
 
         lista_salida = []
 
@@ -151,26 +510,25 @@ class ArchivoCSV():
 
         return lista_salida
 
+# Ninguna fila se queda en el búfer al terminar el programa
+atexit.register(ArchivoCSV.vaciar_todos)
+
 if __name__ == '__main__':
     controlador = ArchivoCSV()
     
-    # Leer lista de archivo binario
-    fichero = open("BinarioregTierra", "rb")
-    # Para obtener la información binaria e interpretarla
-    lista_recuperada = pickle.load(fichero)
-    fichero.close()
+    # Patrones de la región, convertidos con regiones.py
+    patrones_region, metadatos = cargar_region('Tierra')
 
     # Se toma únicamente el 70 por ciento de datos de cada región
-    calcular_70 = int(len(lista_recuperada) * 0.7)
-    ptrs_elegidos = lista_recuperada[:calcular_70]
+    ptrs_elegidos, _ = dividir_como_datos(patrones_region, 0.7)
 
-    print(len(lista_recuperada))
+    print(len(patrones_region))
     print(len(ptrs_elegidos))
 
     # Sólo se usa cuando no haya datos en el archivo csv
     #lista_diccs = controlador.lista_a_diccionario(ptrs_elegidos)
 
-    lista_diccs = controlador.lista_a_diccionario(ptrs_elegidos, 3)
+    lista_diccs = controlador.lista_a_diccionario(ptrs_elegidos, metadatos['clase'])
 
     controlador.agregar_datos(lista_diccs)
 
@@ -0,0 +1,339 @@
+"""
+    Título del proyecto: SEGMENTACIÓN DE VIDEO
+    Descripción del proyecto: Segmenta en tiempo real los cuadros de un video o de una cámara en las 3 regiones,
+    con hilos separados para decodificar, clasificar y escribir o mostrar cada cuadro.
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    argparse: Opciones de la línea de comandos
+    queue, threading: Colas acotadas entre las etapas y sus hilos
+    sys, time: Código de salida y reloj
+    cv2: Leer, escribir y mostrar los cuadros
+    numpy: Estadísticas de latencia
+    motor: Clasificadores sin interfaz gráfica
+    segmentacion: Memoria de colores entre cuadros y superposición de regiones
+
+    Ejemplo:
+    python video.py 0 --metodo mlp --mostrar
+    python video.py recorrido.mp4 --salida recorrido_segmentado.mp4 --trabajadores 2
+"""
+
+import argparse
+import queue
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from motor import METODOS, crear_clasificador
+from segmentacion import MemoriaColores, superponer
+
+ETAPAS = ('decodificar', 'clasificar', 'codificar')
+
+# Marca de fin que recorre las colas detrás del último cuadro
+_FIN = None
+
+class SegmentadorVideo():
+    """
+        Tubería productor/consumidor para segmentar video:
+
+        decodificar (1 hilo) -> clasificar (N hilos) -> codificar (hilo que llama a ejecutar)
+
+        Las colas son acotadas. Con descartar=True, cuando la etapa de
+        clasificación no alcanza al video se tira el cuadro más viejo en
+        espera, para que la salida siga al tiempo real en vez de atrasarse;
+        con descartar=False se procesan todos los cuadros. La escritura o
+        el despliegue se hace en el hilo que llama a ejecutar porque
+        cv2.imshow debe usarse desde un solo hilo.
+
+        Si la decodificación o un trabajador falla, la tubería se detiene y
+        ejecutar lanza la misma excepción en el hilo que lo llamó.
+    """
+
+    def __init__(self, clasificador, fuente, ruta_salida=None, mostrar=False,
+                 trabajadores=1, tam_cola=4, descartar=True, alfa=0.5) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            clasificador: Clasificador del motor ya cargado
+            fuente: Ruta de un video o índice de la cámara para cv2.VideoCapture
+            ruta_salida: Ruta opcional del video con las regiones superpuestas
+            mostrar: Si se muestra cada cuadro en una ventana, se cierra con Esc
+            trabajadores: Número de hilos de clasificación
+            tam_cola: Número máximo de cuadros en espera entre dos etapas
+            descartar: Si se tiran cuadros cuando la clasificación se atrasa
+            alfa: Peso de las regiones coloreadas en la mezcla
+        """
+
+        self.clasificador = clasificador
+        self.fuente = fuente
+        self.ruta_salida = ruta_salida
+        self.mostrar = mostrar
+        self.trabajadores = trabajadores
+        self.descartar = descartar
+        self.alfa = alfa
+
+        self.entrada = queue.Queue(maxsize=tam_cola)
+        self.salida = queue.Queue(maxsize=tam_cola)
+        self.detener = threading.Event()
+        self._candado = threading.Lock()
+        self._secuencia = 0
+        self.errores = []
+
+        self.latencias = {etapa: [] for etapa in ETAPAS}
+        self.descartados = 0
+        self.escritos = 0
+        self.fps_fuente = 0.0
+
+    def _fallar(self, error) -> None:
+        """
+            Guarda la excepción de una etapa para ejecutar y detiene la lectura.
+        """
+
+        self.errores.append(error)
+        self.detener.set()
+
+    def _decodificar(self, captura) -> None:
+        """
+            Lee los cuadros de la captura y los pone en la cola de entrada.
+            Un archivo se lee al ritmo de sus FPS, como lo entregaría una
+            cámara; sin descartar se lee tan rápido como se procese.
+        """
+
+        try:
+            pausar = self.descartar and isinstance(self.fuente, str)
+            periodo = 1 / self.fps_fuente
+            siguiente = time.perf_counter()
+
+            while not self.detener.is_set():
+                if pausar:
+                    espera = siguiente - time.perf_counter()
+                    if espera > 0:
+                        time.sleep(espera)
+                    siguiente = max(siguiente, time.perf_counter()) + periodo
+
+                inicio = time.perf_counter()
+                leido, cuadro = captura.read()
+
+                if not leido:
+                    break
+
+                self.latencias['decodificar'].append(time.perf_counter() - inicio)
+
+                elemento = (cuadro, time.perf_counter())
+
+                if not self.descartar:
+                    self.entrada.put(elemento)
+                    continue
+
+                while True:
+                    try:
+                        self.entrada.put_nowait(elemento)
+                        break
+                    except queue.Full:
+                        try:
+                            self.entrada.get_nowait()
+                            self.descartados += 1
+                        except queue.Empty:
+                            pass
+        except Exception as error:
+            self._fallar(error)
+        finally:
+            captura.release()
+
+            # Los trabajadores vacían la entrada, así esta espera siempre termina
+            for _ in range(self.trabajadores):
+                self.entrada.put(_FIN)
+
+    def _clasificar(self) -> None:
+        """
+            Segmenta los cuadros de la cola de entrada. Cada hilo tiene su
+            propia memoria de colores, así sólo se clasifican los colores
+            que no aparecieron en sus cuadros anteriores.
+        """
+
+        memoria = MemoriaColores()
+
+        try:
+            while True:
+                # El número de secuencia se toma junto con el cuadro para que
+                # siga el orden de la cola aunque haya cuadros descartados
+                with self._candado:
+                    elemento = self.entrada.get()
+
+                    if elemento is _FIN:
+                        break
+
+                    indice = self._secuencia
+                    self._secuencia += 1
+
+                cuadro, llegada = elemento
+
+                inicio = time.perf_counter()
+                mapa = memoria.segmentar(cuadro, self.clasificador.predecir_lote)
+                mezcla = superponer(cuadro, mapa, self.alfa)
+                self.latencias['clasificar'].append(time.perf_counter() - inicio)
+
+                self.salida.put((indice, mezcla, llegada))
+        except Exception as error:
+            self._fallar(error)
+
+            # Se descartan los cuadros restantes hasta la marca de fin de este hilo
+            while self.entrada.get() is not _FIN:
+                pass
+        finally:
+            self.salida.put(_FIN)
+
+    def ejecutar(self) -> dict:
+        """
+            Procesa el video completo, o hasta que se cierre la ventana con Esc.
+
+            Retorno:
+            Diccionario con las estadísticas de la ejecución, ver estadisticas
+
+            Lanza la primera excepción de la decodificación o de un trabajador.
+        """
+
+        captura = cv2.VideoCapture(self.fuente)
+
+        if not captura.isOpened():
+            raise ValueError(f'No se pudo abrir la fuente de video {self.fuente}')
+
+        self.fps_fuente = captura.get(cv2.CAP_PROP_FPS) or 30.0
+        ancho = int(captura.get(cv2.CAP_PROP_FRAME_WIDTH))
+        alto = int(captura.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        escritor = None
+        if self.ruta_salida is not None:
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            escritor = cv2.VideoWriter(self.ruta_salida, fourcc, self.fps_fuente, (ancho, alto))
+
+        hilos = [threading.Thread(target=self._decodificar, args=(captura,), daemon=True)]
+        hilos += [threading.Thread(target=self._clasificar, daemon=True) for _ in range(self.trabajadores)]
+
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+
+        terminados = 0
+        siguiente = 0
+        pendientes = {}
+        retrasos = []
+
+        while terminados < self.trabajadores:
+            elemento = self.salida.get()
+
+            if elemento is _FIN:
+                terminados += 1
+                continue
+
+            # Con varios trabajadores un cuadro puede terminar antes que uno anterior
+            indice, mezcla, llegada = elemento
+            pendientes[indice] = (mezcla, llegada)
+
+            while siguiente in pendientes:
+                mezcla, llegada = pendientes.pop(siguiente)
+                siguiente += 1
+
+                if self.detener.is_set():
+                    continue
+
+                inicio_codificar = time.perf_counter()
+
+                if escritor is not None:
+                    escritor.write(mezcla)
+
+                if self.mostrar:
+                    cv2.imshow('Segmentacion', mezcla)
+                    if cv2.waitKey(1) & 0xFF == 27:
+                        self.detener.set()
+
+                fin = time.perf_counter()
+                self.latencias['codificar'].append(fin - inicio_codificar)
+                retrasos.append(fin - llegada)
+                self.escritos += 1
+
+        # Cada trabajador termina al recibir la marca de fin, que el decodificador pone al final
+        for hilo in hilos:
+            hilo.join()
+
+        duracion = time.perf_counter() - inicio
+
+        if escritor is not None:
+            escritor.release()
+
+        if self.mostrar:
+            cv2.destroyAllWindows()
+
+        if self.errores:
+            raise self.errores[0]
+
+        return self.estadisticas(duracion, retrasos)
+
+    def estadisticas(self, duracion, retrasos) -> dict:
+        """
+            Resume la ejecución.
+
+            Parámetros:
+            duracion: Segundos que tardó la ejecución completa
+            retrasos: Segundos entre que se decodificó y se escribió cada cuadro
+
+            Retorno:
+            Diccionario con los cuadros escritos y descartados, los FPS
+            logrados y de la fuente, y la latencia mediana y percentil 95
+            de cada etapa y del cuadro completo, en milisegundos
+        """
+
+        resumen = {
+            'cuadros': self.escritos,
+            'descartados': self.descartados,
+            'fps': self.escritos / duracion if duracion > 0 else 0.0,
+            'fps_fuente': self.fps_fuente
+        }
+
+        medidas = dict(self.latencias, total=retrasos)
+
+        for nombre, tiempos in medidas.items():
+            if tiempos:
+                resumen[f'{nombre}_ms'] = float(np.median(tiempos)) * 1e3
+                resumen[f'{nombre}_p95_ms'] = float(np.percentile(tiempos, 95)) * 1e3
+
+        return resumen
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description='Segmenta un video o una cámara en las regiones cielo, pasto y tierra.')
+    parser.add_argument('fuente', help='Ruta del video o índice de la cámara')
+    parser.add_argument('--metodo', choices=METODOS, default='euclidiana', help='Método de clasificación')
+    parser.add_argument('--lut', help='Tabla compilada con tabla_lut.compilar_lut, en lugar del método')
+    parser.add_argument('--salida', help='Video de salida con las regiones superpuestas')
+    parser.add_argument('--mostrar', action='store_true', help='Mostrar los cuadros en una ventana')
+    parser.add_argument('--trabajadores', type=int, default=1, help='Hilos de clasificación')
+    parser.add_argument('--cola', type=int, default=4, help='Cuadros en espera entre etapas')
+    parser.add_argument('--sin-descartar', action='store_true', help='Procesar todos los cuadros aunque se atrase')
+    args = parser.parse_args(argumentos)
+
+    fuente = int(args.fuente) if args.fuente.isdigit() else args.fuente
+    clasificador = crear_clasificador(args.metodo, args.lut)
+
+    segmentador = SegmentadorVideo(
+        clasificador, fuente, args.salida, args.mostrar,
+        args.trabajadores, args.cola, not args.sin_descartar
+    )
+    resumen = segmentador.ejecutar()
+
+    print(f"{resumen['cuadros']} cuadros, {resumen['descartados']} descartados, "
+          f"{resumen['fps']:.1f} FPS (fuente {resumen['fps_fuente']:.1f})")
+
+    for nombre in ETAPAS + ('total',):
+        if f'{nombre}_ms' in resumen:
+            print(f"{nombre}: {resumen[f'{nombre}_ms']:.1f} ms (p95 {resumen[f'{nombre}_p95_ms']:.1f} ms)")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
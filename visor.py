@@ -0,0 +1,511 @@
+"""
+    Título del proyecto: VISOR DE IMÁGENES DE OPENCV PARA LAS GUI
+    Descripción del proyecto: Muestra una imágen en una ventana de OpenCV y atiende sus eventos desde el ciclo de
+    tkinter, en lugar de bloquearlo con cv2.waitKey(0).
+    Autor: Cristian Del Angel Fiscal
+    Fecha: 18/10/2026
+    Licencia: Ninguna
+
+    Librerías:
+    contextlib: Clasificar sin candado cuando el modelo no se comparte
+    tkinter: Avisar al usuario cuando falla una clasificación
+    cv2: Mostrar la imágen, dibujar el texto sobre ella y recibir los eventos del mouse
+    numpy: Tablas de las clases y puntajes ya calculados
+    segmentacion: Códigos de 24 bits de los colores y tabla de clases por color
+"""
+
+import contextlib
+from tkinter import messagebox
+
+import cv2
+import numpy as np
+
+from segmentacion import MemoriaColores, codificar_colores, decodificar_colores
+
+# Milisegundos entre dos revisiones de la ventana, 60 veces por segundo
+INTERVALO_VISOR = 16
+
+# Formato del texto sobre la imágen
+FUENTE = cv2.FONT_HERSHEY_SIMPLEX
+ESCALA_FUENTE = 0.45
+MARGEN_TEXTO = 4
+DISTANCIA_CURSOR = 14
+
+# Colores o pixeles que se clasifican en cada tarea de fondo; acota lo que
+# espera la consulta del pixel bajo el cursor mientras se llena la tabla
+TAM_BLOQUE_FONDO = 16384
+
+class VisorImagen():
+    """
+        Ventana de OpenCV revisada con after() de tkinter: cada 16 ms se
+        llama a cv2.waitKey(1) para procesar sus eventos, y al cerrarla
+        (con la X o con Esc) se destruye y deja de revisarse.
+    """
+
+    def __init__(self, ventana, nombre, img, al_mouse=None) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            ventana: Widget de tkinter cuyo after() se usa para revisar la ventana de OpenCV
+            nombre: Nombre de la ventana de OpenCV
+            img: Imágen BGR que se muestra
+            al_mouse: Función opcional (event, x, y, flags, params) para los eventos del mouse
+        """
+
+        self.ventana = ventana
+        self.nombre = nombre
+        self.img = img
+        self.abierto = True
+
+        # Copia de la imágen donde se dibuja el texto y el rectángulo que ocupa
+        self._lienzo = None
+        self._sucio = None
+
+        cv2.imshow(nombre, img)
+
+        if al_mouse is not None:
+            cv2.setMouseCallback(nombre, al_mouse)
+
+        self._id = self.ventana.after(INTERVALO_VISOR, self._revisar)
+
+    def mostrar(self, img) -> None:
+        """
+            Reemplaza la imágen mostrada.
+        """
+
+        self.img = img
+        self._lienzo = None
+        self._sucio = None
+
+        if self.abierto:
+            cv2.imshow(self.nombre, img)
+
+    def dibujar_texto(self, lineas, x, y) -> None:
+        """
+            Muestra un recuadro de texto junto al punto (x, y), del lado
+            donde cabe, y borra el anterior. Sólo se restaura de la imágen
+            original el rectángulo que ocupaba el texto anterior, en lugar
+            de copiarla completa en cada movimiento del mouse.
+
+            Parámetros:
+            lineas: Lista de cadenas, una por renglón
+            x: Columna del punto
+            y: Renglón del punto
+        """
+
+        if not self.abierto:
+            return
+
+        if self._lienzo is None:
+            self._lienzo = self.img.copy()
+
+        self._borrar_texto()
+
+        medidas = [cv2.getTextSize(linea, FUENTE, ESCALA_FUENTE, 1) for linea in lineas]
+        alto_linea = max(alto + base for (_, alto), base in medidas) + MARGEN_TEXTO
+        ancho = max(ancho for (ancho, _), _ in medidas) + 2 * MARGEN_TEXTO
+        alto = alto_linea * len(lineas) + MARGEN_TEXTO
+
+        alto_img, ancho_img = self.img.shape[:2]
+
+        x0 = x + DISTANCIA_CURSOR
+        if x0 + ancho > ancho_img:
+            x0 = max(0, x - DISTANCIA_CURSOR - ancho)
+
+        y0 = y + DISTANCIA_CURSOR
+        if y0 + alto > alto_img:
+            y0 = max(0, y - DISTANCIA_CURSOR - alto)
+
+        x1, y1 = min(ancho_img, x0 + ancho), min(alto_img, y0 + alto)
+        self._sucio = (x0, y0, x1, y1)
+
+        cv2.rectangle(self._lienzo, (x0, y0), (x1 - 1, y1 - 1), (0, 0, 0), -1)
+
+        for i, ((_, alto_texto), _) in enumerate(medidas):
+            base_linea = y0 + i * alto_linea + MARGEN_TEXTO + alto_texto
+            cv2.putText(
+                self._lienzo, lineas[i], (x0 + MARGEN_TEXTO, base_linea),
+                FUENTE, ESCALA_FUENTE, (255, 255, 255), 1, cv2.LINE_AA
+            )
+
+        cv2.imshow(self.nombre, self._lienzo)
+
+    def _borrar_texto(self) -> None:
+        if self._sucio is not None:
+            x0, y0, x1, y1 = self._sucio
+            self._lienzo[y0:y1, x0:x1] = self.img[y0:y1, x0:x1]
+            self._sucio = None
+
+    def _revisar(self) -> None:
+        tecla = cv2.waitKey(1) & 0xFF
+
+        if tecla == 27 or cv2.getWindowProperty(self.nombre, cv2.WND_PROP_VISIBLE) < 1:
+            self.cerrar()
+            return
+
+        self._id = self.ventana.after(INTERVALO_VISOR, self._revisar)
+
+    def cerrar(self) -> None:
+        if not self.abierto:
+            return
+
+        self.abierto = False
+        self.ventana.after_cancel(self._id)
+
+        try:
+            cv2.destroyWindow(self.nombre)
+        except cv2.error:
+            pass
+
+class InspectorPixeles(VisorImagen):
+    """
+        Visor que clasifica el pixel bajo el cursor mientras el mouse se
+        mueve y muestra sobre la imágen su clase y sus puntajes (las
+        distancias a cada clase o sus probabilidades, según el método).
+
+        Al abrir la imágen se clasifican en segundo plano todos sus
+        colores distintos, por bloques, y el resultado queda en una tabla
+        por color; mientras tanto el pixel bajo el cursor se clasifica
+        solo y se guarda en la misma tabla. Así cada color se clasifica
+        una vez y pasar de nuevo por él cuesta una consulta a la tabla.
+        Si el clasificador usa textura local la clase depende de la
+        vecindad y no sólo del color, entonces la tabla es por pixel.
+
+        Las clasificaciones van a los hilos del GestorTareas de la ventana;
+        como otras ventanas pueden usar el mismo modelo desde sus hilos,
+        cada una se hace con el candado del modelo. Si el modelo aprende
+        (un patrón que K-NN se agrega, un lote del entrenamiento en línea
+        del perceptrón) cambia su versión y lo calculado se descarta al
+        notarlo; si se reemplaza, por ejemplo por otra regla de decisión,
+        reiniciar lo descarta.
+    """
+
+    def __init__(self, ventana, nombre, img, clasificador, tareas, al_mouse=None, candado=None) -> None:
+        """
+            Constructor de la clase.
+
+            Parámetros:
+            ventana: Widget de tkinter cuyo after() se usa para revisar la ventana de OpenCV
+            nombre: Nombre de la ventana de OpenCV
+            img: Imágen BGR que se muestra
+            clasificador: Clasificador del motor ya cargado
+            tareas: GestorTareas de la ventana
+            al_mouse: Función opcional (event, x, y, flags, params) que recibe también todos los eventos
+            candado: Candado del modelo si otras ventanas lo comparten, se toma en cada clasificación
+        """
+
+        self.clasificador = clasificador
+        self.version = clasificador.version
+        self.candado = candado if candado is not None else contextlib.nullcontext()
+        self.tareas = tareas
+        self.al_mouse = al_mouse
+
+        etapa = getattr(clasificador, 'etapa', None)
+        self.por_pixel = etapa is not None and etapa.textura
+
+        # Clase de cada color (o pixel); 0 si todavía no se clasifica
+        if self.por_pixel:
+            self.clases = np.zeros(img.shape[0] * img.shape[1], dtype=np.uint8)
+        else:
+            self.memoria = MemoriaColores()
+            self.clases = self.memoria.tabla
+
+        # Llave -> (clase, puntajes) de los pixeles que se clasificaron solos
+        self.consultados = {}
+
+        # Llaves de la clasificación de fondo y los puntajes de las ya evaluadas
+        self.llaves = None
+        self.caracteristicas = None
+        self.puntajes = None
+        self.clases_puntajes = None
+        self.evaluadas = 0
+
+        self._cursor = None
+        self._pendiente = None
+        self._tarea_fondo = None
+        self._tarea_pixel = None
+
+        super().__init__(ventana, nombre, img, self._evento_mouse)
+
+        self._tarea_fondo = self.tareas.enviar(
+            self._preparar,
+            descripcion='Preparando la imágen...',
+            al_terminar=self._preparada,
+            al_fallar=self._fallo
+        )
+
+    #------------- HILO TRABAJADOR -------------
+    def _preparar(self) -> tuple:
+        """
+            Llaves que se clasifican en segundo plano: los códigos de los
+            colores distintos de la imágen, o los índices de los pixeles
+            junto con sus características si se usa textura.
+        """
+
+        if self.por_pixel:
+            etapa = self.clasificador.etapa
+
+            # La etapa guarda las características de la última imágen, que otra ventana también usa
+            with self.candado:
+                caracteristicas = etapa.de_imagen(self.img).reshape(-1, etapa.dimension)
+
+            return np.arange(len(caracteristicas)), caracteristicas
+
+        presentes = np.zeros(len(self.clases), dtype=bool)
+        presentes[codificar_colores(self.img)] = True
+
+        return np.flatnonzero(presentes).astype(np.uint32), None
+
+    def _evaluar(self, llaves, con_puntajes=True) -> tuple:
+        """
+            Clases y, si el método los tiene, puntajes de un lote de llaves.
+        """
+
+        if self.por_pixel:
+            base = self.clasificador.base
+            patrones = self.caracteristicas[llaves]
+        else:
+            base = self.clasificador
+            patrones = decodificar_colores(llaves)
+
+        with self.candado:
+            clases = base.predecir_lote(patrones)
+
+            if not con_puntajes or base.PUNTAJE is None:
+                return clases, None, None
+
+            clases_puntajes, puntajes = base.puntajes_lote(patrones)
+
+        return clases, clases_puntajes, puntajes.astype(np.float32)
+
+    def _evaluar_bloque(self, tarea, inicio) -> tuple:
+        tarea.reportar(inicio / len(self.llaves), f'Clasificando la imágen {100 * inicio // len(self.llaves)}%')
+
+        # Por pixel sólo se guarda la clase, los puntajes de toda la imágen ocuparían demasiado
+        return self._evaluar(self.llaves[inicio:inicio + TAM_BLOQUE_FONDO], not self.por_pixel)
+
+    #------------- HILO DE TKINTER -------------
+    def _preparada(self, resultado) -> None:
+        self.llaves, self.caracteristicas = resultado
+        self._siguiente_bloque()
+
+    def _siguiente_bloque(self) -> None:
+        """
+            Envía el siguiente bloque de la clasificación de fondo. Los
+            bloques se envían de uno en uno para que la consulta del pixel
+            bajo el cursor no espere a que termine toda la imágen.
+        """
+
+        if not self.abierto or self.evaluadas >= len(self.llaves):
+            self._tarea_fondo = None
+            return
+
+        self._tarea_fondo = self.tareas.enviar(
+            self._evaluar_bloque, self.evaluadas,
+            descripcion='Clasificando la imágen...',
+            al_terminar=self._bloque_listo,
+            al_fallar=self._fallo,
+            con_tarea=True
+        )
+
+    def _vigente(self) -> bool:
+        """
+            Reinicia la clasificación si el modelo aprendió desde que empezó.
+        """
+
+        if self.clasificador.version == self.version:
+            return True
+
+        self.reiniciar()
+        return False
+
+    def _bloque_listo(self, resultado) -> None:
+        if not self._vigente():
+            return
+
+        clases, clases_puntajes, puntajes = resultado
+        fin = self.evaluadas + len(clases)
+
+        self.clases[self.llaves[self.evaluadas:fin]] = clases
+
+        if puntajes is not None:
+            if self.puntajes is None:
+                self.puntajes = np.empty((len(self.llaves), puntajes.shape[1]), dtype=np.float32)
+                self.clases_puntajes = clases_puntajes
+
+            self.puntajes[self.evaluadas:fin] = puntajes
+
+        self.evaluadas = fin
+
+        if self._cursor is not None:
+            self._flotar(*self._cursor)
+
+        self._siguiente_bloque()
+
+    def _llave(self, x, y) -> int:
+        if self.por_pixel:
+            return y * self.img.shape[1] + x
+
+        b, g, r = self.img[y, x]
+        return (int(r) << 16) | (int(g) << 8) | int(b)
+
+    def _buscar(self, llave) -> tuple:
+        """
+            Clase y puntajes ya calculados de la llave, o None si falta la clase.
+        """
+
+        if llave in self.consultados:
+            return self.consultados[llave]
+
+        clase = int(self.clases[llave])
+
+        if clase == 0:
+            return None
+
+        if self.puntajes is not None:
+            i = np.searchsorted(self.llaves[:self.evaluadas], llave)
+
+            if i < self.evaluadas and self.llaves[i] == llave:
+                return clase, self.clases_puntajes, self.puntajes[i]
+
+        return clase, None, None
+
+    def _consultar(self, llave) -> None:
+        """
+            Clasifica sólo el pixel bajo el cursor. Si ya hay una consulta
+            en curso, se recuerda la última llave pedida y se envía al terminar.
+        """
+
+        # Una consulta cancelada desde el panel de tareas ya no va a responder
+        if self._tarea_pixel is not None and not self._tarea_pixel.cancelada:
+            self._pendiente = llave
+            return
+
+        self._tarea_pixel = self.tareas.enviar(
+            self._evaluar, np.array([llave]),
+            descripcion='Clasificando el pixel...',
+            al_terminar=lambda resultado: self._pixel_listo(llave, resultado),
+            al_fallar=self._fallo
+        )
+
+    def _pixel_listo(self, llave, resultado) -> None:
+        if not self._vigente():
+            return
+
+        clases, clases_puntajes, puntajes = resultado
+
+        self.consultados[llave] = (int(clases[0]), clases_puntajes, None if puntajes is None else puntajes[0])
+        self._tarea_pixel = None
+
+        pendiente, self._pendiente = self._pendiente, None
+
+        if pendiente is not None and pendiente not in self.consultados:
+            self._consultar(pendiente)
+
+        if self._cursor is not None:
+            self._flotar(*self._cursor)
+
+    def _flotar(self, x, y) -> None:
+        """
+            Muestra la clase y los puntajes del pixel (x, y), pidiéndolos si
+            todavía no se conocen.
+        """
+
+        # reiniciar vuelve a mostrar el pixel del cursor
+        if not self._vigente():
+            return
+
+        b, g, r = self.img[y, x]
+        lineas = [f'({x}, {y})  RGB {r} {g} {b}']
+
+        llave = self._llave(x, y)
+        resultado = self._buscar(llave)
+
+        # Por pixel la tabla de fondo no tiene puntajes, se piden solos
+        if resultado is None or (resultado[2] is None and self.por_pixel and self.clasificador.PUNTAJE):
+            self._consultar(llave)
+
+        if resultado is None:
+            lineas.append('Clasificando...')
+        else:
+            clase, clases_puntajes, puntajes = resultado
+            lineas.append(f'Clase C{clase}')
+
+            if puntajes is not None:
+                lineas.append(self._formato_puntajes(clases_puntajes, puntajes))
+
+        self.dibujar_texto(lineas, x, y)
+
+    def _formato_puntajes(self, clases, puntajes) -> str:
+        nombre = self.clasificador.PUNTAJE
+        valores = []
+
+        for clase, valor in zip(clases, puntajes):
+            if not np.isfinite(valor):
+                valores.append(f'C{clase} -')
+            elif nombre == 'p':
+                valores.append(f'C{clase} {100 * valor:.0f}%')
+            else:
+                valores.append(f'C{clase} {valor:.1f}')
+
+        return f'{nombre}: ' + '  '.join(valores)
+
+    def _evento_mouse(self, event, x, y, flags, params) -> None:
+        if event == cv2.EVENT_MOUSEMOVE and 0 <= x < self.img.shape[1] and 0 <= y < self.img.shape[0]:
+            self._cursor = (x, y)
+            self._flotar(x, y)
+
+        if self.al_mouse is not None:
+            self.al_mouse(event, x, y, flags, params)
+
+    def _fallo(self, error) -> None:
+        self._cancelar_tareas()
+        messagebox.showerror('Error', f'Error al clasificar la imágen: {error}')
+
+    def _cancelar_tareas(self) -> None:
+        for tarea in (self._tarea_fondo, self._tarea_pixel):
+            if tarea is not None:
+                tarea.cancelar()
+
+        self._tarea_fondo = None
+        self._tarea_pixel = None
+        self._pendiente = None
+
+    def reiniciar(self, clasificador=None) -> None:
+        """
+            Descarta las clases y puntajes calculados y vuelve a clasificar
+            la imágen, por ejemplo después de cambiar la regla de decisión.
+
+            Parámetros:
+            clasificador: Clasificador que reemplaza al actual, None para conservarlo
+        """
+
+        self._cancelar_tareas()
+
+        if clasificador is not None:
+            self.clasificador = clasificador
+
+        self.version = self.clasificador.version
+        self.clases.fill(0)
+        self.consultados.clear()
+        self.puntajes = None
+        self.clases_puntajes = None
+        self.evaluadas = 0
+
+        if self.llaves is not None:
+            self._siguiente_bloque()
+        else:
+            self._tarea_fondo = self.tareas.enviar(
+                self._preparar,
+                descripcion='Preparando la imágen...',
+                al_terminar=self._preparada,
+                al_fallar=self._fallo
+            )
+
+        if self._cursor is not None:
+            self._flotar(*self._cursor)
+
+    def cerrar(self) -> None:
+        self._cancelar_tareas()
+        super().cerrar()